@@ -0,0 +1,83 @@
+import sys
+import time
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+from gpu.streams import AsyncGPU
+
+'''
+    @brief: Serves the same requests once through the blocking load_info -> distribute_data ->
+            run_computation -> reconstruct_data sequence and once through an AsyncGPU, where operand staging
+            of the next wave overlaps compute of the current one. Prints the wall time of both and the busy
+            time of the AsyncGPU's staging and compute threads.
+
+            Run from the repository root with: python -m benchmarks.async_streams [backend] [num_workers]
+'''
+
+REQUESTS = 64
+
+
+"""
+    @brief: Builds the request mix, matmuls of a few sizes that each take one or more waves.
+
+    @returns: list[tuple], (arr1, arr2) pairs.
+"""
+def make_requests() -> list:
+    rng = np.random.default_rng(0)
+    requests = []
+    for r in range(REQUESTS):
+        m, k, n = (8, 16, 8) if r % 2 else (16, 32, 16)
+        requests.append((rng.integers(0, 16, (m, k)), rng.integers(0, 16, (k, n))))
+    return requests
+
+
+"""
+    @brief: Runs the requests both ways on fresh devices and checks the results.
+
+    @params: backend -> str, ALU backend of the simulated device.
+    @params: num_workers -> int, worker processes of the device, 0 for serial SMs.
+    @returns: dict, the wall time of both runs and the AsyncGPU report.
+"""
+def measure(backend: str, num_workers: int) -> dict:
+    requests = make_requests()
+    config = dict(num_sms=4, mem_size=1024, num_warps=8, num_threads_per_warp=32, backend=backend, num_workers=num_workers)
+
+    gpu = GPU_SIM(**config)
+    # Warm up lookup tables and launch plans so both runs start from the same caches
+    for arr1, arr2 in requests[:2]:
+        gpu.load_info(arr1, arr2, operation="matmul")
+        gpu.distribute_data()
+        gpu.run_computation("101")
+    start = time.perf_counter()
+    for arr1, arr2 in requests:
+        gpu.load_info(arr1, arr2, operation="matmul")
+        gpu.distribute_data()
+        gpu.run_computation("101")
+        gpu.reconstruct_data().copy()
+    blocking_s = time.perf_counter() - start
+    gpu.close()
+
+    gpu = GPU_SIM(**config)
+    device = AsyncGPU(gpu)
+    streams = [device.default_stream, device.stream()]
+    start = time.perf_counter()
+    futures = [streams[r % 2].launch(arr1, arr2, "matmul") for r, (arr1, arr2) in enumerate(requests)]
+    results = [future.result() for future in futures]
+    async_s = time.perf_counter() - start
+    report = device.report()
+    device.close()
+    gpu.close()
+
+    for (arr1, arr2), result in zip(requests, results):
+        assert np.array_equal(result, arr1 @ arr2)
+    return {"blocking_s": blocking_s, "async_s": async_s, "report": report}
+
+
+if __name__ == "__main__":
+    backend = sys.argv[1] if len(sys.argv) > 1 else "bitslice"
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    row = measure(backend, num_workers)
+    report = row["report"]
+    print(f"backend={backend}, num_workers={num_workers}, {REQUESTS} matmul requests on 4 SMs x 8 warps x 32 threads")
+    print(f"blocking: {row['blocking_s'] * 1e3:8.1f} ms")
+    print(f"async:    {row['async_s'] * 1e3:8.1f} ms  ({report['waves']} waves, staging busy "
+          f"{report['stage_seconds'] * 1e3:.1f} ms, compute busy {report['compute_seconds'] * 1e3:.1f} ms)")
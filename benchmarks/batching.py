@@ -0,0 +1,73 @@
+import sys
+import time
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+
+'''
+    @brief: Compares serving B small 4x4 matmuls one launch at a time with a single batch_matmul launch on the
+            same device. A lone 4x4 matmul only fills 64 of the device's lanes, the batched launch packs every
+            product densely, so its throughput grows with B until the device is full.
+
+            Run from the repository root with: python -m benchmarks.batching [backend]
+'''
+
+BATCH_SIZES = [1, 4, 16, 64]
+REPEATS = 3
+
+
+"""
+    @brief: Times one call of fn as the best of REPEATS runs.
+
+    @params: fn -> callable, the work to time.
+    @returns: float, seconds.
+"""
+def best_time(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+"""
+    @brief: Runs the per-pair and the batched launches for every batch size.
+
+    @params: backend -> str, ALU backend of the simulated device.
+    @returns: list[dict], per batch size the time of both approaches and their throughput in matmuls per second.
+"""
+def measure(backend: str) -> list:
+    rng = np.random.default_rng(0)
+    gpu = GPU_SIM(num_sms=4, mem_size=4096, num_warps=8, num_threads_per_warp=32, backend=backend)
+    rows = []
+    for batch in BATCH_SIZES:
+        arr1 = rng.integers(0, 16, (batch, 4, 4))
+        arr2 = rng.integers(0, 16, (batch, 4, 4))
+
+        def per_pair():
+            for b in range(batch):
+                gpu.load_info(arr1[b], arr2[b], operation="matmul")
+                gpu.distribute_data()
+                gpu.run_computation("101")
+                gpu.reconstruct_data()
+
+        def batched():
+            gpu.load_info(arr1, arr2, operation="batch_matmul")
+            gpu.distribute_data()
+            gpu.run_computation("101")
+            assert np.array_equal(gpu.reconstruct_data(), arr1 @ arr2)
+
+        per_pair_s = best_time(per_pair)
+        batched_s = best_time(batched)
+        rows.append({"batch": batch, "per_pair_s": per_pair_s, "batched_s": batched_s,
+                     "per_pair_rate": batch / per_pair_s, "batched_rate": batch / batched_s})
+    return rows
+
+
+if __name__ == "__main__":
+    backend = sys.argv[1] if len(sys.argv) > 1 else "bitslice"
+    print(f"backend={backend}, 4x4 matmuls, 4 SMs x 8 warps x 32 threads")
+    print(f"{'batch':>6} {'per-pair ms':>12} {'batched ms':>11} {'per-pair /s':>12} {'batched /s':>11}")
+    for row in measure(backend):
+        print(f"{row['batch']:>6} {row['per_pair_s'] * 1e3:>12.2f} {row['batched_s'] * 1e3:>11.2f} "
+              f"{row['per_pair_rate']:>12.0f} {row['batched_rate']:>11.0f}")
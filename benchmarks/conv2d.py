@@ -0,0 +1,97 @@
+import sys
+import time
+import tracemalloc
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+from gpu.conv import im2col_view
+from gpu.launch_plan import clear_plan_cache
+
+'''
+    @brief: Compares the peak host memory of a 2-D convolution run as "conv2d", which gathers every patch
+            element straight from the image into the operand registers, with the materialized im2col
+            approach, which builds the (OH * OW, C * KH * KW) patch matrix in NumPy and runs it as a "matmul".
+            Each path runs once untraced to build the device's warps and lookup tables, then the plan cache is
+            cleared and the path runs again under tracemalloc, so its peak covers everything the launch
+            allocates on top of its inputs, planning included.
+
+            Run from the repository root with: python -m benchmarks.conv2d [backend] [size] [kernel]
+'''
+
+CONFIG = dict(num_sms=4, num_warps=8, num_threads_per_warp=32)
+CHANNELS, FILTERS = 4, 2
+
+
+"""
+    @brief: Convolves through a materialized im2col matrix and a plain matmul launch.
+
+    @params: gpu -> GPU_SIM, the device.
+    @params: image -> np.array, (C, H, W) image.
+    @params: kernels -> np.array, (F, C, KH, KW) kernels.
+    @returns: np.array, the (F, OH, OW) output.
+"""
+def im2col_conv(gpu, image: np.array, kernels: np.array) -> np.array:
+    patches = im2col_view(image, kernels.shape)
+    OH, OW = patches.shape[:2]
+    matrix = patches.reshape(OH * OW, -1)  # copies, the view is not contiguous
+    gpu.load_info(matrix, kernels.reshape(len(kernels), -1).T, "matmul", sparse=False)
+    gpu.distribute_data()
+    gpu.run_computation("101")
+    return gpu.reconstruct_data().T.reshape(len(kernels), OH, OW).copy()
+
+
+"""
+    @brief: Convolves through a conv2d launch.
+
+    @params: gpu -> GPU_SIM, the device.
+    @params: image -> np.array, (C, H, W) image.
+    @params: kernels -> np.array, (F, C, KH, KW) kernels.
+    @returns: np.array, the (F, OH, OW) output.
+"""
+def direct_conv(gpu, image: np.array, kernels: np.array) -> np.array:
+    return gpu.conv2d(image, kernels)
+
+
+"""
+    @brief: Runs a convolution once to build the device, then again under tracemalloc with a cold plan cache.
+
+    @params: conv -> callable, im2col_conv or direct_conv.
+    @params: gpu -> GPU_SIM, the device.
+    @params: image -> np.array, (C, H, W) image.
+    @params: kernels -> np.array, (F, C, KH, KW) kernels.
+    @returns: tuple, the output, the peak bytes allocated during the run and its seconds.
+"""
+def measure(conv, gpu, image: np.array, kernels: np.array) -> tuple:
+    conv(gpu, image, kernels)
+    clear_plan_cache()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = conv(gpu, image, kernels)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak, seconds
+
+
+if __name__ == "__main__":
+    backend = sys.argv[1] if len(sys.argv) > 1 else "lut"
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    kernel = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 16, (CHANNELS, size, size))
+    kernels = rng.integers(0, 16, (FILTERS, CHANNELS, kernel, kernel))
+    gpu = GPU_SIM(mem_size=FILTERS * size * size, backend=backend, **CONFIG)
+
+    materialized, im2col_peak, im2col_s = measure(im2col_conv, gpu, image, kernels)
+    direct, direct_peak, direct_s = measure(direct_conv, gpu, image, kernels)
+    assert np.array_equal(materialized, direct)
+    report = gpu.conv_report()
+
+    print(f"backend={backend}, image {report['image']}, kernels {report['kernels']}, "
+          f"{report['patches']} patches of {report['patch_size']}, {report['products']} products")
+    print(f"inputs:           {report['input_bytes'] / 2**10:10.1f} KiB, plan {report['plan_bytes'] / 2**10:.1f} KiB, "
+          f"indices of a wave {report['wave_index_bytes'] / 2**10:.1f} KiB")
+    print(f"im2col + matmul:  {im2col_peak / 2**10:10.1f} KiB peak during the launch "
+          f"({report['im2col_bytes'] / 2**10:.1f} KiB patch matrix), {im2col_s * 1e3:9.1f} ms")
+    print(f"conv2d:           {direct_peak / 2**10:10.1f} KiB peak during the launch, {direct_s * 1e3:9.1f} ms")
+    print(f"measured peak {im2col_peak / max(direct_peak, 1):.1f}x lower, "
+          f"conv_report() estimate {report['memory_reduction']:.1f}x lower")
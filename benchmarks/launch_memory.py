@@ -0,0 +1,51 @@
+import sys
+import tracemalloc
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+
+'''
+    @brief: Measures the memory allocated by each launch (load_info -> distribute_data -> run_computation ->
+            reconstruct_data) on one GPU_SIM over repeated runs, with tracemalloc (NumPy reports its buffers to
+            it). The SMs' register files are allocated once at construction, so the per-launch peak should be
+            the same on every run and the retained memory should not grow.
+
+            Run from the repository root with: python -m benchmarks.launch_memory [backend]
+'''
+
+LAUNCHES = 10
+
+
+"""
+    @brief: Runs LAUNCHES identical matmul launches and records the memory of each.
+
+    @params: backend -> str, ALU backend of the simulated device.
+    @returns: list[dict], per launch the peak bytes allocated during it and the bytes still held after it.
+"""
+def measure(backend: str) -> list:
+    rng = np.random.default_rng(0)
+    arr1 = rng.integers(0, 16, (16, 16))
+    arr2 = rng.integers(0, 16, (16, 16))
+    gpu = GPU_SIM(num_sms=4, mem_size=1024, num_warps=8, num_threads_per_warp=32, backend=backend)
+
+    rows = []
+    tracemalloc.start()
+    for launch in range(LAUNCHES):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        gpu.load_info(arr1, arr2, operation="matmul")
+        gpu.distribute_data()
+        gpu.run_computation("101")
+        result = gpu.reconstruct_data()
+        current, peak = tracemalloc.get_traced_memory()
+        rows.append({"launch": launch, "peak_bytes": peak - before, "retained_bytes": current - before})
+        assert np.array_equal(result, arr1 @ arr2)
+    tracemalloc.stop()
+    return rows
+
+
+if __name__ == "__main__":
+    backend = sys.argv[1] if len(sys.argv) > 1 else "bitslice"
+    print(f"backend={backend}, 16x16 matmul, 4 SMs x 8 warps x 32 threads")
+    print(f"{'launch':>6} {'peak KiB':>10} {'retained KiB':>13}")
+    for row in measure(backend):
+        print(f"{row['launch']:>6} {row['peak_bytes'] / 1024:>10.1f} {row['retained_bytes'] / 1024:>13.1f}")
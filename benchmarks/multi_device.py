@@ -0,0 +1,56 @@
+import sys
+import numpy as np
+from gpu.device_group import DeviceGroup
+
+'''
+    @brief: Runs the same matmul and dot product on device groups of growing size and prints, per sharding
+            and all-reduce, the wall time, the load imbalance and the bytes moved between the host and the
+            devices and among the devices.
+
+            Run from the repository root with: python -m benchmarks.multi_device [backend] [size]
+'''
+
+DEVICE_COUNTS = (1, 2, 4)
+CONFIG = dict(num_sms=4, num_warps=8, num_threads_per_warp=32)
+CASES = (("matmul", "rows", None), ("matmul", "k", "ring"), ("matmul", "k", "tree"), ("dot", None, "ring"), ("dot", None, "tree"))
+
+
+"""
+    @brief: Runs every case on a group of num_devices devices and checks the results.
+
+    @params: num_devices -> int, the devices in the group.
+    @params: backend -> str, ALU backend of every device.
+    @params: size -> int, the matmul is size x size, the dot product has size^2 elements.
+    @returns: list[dict], the group report of every case.
+"""
+def measure(num_devices: int, backend: str, size: int) -> list:
+    rng = np.random.default_rng(0)
+    arr1, arr2 = rng.integers(0, 16, (size, size)), rng.integers(0, 16, (size, size))
+    group = DeviceGroup(num_devices, backend=backend, mem_size=size * size, **CONFIG)
+    reports = []
+    try:
+        # Build every device's lookup tables and warps before timing
+        group.dot(arr1[:num_devices], arr2[:num_devices])
+        for operation, shard, all_reduce in CASES:
+            if operation == "matmul":
+                assert np.array_equal(group.matmul(arr1, arr2, shard, all_reduce), arr1 @ arr2)
+            else:
+                assert group.dot(arr1, arr2, all_reduce) == int(arr1.reshape(-1) @ arr2.reshape(-1))
+            reports.append(dict(group.report(), shard=shard))
+    finally:
+        group.close()
+    return reports
+
+
+if __name__ == "__main__":
+    backend = sys.argv[1] if len(sys.argv) > 1 else "lut"
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 48
+    print(f"backend={backend}, {size} x {size} inputs, devices of {CONFIG['num_sms']} SMs x {CONFIG['num_warps']} warps x "
+          f"{CONFIG['num_threads_per_warp']} threads")
+    print(f"{'devices':>7} {'operation':<9} {'shard':<5} {'reduce':<6} {'ms':>9} {'imbalance':>9} "
+          f"{'host->dev B':>12} {'dev->host B':>12} {'dev<->dev B':>12}")
+    for num_devices in DEVICE_COUNTS:
+        for report in measure(num_devices, backend, size):
+            print(f"{num_devices:>7} {report['operation']:<9} {report['shard'] or '-':<5} {report['all_reduce'] or '-':<6} "
+                  f"{report['seconds'] * 1e3:>9.1f} {report['load_imbalance']:>9.2f} {report['host_to_device_bytes']:>12} "
+                  f"{report['device_to_host_bytes']:>12} {report['device_to_device_bytes']:>12}")
@@ -0,0 +1,93 @@
+import time
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+
+'''
+    @brief: Benchmark for the matmul reduction step of GPU_SIM.run_computation. For growing square inputs it
+            times the vectorized scatter-add (GPU_SIM.reduce_results) next to the old per-product sum_map dict
+            loop, and prints the cost per product so linear scaling in m*n*k shows up as a flat column.
+
+            Run from the repository root with: python -m benchmarks.reduction_scaling
+'''
+
+SIZES = [8, 16, 24, 32, 48, 64]
+REPEATS = 5
+
+
+"""
+    @brief: The reduction GPU_SIM used before task_map became an index array, kept here as the reference.
+
+    @params: task_map -> list[tuple[int, int, int]], (i, j, k) of every lane, padding included.
+    @params: all_results -> np.array, the concatenated SM results.
+    @params: output_shape -> tuple[int, int], (m, n) of the result.
+    @returns: np.array, the (m, n) matmul result.
+"""
+def dict_reduction(task_map: list, all_results: np.array, output_shape: tuple) -> np.array:
+    result = np.zeros(output_shape, dtype=np.int32)
+    sum_map = {}
+    for idx, (i, j, k_idx) in enumerate(task_map):
+        if (i, j) not in sum_map:
+            sum_map[(i, j)] = 0
+        sum_map[(i, j)] += int(all_results[idx])
+    for (i, j), val in sum_map.items():
+        result[i, j] = val
+    return result
+
+
+"""
+    @brief: Returns the best wall time of a callable over REPEATS runs.
+"""
+def best_time(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+"""
+    @brief: Times both reductions for one square size, using a device large enough to run a single wave.
+
+    @params: size -> int, m = n = k of the inputs.
+    @returns: dict, the product count and the two timings in seconds.
+"""
+def measure(size: int) -> dict:
+    rng = np.random.default_rng(size)
+    arr1 = rng.integers(0, 16, (size, size))
+    arr2 = rng.integers(0, 16, (size, size))
+    products = size ** 3
+
+    num_threads_per_warp = 32
+    num_warps = (products + 4 * num_threads_per_warp - 1) // (4 * num_threads_per_warp)
+    gpu = GPU_SIM(num_sms=4, mem_size=size * size, num_warps=num_warps,
+                  num_threads_per_warp=num_threads_per_warp, backend="bitslice")
+    gpu.load_info(arr1, arr2, operation="matmul")
+    gpu.distribute_data()
+    gpu.run_computation("101")
+    assert np.array_equal(gpu.reconstruct_data(), arr1 @ arr2)
+
+    all_results = np.concatenate([sm.send_info() for sm in gpu.sm_list])
+    n = arr2.shape[1]
+    flat = np.where(gpu.task_mask, gpu.task_map, 0)
+    legacy_map = list(zip((flat // n).tolist(), (flat % n).tolist(), [0] * len(flat)))
+
+    def vectorized():
+        gpu.global_memory[:size * size] = 0
+        gpu.reduce_results(all_results)
+
+    return {
+        "size": size,
+        "products": products,
+        "vectorized_s": best_time(vectorized),
+        "dict_s": best_time(lambda: dict_reduction(legacy_map, all_results, gpu.output_shape)),
+    }
+
+
+if __name__ == "__main__":
+    print(f"{'m=n=k':>6} {'m*n*k':>9} {'scatter-add ms':>15} {'ns/product':>11} {'dict loop ms':>13} {'ns/product':>11}")
+    for size in SIZES:
+        row = measure(size)
+        print(f"{row['size']:>6} {row['products']:>9} "
+              f"{row['vectorized_s'] * 1e3:>15.3f} {row['vectorized_s'] / row['products'] * 1e9:>11.2f} "
+              f"{row['dict_s'] * 1e3:>13.3f} {row['dict_s'] / row['products'] * 1e9:>11.2f}")
@@ -0,0 +1,103 @@
+import sys
+import time
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+from gpu.launch_plan import get_plan
+
+'''
+    @brief: Compares the operand traffic and staging time of "matmul", which gathers a fresh operand pair from
+            global memory for every (i, j, k) product, with "shared_matmul", whose SMs load input tiles into
+            shared memory once and fill their operand registers from there.
+
+            A 512 x 512 "matmul" runs 134M products, so its staging time (computing the indices of a wave and
+            gathering its operands) is measured on the first SAMPLE_WAVES waves and projected to all of them.
+            The shared path loads every tile for real. Compute is not run at this size, a small launch of both
+            operations checks the results instead.
+
+            Run from the repository root with: python -m benchmarks.shared_memory [size]
+'''
+
+SAMPLE_WAVES = 64
+CONFIG = dict(num_sms=8, num_warps=8, num_threads_per_warp=32)
+
+
+"""
+    @brief: Projects the global -> register staging time of a plain matmul from a sample of its waves.
+
+    @params: gpu -> GPU_SIM, the device.
+    @params: arr1 -> np.array, (m, k) input.
+    @params: arr2 -> np.array, (k, n) input.
+    @returns: dict, the bytes staged and the projected seconds for the whole launch.
+"""
+def measure_matmul(gpu, arr1: np.array, arr2: np.array) -> dict:
+    plan = get_plan("matmul", arr1.shape, arr2.shape, gpu.num_sms, gpu.num_warps, gpu.num_threads_per_warp)
+    sample = min(SAMPLE_WAVES, plan.num_waves)
+    start = time.perf_counter()
+    for wave_idx in range(sample):
+        gpu.stage_wave(plan.wave(wave_idx), arr1, arr2, 0)
+    seconds = (time.perf_counter() - start) * plan.num_waves / sample
+    return {"global_bytes": plan.total_tasks * 2 * arr1.itemsize, "stage_s": seconds}
+
+
+"""
+    @brief: Times the shared-memory loads of every task of a shared_matmul, and projects the shared ->
+            register fills from the passes of the first task.
+
+    @params: gpu -> GPU_SIM, the device.
+    @params: arr1 -> np.array, (m, k) input.
+    @params: arr2 -> np.array, (k, n) input.
+    @returns: dict, the block report plus the seconds of both copies.
+"""
+def measure_shared(gpu, arr1: np.array, arr2: np.array) -> dict:
+    gpu.load_info(arr1, arr2, "shared_matmul")
+    gpu.distribute_data()
+    report = gpu.block_report()
+    padded1, padded2 = gpu.operand_sources
+    block_m, block_n, block_k = report["block"]
+    m_blocks, n_blocks, k_blocks = report["blocks"]
+    sm = gpu.sm_list[0]
+
+    start = time.perf_counter()
+    for task in range(m_blocks * n_blocks * k_blocks):
+        bi, bj, bk = np.unravel_index(task, report["blocks"])
+        gpu.sm_list[task % gpu.num_sms].load_shared(
+            padded1[bi * block_m:(bi + 1) * block_m, bk * block_k:(bk + 1) * block_k],
+            padded2[bk * block_k:(bk + 1) * block_k, bj * block_n:(bj + 1) * block_n])
+    load_s = time.perf_counter() - start
+
+    idx1, idx2, _ = gpu.block_lanes
+    capacity = gpu.num_warps * gpu.num_threads_per_warp
+    start = time.perf_counter()
+    for lane_start in range(0, len(idx1), capacity):
+        sm.stage_shared(idx1[lane_start:lane_start + capacity], idx2[lane_start:lane_start + capacity])
+    fill_s = (time.perf_counter() - start) * m_blocks * n_blocks * k_blocks
+    return dict(report, stage_s=load_s, fill_s=fill_s)
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    rng = np.random.default_rng(0)
+
+    small1, small2 = rng.integers(0, 16, (24, 40)), rng.integers(0, 16, (40, 20))
+    gpu = GPU_SIM(mem_size=1024, backend="lut", **CONFIG)
+    for operation in ("matmul", "shared_matmul"):
+        gpu.load_info(small1, small2, operation, sparse=False)
+        gpu.distribute_data()
+        gpu.run_computation("101")
+        assert np.array_equal(gpu.reconstruct_data(), small1 @ small2), operation
+
+    arr1, arr2 = rng.integers(0, 256, (size, size)), rng.integers(0, 256, (size, size))
+    gpu = GPU_SIM(mem_size=size * size, **CONFIG)
+    dense = measure_matmul(gpu, arr1, arr2)
+    shared = measure_shared(gpu, arr1, arr2)
+
+    print(f"{size} x {size} matmul on {CONFIG['num_sms']} SMs x {CONFIG['num_warps']} warps x "
+          f"{CONFIG['num_threads_per_warp']} threads, block {shared['block']}")
+    print(f"matmul:        {dense['global_bytes'] / 2**20:10.1f} MiB global -> registers, "
+          f"staging {dense['stage_s'] * 1e3:9.1f} ms (projected from {SAMPLE_WAVES} waves)")
+    print(f"shared_matmul: {shared['global_to_shared_bytes'] / 2**20:10.1f} MiB global -> shared, "
+          f"staging {shared['stage_s'] * 1e3:9.1f} ms")
+    print(f"               {shared['shared_to_register_bytes'] / 2**20:10.1f} MiB shared -> registers inside the SMs, "
+          f"{shared['fill_s'] * 1e3:.1f} ms (projected from one block)")
+    print(f"global traffic {dense['global_bytes'] / shared['global_to_shared_bytes']:.0f}x lower, "
+          f"staging {dense['stage_s'] / shared['stage_s']:.0f}x faster")
@@ -0,0 +1,61 @@
+import time
+import tracemalloc
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+
+'''
+    @brief: Measures how long it takes to construct a simulated device and how much memory it holds, for a few
+            device sizes. ALUs and warps are built on first use and the Control, Multiplexer and adder units are
+            shared between every ALU of the same width, so construction cost should stay small even for large
+            devices. After a small launch the number of warps and ALUs actually built is reported as well.
+
+            Run from the repository root with: python -m benchmarks.startup [backend]
+'''
+
+# (num_sms, num_warps, num_threads_per_warp)
+DEVICES = [(2, 2, 4), (16, 16, 32), (80, 32, 32)]
+
+
+"""
+    @brief: Builds one device, runs a 4x4 matmul on it and counts what was materialized.
+
+    @params: device -> tuple, (num_sms, num_warps, num_threads_per_warp).
+    @params: backend -> str, ALU backend of the simulated device.
+    @returns: dict, construction time, memory held after construction and the warps/ALUs built by the launch.
+"""
+def measure(device: tuple, backend: str) -> dict:
+    num_sms, num_warps, num_threads_per_warp = device
+    tracemalloc.start()
+    start = time.perf_counter()
+    gpu = GPU_SIM(num_sms=num_sms, mem_size=1024, num_warps=num_warps,
+                  num_threads_per_warp=num_threads_per_warp, backend=backend)
+    construct_s = time.perf_counter() - start
+    construct_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    arr = np.arange(16).reshape(4, 4) % 7
+    gpu.load_info(arr, arr, operation="matmul")
+    gpu.distribute_data()
+    gpu.run_computation("101")
+    assert np.array_equal(gpu.reconstruct_data(), arr @ arr)
+
+    warps = [warp for sm in gpu.sm_list for warp in sm.warps if warp is not None]
+    return {
+        "device": f"{num_sms}x{num_warps}x{num_threads_per_warp}",
+        "threads": num_sms * num_warps * num_threads_per_warp,
+        "construct_ms": construct_s * 1e3,
+        "construct_kib": construct_bytes / 1024,
+        "warps_built": len(warps),
+        "alus_built": sum(len(warp.alus) for warp in warps),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    backend = sys.argv[1] if len(sys.argv) > 1 else "scalar"
+    print(f"backend={backend}")
+    print(f"{'device':>10} {'threads':>8} {'construct ms':>13} {'KiB':>9} {'warps built':>12} {'ALUs built':>11}")
+    for device in DEVICES:
+        row = measure(device, backend)
+        print(f"{row['device']:>10} {row['threads']:>8} {row['construct_ms']:>13.2f} {row['construct_kib']:>9.1f} "
+              f"{row['warps_built']:>12} {row['alus_built']:>11}")
@@ -0,0 +1,45 @@
+import sys
+import time
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+from gpu.strassen import StrassenPlanner
+
+'''
+    @brief: Multiplies the same square matrices with a plain matmul launch and with the Strassen planner at a
+            few cutoffs, and prints the wall time, the MUL dispatches and the ADD / SUB lanes of each.
+
+            Run from the repository root with: python -m benchmarks.strassen [backend] [size]
+'''
+
+CUTOFFS = (64, 32, 16)
+CONFIG = dict(num_sms=4, num_warps=8, num_threads_per_warp=32)
+
+
+if __name__ == "__main__":
+    backend = sys.argv[1] if len(sys.argv) > 1 else "bitslice"
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 128
+    rng = np.random.default_rng(0)
+    arr1, arr2 = rng.integers(1, 256, (size, size)), rng.integers(1, 256, (size, size))
+    expected = arr1 @ arr2
+    gpu = GPU_SIM(mem_size=size * size, backend=backend, **CONFIG)
+
+    start = time.perf_counter()
+    gpu.load_info(arr1, arr2, "matmul")
+    gpu.distribute_data()
+    gpu.run_computation("101")
+    assert np.array_equal(gpu.reconstruct_data(), expected)
+    plain_s = time.perf_counter() - start
+
+    print(f"backend={backend}, {size} x {size} matmul")
+    print(f"{'path':<16} {'ms':>9} {'MULs':>10} {'saved':>7} {'ADD/SUB lanes':>14} {'launches':>9}")
+    print(f"{'plain':<16} {plain_s * 1e3:>9.1f} {size ** 3:>10} {'':>7} {0:>14} {1:>9}")
+    for cutoff in CUTOFFS:
+        planner = StrassenPlanner(gpu, cutoff)
+        start = time.perf_counter()
+        assert np.array_equal(planner.matmul(arr1, arr2), expected)
+        seconds = time.perf_counter() - start
+        report = planner.report()
+        planner.close()
+        print(f"{f'strassen <= {cutoff}':<16} {seconds * 1e3:>9.1f} {report['mul_dispatches']:>10} "
+              f"{report['mul_saved'] / report['standard_mul_dispatches']:>7.1%} {report['add_sub_dispatches']:>14} "
+              f"{report['matmul_launches'] + report['add_sub_launches']:>9}")
@@ -0,0 +1,306 @@
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+
+'''
+    @brief: Benchmark suite for the simulator's hot paths. Every case builds a GPU_SIM for one point of the
+            sweep (operation, input size, num_sms, num_warps, num_threads_per_warp, num_bits, backend, adder,
+            multiplier, num_workers) and times load_info, distribute_data, run_computation and
+            reconstruct_data separately.
+
+            Run from the repository root:
+                python -m benchmarks.suite run --output results.json
+                python -m benchmarks.suite run --quick --baseline baseline.json
+                python -m benchmarks.suite compare baseline.json results.json --threshold 0.15
+
+            "compare" (or "run --baseline") flags every stage that got slower than the baseline by more than
+            the threshold, lists the cases found in only one of the two outputs, and exits with status 1 when
+            there is at least one regression or when no case is in both.
+'''
+
+STAGES = ["load_info", "distribute_data", "run_computation", "reconstruct_data"]
+
+DEFAULT_SWEEP = {
+    "operation": ["dot", "matmul"],
+    "size": [16, 256],  # vector length for dot, m = n = k for matmul (sizes above 32 only run for dot)
+    "num_sms": [1, 4],
+    "num_warps": [2, 8],
+    "num_threads_per_warp": [8, 32],
+    "num_bits": [4, 8],
+    "backend": ["scalar", "bitslice", "lut"],
+    "adder": ["ripple"],
+    "multiplier": ["native"],
+    "num_workers": [0],
+}
+
+QUICK_SWEEP = {
+    "operation": ["dot", "matmul"],
+    "size": [16, 256],
+    "num_sms": [2],
+    "num_warps": [4],
+    "num_threads_per_warp": [8],
+    "num_bits": [8],
+    "backend": ["scalar", "bitslice", "lut"],
+    "adder": ["ripple"],
+    "multiplier": ["native"],
+    "num_workers": [0],
+}
+
+MAX_MATMUL_SIZE = 32
+
+# Parameters added to the sweep after baselines may have been saved, filled in for cases that lack them
+CASE_DEFAULTS = {
+    "adder": "ripple",
+    "multiplier": "native",
+}
+
+
+"""
+    @brief: Expands a sweep into the list of cases it covers.
+
+    @params: sweep -> dict, parameter name -> list of values.
+    @returns: list[dict], one parameter dict per case.
+"""
+def expand_sweep(sweep: dict) -> list:
+    names = list(sweep.keys())
+    cases = []
+    for values in itertools.product(*(sweep[name] for name in names)):
+        params = dict(zip(names, values))
+        if params["operation"] == "matmul" and params["size"] > MAX_MATMUL_SIZE:
+            continue
+        cases.append(params)
+    return cases
+
+
+"""
+    @brief: Builds a stable identifier for a case, used to match results against a baseline. Parameters of
+            CASE_DEFAULTS missing from params take their default, so cases saved before the parameter
+            existed still match.
+"""
+def case_id(params: dict) -> str:
+    params = dict(CASE_DEFAULTS, **params)
+    return ",".join(f"{name}={params[name]}" for name in sorted(params))
+
+
+"""
+    @brief: Creates deterministic inputs for a case. Values stay below 16 so products fit every num_bits.
+"""
+def make_inputs(params: dict):
+    rng = np.random.default_rng(params["size"])
+    high = min(16, 1 << params["num_bits"])
+    if params["operation"] == "dot":
+        shape1 = shape2 = (params["size"],)
+    else:
+        shape1 = shape2 = (params["size"], params["size"])
+    return rng.integers(0, high, shape1), rng.integers(0, high, shape2)
+
+
+"""
+    @brief: Runs one case and times each pipeline stage.
+
+    @params: params -> dict, the case parameters.
+    @params: repeats -> int, number of timed launches, the median of each stage is kept.
+    @returns: dict, the case id, its parameters, the median seconds per stage and their total.
+"""
+def run_case(params: dict, repeats: int) -> dict:
+    arr1, arr2 = make_inputs(params)
+    expected = int(arr1 @ arr2) if params["operation"] == "dot" else arr1 @ arr2
+    out_size = 1 if params["operation"] == "dot" else params["size"] ** 2
+
+    gpu = GPU_SIM(num_sms=params["num_sms"], mem_size=max(1024, out_size), num_warps=params["num_warps"],
+                  num_threads_per_warp=params["num_threads_per_warp"], num_bits=params["num_bits"],
+                  backend=params["backend"], adder=params["adder"],
+                  multiplier=params["multiplier"], num_workers=params["num_workers"])
+    samples = {stage: [] for stage in STAGES}
+    try:
+        # Warm-up launch, fills lookup tables and worker processes before anything is timed
+        for run in range(repeats + 1):
+            start = time.perf_counter()
+            gpu.load_info(arr1, arr2, operation=params["operation"])
+            loaded = time.perf_counter()
+            gpu.distribute_data()
+            distributed = time.perf_counter()
+            gpu.run_computation("101")
+            computed = time.perf_counter()
+            result = gpu.reconstruct_data()
+            reconstructed = time.perf_counter()
+
+            assert np.array_equal(result, expected), f"Wrong result for {case_id(params)}"
+            if run == 0:
+                continue
+            samples["load_info"].append(loaded - start)
+            samples["distribute_data"].append(distributed - loaded)
+            samples["run_computation"].append(computed - distributed)
+            samples["reconstruct_data"].append(reconstructed - computed)
+    finally:
+        gpu.close()
+
+    timings = {stage: statistics.median(values) for stage, values in samples.items()}
+    return {"case": case_id(params), "params": params, "timings": timings, "total": sum(timings.values())}
+
+
+"""
+    @brief: Runs every case of a sweep.
+
+    @params: sweep -> dict, parameter name -> list of values.
+    @params: repeats -> int, timed launches per case.
+    @returns: dict, run metadata and the per-case results, ready to be written as JSON.
+"""
+def run_suite(sweep: dict, repeats: int) -> dict:
+    cases = expand_sweep(sweep)
+    results = []
+    for idx, params in enumerate(cases):
+        row = run_case(params, repeats)
+        results.append(row)
+        print(f"[{idx + 1}/{len(cases)}] {row['case']}: {row['total'] * 1e3:.3f} ms", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeats": repeats,
+            "sweep": sweep,
+        },
+        "results": results,
+    }
+
+
+"""
+    @brief: Compares two suite outputs stage by stage.
+
+    @params: baseline -> dict, a saved suite output.
+    @params: current -> dict, the suite output to check.
+    @params: threshold -> float, allowed relative slowdown (0.1 = 10%).
+    @params: min_seconds -> float, slowdowns smaller than this are treated as noise.
+    @returns: list[dict], one row per (case, stage) present in both, with a "regression" flag.
+"""
+def compare(baseline: dict, current: dict, threshold: float, min_seconds: float) -> list:
+    baseline_rows = {case_id(row["params"]): row for row in baseline["results"]}
+    rows = []
+    for row in current["results"]:
+        base = baseline_rows.get(case_id(row["params"]))
+        if base is None:
+            continue
+        for stage in STAGES + ["total"]:
+            old = base["total"] if stage == "total" else base["timings"][stage]
+            new = row["total"] if stage == "total" else row["timings"][stage]
+            ratio = new / old if old > 0 else float("inf")
+            rows.append({
+                "case": row["case"],
+                "stage": stage,
+                "baseline": old,
+                "current": new,
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold and new - old > min_seconds,
+            })
+    return rows
+
+
+"""
+    @brief: Prints the per-case timings of a suite output as a table.
+"""
+def print_results(output: dict):
+    print(f"{'case':<110} " + " ".join(f"{stage:>16}" for stage in STAGES) + f" {'total':>10}")
+    for row in output["results"]:
+        cells = " ".join(f"{row['timings'][stage] * 1e3:>13.3f} ms" for stage in STAGES)
+        print(f"{row['case']:<110} {cells} {row['total'] * 1e3:>7.3f} ms")
+
+
+"""
+    @brief: Lists the cases of two suite outputs that have no match in the other one.
+
+    @params: baseline -> dict, a saved suite output.
+    @params: current -> dict, the suite output to check.
+    @returns: tuple[list, list], the ids of the current cases missing from the baseline and of the baseline
+              cases missing from the current output.
+"""
+def unmatched_cases(baseline: dict, current: dict) -> tuple:
+    baseline_ids = [case_id(row["params"]) for row in baseline["results"]]
+    current_ids = [case_id(row["params"]) for row in current["results"]]
+    baseline_set, current_set = set(baseline_ids), set(current_ids)
+    return ([case for case in current_ids if case not in baseline_set],
+            [case for case in baseline_ids if case not in current_set])
+
+
+"""
+    @brief: Prints the regressions found by compare() and the unmatched cases, and returns the exit status:
+            1 when there is a regression or when no case could be compared, else 0.
+"""
+def print_comparison(rows: list, threshold: float, baseline: dict, current: dict) -> int:
+    regressions = [row for row in rows if row["regression"]]
+    print(f"\nCompared {len(rows)} stage timings, threshold {threshold:.0%}: {len(regressions)} regression(s)")
+    for row in regressions:
+        print(f"  REGRESSION {row['case']} [{row['stage']}]: "
+              f"{row['baseline'] * 1e3:.3f} ms -> {row['current'] * 1e3:.3f} ms ({row['ratio']:.2f}x)")
+    current_only, baseline_only = unmatched_cases(baseline, current)
+    for label, cases in (("not in the baseline", current_only), ("missing from the current run", baseline_only)):
+        if cases:
+            print(f"{len(cases)} case(s) {label}:")
+            for case in cases:
+                print(f"  {case}")
+    if not rows:
+        print("No case is in both outputs, nothing was compared.")
+        return 1
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="GPU_SIM benchmark suite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the sweep and write the timings as JSON")
+    run_parser.add_argument("--output", help="JSON file to write the results to")
+    run_parser.add_argument("--baseline", help="saved JSON results to compare against")
+    run_parser.add_argument("--quick", action="store_true", help="run the small sweep")
+    run_parser.add_argument("--repeats", type=int, default=3)
+    run_parser.add_argument("--threshold", type=float, default=0.10)
+    run_parser.add_argument("--min-seconds", type=float, default=1e-4)
+    for name, values in DEFAULT_SWEEP.items():
+        value_type = str if isinstance(values[0], str) else int
+        run_parser.add_argument(f"--{name.replace('_', '-')}", dest=name, nargs="+", type=value_type,
+                                help=f"override the swept values of {name}")
+
+    compare_parser = commands.add_parser("compare", help="compare two saved JSON results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    compare_parser.add_argument("--min-seconds", type=float, default=1e-4)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        rows = compare(baseline, current, args.threshold, args.min_seconds)
+        return print_comparison(rows, args.threshold, baseline, current)
+
+    sweep = dict(QUICK_SWEEP if args.quick else DEFAULT_SWEEP)
+    for name in DEFAULT_SWEEP:
+        if getattr(args, name) is not None:
+            sweep[name] = getattr(args, name)
+
+    output = run_suite(sweep, args.repeats)
+    print_results(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, output, args.threshold, args.min_seconds)
+        return print_comparison(rows, args.threshold, baseline, output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+'''
+    @brief: Reads the shapes of a conv2d launch. The image is (C, H, W), or (H, W) for one channel, the kernels
+            (F, C, KH, KW), or (KH, KW) for a single one-channel filter. The convolution is "valid" with stride 1,
+            like np.correlate: output[f, y, x] = sum over c, ky, kx of image[c, y + ky, x + kx] * kernels[f, c, ky, kx].
+
+    @params: shape1 -> tuple, shape of the image.
+    @params: shape2 -> tuple, shape of the kernels.
+    @returns: tuple, (C, H, W, F, KH, KW, OH, OW).
+'''
+def conv_shapes(shape1: tuple, shape2: tuple) -> tuple:
+    assert len(shape1) in (2, 3), "conv2d takes a (C, H, W) or (H, W) image."
+    assert len(shape2) in (2, 4), "conv2d takes (F, C, KH, KW) or (KH, KW) kernels."
+    C, H, W = (1,) * (3 - len(shape1)) + tuple(shape1)
+    F, KC, KH, KW = (1,) * (4 - len(shape2)) + tuple(shape2)
+    assert KC == C, "The kernels must have as many channels as the image."
+    assert 1 <= KH <= H and 1 <= KW <= W, "The kernels must fit in the image."
+    return C, H, W, F, KH, KW, H - KH + 1, W - KW + 1
+
+'''
+    @brief: The patch matrix of a conv2d as a strided view of the image, no data is copied. Row (y, x) of the
+            view is the patch under output pixel (y, x), so view.reshape(OH * OW, C * KH * KW) is the im2col
+            matrix, which that reshape would materialize. conv2d launches do not index the view, their waves
+            gather the same elements from the flat image through patch_index.
+
+    @params: image -> np.array, (C, H, W) or (H, W) image.
+    @params: kernel_shape -> tuple, shape of the kernels.
+    @returns: np.array, read-only (OH, OW, C, KH, KW) view of the image.
+'''
+def im2col_view(image: np.array, kernel_shape: tuple) -> np.array:
+    C, H, W, _, KH, KW, _, _ = conv_shapes(image.shape, kernel_shape)
+    windows = sliding_window_view(image.reshape(C, H, W), (KH, KW), axis=(1, 2))  # (C, OH, OW, KH, KW)
+    return windows.transpose(1, 2, 0, 3, 4)
+
+'''
+    @brief: Flat indices into the image of elements of the im2col matrix, i.e. the offsets the strided view reads
+            them from, so gathering them copies the patches straight out of the image buffer.
+
+    @params: shape1 -> tuple, shape of the image.
+    @params: shape2 -> tuple, shape of the kernels.
+    @params: patch -> np.array, int64 row of every element, the output pixel y * OW + x.
+    @params: element -> np.array, int64 column of every element, (c * KH + ky) * KW + kx.
+    @returns: np.array, int64 flat index into the image of every element.
+'''
+def patch_index(shape1: tuple, shape2: tuple, patch: np.array, element: np.array) -> np.array:
+    _, H, W, _, KH, KW, _, OW = conv_shapes(shape1, shape2)
+    y, x = np.divmod(patch, OW)
+    c, rest = np.divmod(element, KH * KW)
+    ky, kx = np.divmod(rest, KW)
+    return (c * H + y + ky) * W + x + kx
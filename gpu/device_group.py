@@ -0,0 +1,355 @@
+import multiprocessing as mp
+import threading
+import time
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+
+HOST = "host"  # peer name of the host process on the transport
+ALL_REDUCES = ("ring", "tree")
+
+'''
+    @brief: Counts the data bytes of a message, the nbytes of every array in it. Everything else (opcodes,
+            shapes, statistics) is control data and counts nothing.
+
+    @params: payload -> object, an array or a tuple / list holding arrays.
+    @returns: int, the bytes.
+'''
+def payload_bytes(payload) -> int:
+    if isinstance(payload, np.ndarray):
+        return payload.nbytes
+    if isinstance(payload, (tuple, list)):
+        return sum(payload_bytes(item) for item in payload)
+    return 0
+
+
+class LocalTransport:
+    '''
+        @brief: Local stand-in for the interconnect of a device group. Every pair of processes (the host and
+                the devices) shares a multiprocessing pipe, and every send and receive is counted per peer,
+                so communication volume can be studied without real links.
+
+        @params: rank -> int or str, this endpoint, a device index or HOST.
+        @params: links -> dict, peer -> Connection.
+        @params: bytes_sent -> dict, peer -> data bytes sent to it.
+        @params: bytes_received -> dict, peer -> data bytes received from it.
+        @params: messages -> int, messages sent.
+    '''
+    __slots__ = ("rank", "links", "bytes_sent", "bytes_received", "messages")
+
+    def __init__(self, rank, links: dict):
+        self.rank = rank
+        self.links = links
+        self.bytes_sent = dict.fromkeys(links, 0)
+        self.bytes_received = dict.fromkeys(links, 0)
+        self.messages = 0
+
+    '''
+        @brief: Builds the full mesh of pipes between the host and num_devices devices.
+
+        @params: num_devices -> int, the number of devices.
+        @returns: dict, rank -> {peer: Connection}, the links of every endpoint, HOST included.
+    '''
+    @staticmethod
+    def mesh(num_devices: int) -> dict:
+        ranks = [HOST] + list(range(num_devices))
+        links = {rank: {} for rank in ranks}
+        for a, rank_a in enumerate(ranks):
+            for rank_b in ranks[a + 1:]:
+                conn_a, conn_b = mp.Pipe()
+                links[rank_a][rank_b] = conn_a
+                links[rank_b][rank_a] = conn_b
+        return links
+
+    '''
+        @brief: Sends a message to a peer.
+
+        @params: peer -> int or str, the receiving endpoint.
+        @params: payload -> object, any picklable message.
+    '''
+    def send(self, peer, payload):
+        self.links[peer].send(payload)
+        self.bytes_sent[peer] += payload_bytes(payload)
+        self.messages += 1
+
+    '''
+        @brief: Blocks until a message from a peer arrives.
+
+        @params: peer -> int or str, the sending endpoint.
+        @returns: object, the message.
+    '''
+    def recv(self, peer):
+        payload = self.links[peer].recv()
+        self.bytes_received[peer] += payload_bytes(payload)
+        return payload
+
+    '''
+        @brief: Sends to one peer while receiving from another, so a ring of exchanges cannot deadlock on full
+                pipe buffers.
+
+        @params: send_peer -> int or str, the peer to send to.
+        @params: payload -> object, the message to send.
+        @params: recv_peer -> int or str, the peer to receive from.
+        @returns: object, the received message.
+    '''
+    def exchange(self, send_peer, payload, recv_peer):
+        sender = threading.Thread(target=self.send, args=(send_peer, payload))
+        sender.start()
+        received = self.recv(recv_peer)
+        sender.join()
+        return received
+
+    '''
+        @brief: Closes every link of this endpoint.
+    '''
+    def close(self):
+        for conn in self.links.values():
+            conn.close()
+
+'''
+    @brief: Ring all-reduce (sum). The data is cut into num_devices chunks. In num_devices - 1 reduce-scatter
+            steps every device passes one chunk to its right neighbour and adds the chunk arriving from its
+            left one, after which device r holds the full sum of chunk r + 1. As many all-gather steps pass
+            the finished chunks around the ring. Every device sends 2 * (N - 1) / N of the data in total,
+            independent of N.
+
+    @params: transport -> LocalTransport, the endpoint of this device.
+    @params: num_devices -> int, the devices in the ring, ranks 0 .. num_devices - 1.
+    @params: data -> np.array, int64 partial result of this device.
+    @returns: np.array, the sum over all devices, same shape as data.
+'''
+def ring_all_reduce(transport: LocalTransport, num_devices: int, data: np.array) -> np.array:
+    rank = transport.rank
+    result = data.reshape(-1).copy()
+    chunks = np.array_split(result, num_devices)
+    right, left = (rank + 1) % num_devices, (rank - 1) % num_devices
+    for step in range(num_devices - 1):
+        send_idx, recv_idx = (rank - step) % num_devices, (rank - step - 1) % num_devices
+        chunks[recv_idx] += transport.exchange(right, chunks[send_idx], left)
+    for step in range(num_devices - 1):
+        send_idx, recv_idx = (rank - step + 1) % num_devices, (rank - step) % num_devices
+        chunks[recv_idx][:] = transport.exchange(right, chunks[send_idx], left)
+    return result.reshape(data.shape)
+
+'''
+    @brief: Tree all-reduce (sum) over a binary tree rooted at device 0. Partial sums flow up from the leaves,
+            each device adding its children's, and the root's total is broadcast back down. It takes
+            2 * log2(N) steps instead of the ring's 2 * (N - 1), but every link carries the whole array.
+
+    @params: transport -> LocalTransport, the endpoint of this device.
+    @params: num_devices -> int, the devices in the tree, ranks 0 .. num_devices - 1.
+    @params: data -> np.array, int64 partial result of this device.
+    @returns: np.array, the sum over all devices, same shape as data.
+'''
+def tree_all_reduce(transport: LocalTransport, num_devices: int, data: np.array) -> np.array:
+    rank = transport.rank
+    children = [child for child in (2 * rank + 1, 2 * rank + 2) if child < num_devices]
+    result = data.copy()
+    for child in children:
+        result += transport.recv(child)
+    if rank != 0:
+        parent = (rank - 1) // 2
+        transport.send(parent, result)
+        result = transport.recv(parent)
+    for child in children:
+        transport.send(child, result)
+    return result
+
+'''
+    @brief: Worker loop of a DeviceGroup device. The worker builds its own GPU_SIM and then waits for launches
+            from the host: it runs its shard, all-reduces the partial result with the other devices when the
+            launch asks for it, and sends its result and statistics back. A failed shard still takes part in
+            the all-reduce with zeros, so the other devices never wait forever, and the error is sent to the
+            host.
+
+    @params: rank -> int, index of the device.
+    @params: num_devices -> int, the devices in the group.
+    @params: links -> dict, peer -> Connection, this device's ends of the transport mesh.
+    @params: gpu_kwargs -> dict, GPU_SIM constructor arguments.
+'''
+def _device_worker(rank: int, num_devices: int, links: dict, gpu_kwargs: dict):
+    transport = LocalTransport(rank, links)
+    gpu = GPU_SIM(**gpu_kwargs)
+    all_reduces = {"ring": ring_all_reduce, "tree": tree_all_reduce}
+
+    while True:
+        command = transport.recv(HOST)
+        if command is None:
+            break
+        operation, arr1, arr2, output_shape, all_reduce = command
+        sent_before, received_before = dict(transport.bytes_sent), dict(transport.bytes_received)
+        error = None
+        start = time.perf_counter()
+        try:
+            if arr1.size == 0 or arr2.size == 0:
+                result = np.zeros(output_shape, dtype=np.int64)
+            else:
+                gpu.load_info(arr1, arr2, operation)
+                gpu.distribute_data()
+                gpu.run_computation("101")
+                result = np.asarray(gpu.reconstruct_data(), dtype=np.int64).reshape(output_shape)
+        except Exception as exc:
+            error = exc
+            result = np.zeros(output_shape, dtype=np.int64)
+        compute_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if all_reduce is not None and num_devices > 1:
+            result = all_reduces[all_reduce](transport, num_devices, result)
+        all_reduce_seconds = time.perf_counter() - start
+
+        peers = [peer for peer in links if peer != HOST]
+        stats = {
+            "device": rank,
+            "tasks": int(arr1.size * output_shape[-1]) if operation == "matmul" else int(arr1.size),
+            "compute_seconds": compute_seconds,
+            "all_reduce_seconds": all_reduce_seconds,
+            "bytes_to_devices": sum(transport.bytes_sent[peer] - sent_before[peer] for peer in peers),
+            "bytes_from_devices": sum(transport.bytes_received[peer] - received_before[peer] for peer in peers),
+        }
+        # After an all-reduce every device holds the result, only device 0 sends it back
+        if all_reduce is not None and rank != 0:
+            result = None
+        transport.send(HOST, (result, stats, error))
+
+    gpu.close()
+    transport.close()
+
+
+class DeviceGroup:
+    '''
+        @brief: A group of simulated GPUs, each a GPU_SIM in its own process, connected to each other and to
+                the host through a LocalTransport. A matmul is sharded by rows of arr1 (every device computes
+                a block of output rows, gathered by the host) or along k (every device computes a partial
+                product of the full output, summed with an all-reduce), and a dot product is sharded into
+                contiguous runs and all-reduced. The all-reduce is a ring or a binary tree.
+
+                report() gives, for the last launch, every device's work and time and the bytes moved between
+                the host and the devices and among the devices. Call close() when done.
+
+        @params: num_devices -> int, the number of devices (processes).
+        @params: all_reduce -> str, default all-reduce algorithm, "ring" or "tree".
+        @params: gpu_kwargs -> dict, GPU_SIM constructor arguments of every device (num_sms, mem_size, ...). A
+                 device only holds its shard, so mem_size must fit a shard's output.
+    '''
+    def __init__(self, num_devices: int, all_reduce: str = "ring", **gpu_kwargs):
+        assert num_devices >= 1, "A device group needs at least one device."
+        if all_reduce not in ALL_REDUCES:
+            raise ValueError(f"Unknown all-reduce '{all_reduce}', expected one of {ALL_REDUCES}.")
+        self.num_devices = num_devices
+        self.all_reduce = all_reduce
+        self.gpu_kwargs = gpu_kwargs
+        self.last_report = None
+
+        links = LocalTransport.mesh(num_devices)
+        self.transport = LocalTransport(HOST, links.pop(HOST))
+        self.processes = []
+        for rank in range(num_devices):
+            process = mp.Process(target=_device_worker, args=(rank, num_devices, links[rank], gpu_kwargs), daemon=True)
+            process.start()
+            self.processes.append(process)
+        # The device ends now live in the workers
+        for device_links in links.values():
+            for conn in device_links.values():
+                conn.close()
+
+    '''
+        @brief: Multiplies two matrices on the group.
+
+        @params: arr1 -> np.array, (m, k) input.
+        @params: arr2 -> np.array, (k, n) input.
+        @params: shard -> str, "rows" splits arr1 by rows and gathers the output blocks, "k" splits the inner
+                 dimension and all-reduces the partial products.
+        @params: all_reduce -> str, "ring" or "tree" for shard="k", the group's default when None.
+        @returns: np.array, (m, n) int64 product.
+    '''
+    def matmul(self, arr1: np.array, arr2: np.array, shard: str = "rows", all_reduce: str = None) -> np.array:
+        assert arr1.ndim == 2 and arr2.ndim == 2, "Matrix multiplication requires 2D arrays."
+        assert arr1.shape[1] == arr2.shape[0], "Matrix dimensions must match for multiplication (m x k) * (k x n)."
+        (m, k), n = arr1.shape, arr2.shape[1]
+        if shard == "rows":
+            bounds = np.array_split(np.arange(m), self.num_devices)
+            shards = [(arr1[rows[0]:rows[-1] + 1] if len(rows) else arr1[:0], arr2, (len(rows), n)) for rows in bounds]
+            results = self.launch("matmul", shards, None)
+            return np.concatenate(results, axis=0)
+        if shard == "k":
+            bounds = np.array_split(np.arange(k), self.num_devices)
+            shards = [(arr1[:, cols[0]:cols[-1] + 1] if len(cols) else arr1[:, :0],
+                       arr2[cols[0]:cols[-1] + 1] if len(cols) else arr2[:0], (m, n)) for cols in bounds]
+            return self.launch("matmul", shards, all_reduce or self.all_reduce)[0]
+        raise ValueError("shard must be 'rows' or 'k'.")
+
+    '''
+        @brief: Computes a dot product on the group, each device taking a contiguous run of the flattened inputs.
+
+        @params: arr1 -> np.array, first vector (or matrix, flattened).
+        @params: arr2 -> np.array, second vector, the same number of elements.
+        @params: all_reduce -> str, "ring" or "tree", the group's default when None.
+        @returns: int, the dot product.
+    '''
+    def dot(self, arr1: np.array, arr2: np.array, all_reduce: str = None) -> int:
+        flat1, flat2 = arr1.reshape(-1), arr2.reshape(-1)
+        assert flat1.shape == flat2.shape, "Vectors must have the same length for dot product."
+        shards = [(part1, part2, (1,)) for part1, part2 in zip(np.array_split(flat1, self.num_devices),
+                                                                 np.array_split(flat2, self.num_devices))]
+        return int(self.launch("dot", shards, all_reduce or self.all_reduce)[0][0])
+
+    '''
+        @brief: Sends one shard to every device, collects the results and records the report.
+
+        @params: operation -> str, "dot" or "matmul", the launch every device runs on its shard.
+        @params: shards -> list[tuple], per device (arr1 shard, arr2 shard, output shape of the shard).
+        @params: all_reduce -> str, "ring" or "tree" to sum the device results, None to gather them.
+        @returns: list[np.array], the result of every device, only device 0's after an all-reduce.
+    '''
+    def launch(self, operation: str, shards: list, all_reduce: str = None) -> list:
+        assert self.processes, "DeviceGroup has been closed."
+        if all_reduce is not None and all_reduce not in ALL_REDUCES:
+            raise ValueError(f"Unknown all-reduce '{all_reduce}', expected one of {ALL_REDUCES}.")
+        sent_before, received_before = dict(self.transport.bytes_sent), dict(self.transport.bytes_received)
+        start = time.perf_counter()
+        for rank, (part1, part2, output_shape) in enumerate(shards):
+            self.transport.send(rank, (operation, np.ascontiguousarray(part1), np.ascontiguousarray(part2), output_shape, all_reduce))
+        replies = [self.transport.recv(rank) for rank in range(self.num_devices)]
+        seconds = time.perf_counter() - start
+
+        for _, _, error in replies:
+            if error is not None:
+                raise error
+        devices = [stats for _, stats, _ in replies]
+        tasks = [stats["tasks"] for stats in devices]
+        self.last_report = {
+            "operation": operation,
+            "num_devices": self.num_devices,
+            "all_reduce": all_reduce,
+            "seconds": seconds,
+            "devices": devices,
+            "load_imbalance": max(tasks) / (sum(tasks) / len(tasks)) if sum(tasks) else 1.0,
+            "host_to_device_bytes": sum(self.transport.bytes_sent[rank] - sent_before[rank] for rank in range(self.num_devices)),
+            "device_to_host_bytes": sum(self.transport.bytes_received[rank] - received_before[rank] for rank in range(self.num_devices)),
+            "device_to_device_bytes": sum(stats["bytes_to_devices"] for stats in devices),
+        }
+        return [result for result, _, _ in replies]
+
+    '''
+        @brief: Reports the last launch of the group.
+
+        @returns: dict, the operation, all-reduce and wall time, per device the tasks (products), compute and
+                  all-reduce seconds and bytes exchanged with other devices, the load imbalance (largest
+                  device's tasks over the mean, 1.0 is perfect) and the bytes moved host -> devices,
+                  devices -> host and between devices. None before any launch.
+    '''
+    def report(self) -> dict:
+        return self.last_report
+
+    '''
+        @brief: Stops the device processes and closes the transport.
+    '''
+    def close(self):
+        if not self.processes:
+            return
+        for rank in range(self.num_devices):
+            self.transport.send(rank, None)
+        for process in self.processes:
+            process.join()
+        self.transport.close()
+        self.processes = []
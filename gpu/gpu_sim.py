@@ -1,153 +1,916 @@
+import time
 import numpy as np
-from gpu.sm import StreamMulti
+from gpu.sm import StreamMulti, NUM_BANKS, SHARED_MEM_SIZE, REDUCE_BITS, REDUCTIONS
+from gpu.warp import TILE
+from gpu.sm_pool import SMPool
+from gpu.profiler import Profiler
+from logic_gates.control import Control
+from gpu.launch_plan import get_plan, build_index_plan, wave_layout
+from gpu.sparse import SPARSE_DENSITY, COO, as_coo, is_sparse, product_pairs
+from gpu.conv import conv_shapes
+
+BLOCK_K = 8  # k step of a shared_matmul block, kept short so the A and B panels in shared memory can be wide
 
 '''
     @brief: GPU simulator supporting dot product and matrix multiplication with a simple GPU-like structure.
-            Splits data across streaming multiprocessors (SMs) for parallel computation.
+            Splits data across streaming multiprocessors (SMs) for parallel computation. Batches of dot
+            products or matrix products run as one launch, packed densely across the SMs. Elementwise
+            launches run any ALU opcode, and reduce() runs tree reductions inside the SMs. 2-D convolutions run
+            as a matmul of a virtual im2col matrix whose patches are gathered straight from the image.
 
     @params: num_sms -> int, number of streaming multiprocessors.
     @params: mem_size -> int, size of global memory for storing results.
     @params: num_warps -> int, number of warps per SM.
     @params: num_threads_per_warp -> int, number of threads per warp.
     @params: num_bits -> int, bit precision for ALU operations.
+    @params: backend -> str, ALU backend, "scalar" (one ALU object per thread), "bitslice" (one vectorized
+             call per warp) or "lut" (one precomputed table gather per warp, num_bits <= 8). All of them give
+             bit-exact results.
+    @params: adder -> str, adder implementation used by the ALUs for ADD/SUB, "ripple" (RippleAdder) or
+             "kogge_stone" (parallel-prefix KoggeStoneAdder). Both give bit-identical results.
+    @params: multiplier -> str, "native" multiplies the decoded integers, "shift_add" or "booth" runs MUL through
+             a gate-level multiplier unit built on the adder (operands must then fit in num_bits).
+    @params: num_workers -> int, 0 runs the SMs serially in this process, otherwise the SMs are pinned to this
+             many worker processes that exchange operands and results through shared memory. The workers stay
+             alive across launches until close() is called.
+    @params: profile -> bool, record per-SM/warp timings, ALU op counts, lane padding and memory traffic in
+             self.profiler (see gpu/profiler.py). Disabled by default, and then costs next to nothing.
+    @params: shared_mem_size -> int, int64 elements of shared memory per SM, used by "shared_matmul" and
+             allocated on its first launch.
 '''
 class GPU_SIM:
     
-    def __init__(self, num_sms=2, mem_size=1024, num_warps=2, num_threads_per_warp=4, num_bits=8):
+    def __init__(self, num_sms=2, mem_size=1024, num_warps=2, num_threads_per_warp=4, num_bits=8, backend="scalar",
+                 adder="ripple", multiplier="native", num_workers=0, profile=False, shared_mem_size=SHARED_MEM_SIZE):
         self.global_memory = np.zeros(mem_size, dtype=np.int32)
         self.num_sms = num_sms
         self.num_warps = num_warps
         self.num_threads_per_warp = num_threads_per_warp
         self.num_bits = num_bits
-        self.sm_list = [StreamMulti(num_warps, num_threads_per_warp, num_bits) for _ in range(num_sms)]
+        self.backend = backend
+        self.adder = adder
+        self.multiplier = multiplier
+        self.num_workers = num_workers
+        # Device-wide register files, SM s works on views of row s, so staging a wave is a single slice write.
+        # The operands are double-buffered, operand_file is the bank the SMs currently compute on.
+        if num_workers > 0:
+            self.sm_pool = SMPool(num_workers, num_sms, num_warps, num_threads_per_warp, num_bits, backend, adder, multiplier)
+            self.operand_banks = self.sm_pool.operands.reshape(NUM_BANKS, num_sms, num_warps, num_threads_per_warp, 2)
+            self.result_file = self.sm_pool.results.reshape(num_sms, num_warps, num_threads_per_warp)
+            self.sm_list = []
+        else:
+            self.sm_pool = None
+            self.operand_banks = np.zeros((NUM_BANKS, num_sms, num_warps, num_threads_per_warp, 2), dtype=np.int64)
+            self.result_file = np.zeros((num_sms, num_warps, num_threads_per_warp), dtype=np.int32)
+            # Tile registers and accumulators of the warps' MMA instruction (operation "tiled_matmul")
+            self.mma_file = np.zeros((num_sms, num_warps, 2, TILE, TILE), dtype=np.int64)
+            self.acc_file = np.zeros((num_sms, num_warps, TILE, TILE), dtype=np.int64)
+            self.sm_list = [StreamMulti(num_warps, num_threads_per_warp, num_bits, backend, adder, multiplier,
+                                        self.operand_banks[:, s], self.result_file[s], self.mma_file[s], self.acc_file[s])
+                            for s in range(num_sms)]
+        # Shared memory of the SMs (operation "shared_matmul"), allocated by plan_blocks on first use
+        self.shared_mem_size = shared_mem_size
+        self.shared_file = None
+        self.bank = 0
+        self.operand_file = self.operand_banks[0]
+        self.profiler = Profiler() if profile else None
+        for sm_id, sm in enumerate(self.sm_list):
+            sm.sm_id = sm_id
+            sm.profiler = self.profiler
         self.arr1 = None
         self.arr2 = None
         self.arr1_flat = None
         self.arr2_flat = None
         self.operation = None
         self.output_shape = None
-        self.task_map = []
+        self.task_map = np.zeros(0, dtype=np.int64)
+        self.task_mask = np.zeros(0, dtype=bool)
+        self.plan = None
+        self.operand_sources = (None, None)
+        self.sparse_inputs = None
+        self.sparse_stats = None
+        self.tile_stats = None
+        self.block_stats = None
+        self.block_lanes = None
+        self.reduce_stats = None
+        self.conv_stats = None
+        self.control_unit = Control()
+        self.total_tasks = 0
+        self.wave_capacity = 0
+        self.num_waves = 0
+        self.wave_stats = []
+        self.loaded_wave = None
+        self.active_warps = np.full(num_sms, num_warps)
+        self.chunk_stats = []
         
     """
         @brief: Loads input arrays and determines operation type.
 
-        @params: arr1 -> np.array, first input (vector or matrix).
-        @params: arr2 -> np.array, second input (vector or matrix).
+        @params: arr1 -> np.array, first input (vector or matrix, (B, n) or (B, m, k) for batches).
+        @params: arr2 -> np.array, second input (vector or matrix, (B, n) or (B, k, n) for batches).
+        @params: operation -> str, "dot", "matmul", "batch_dot" (row b of arr1 dot row b of arr2),
+                 "batch_matmul" (arr1[b] @ arr2[b] for every b), "tiled_matmul" (a matmul run as
+                 TILE x TILE x TILE warp MMA instructions, operands in [0, 2^num_bits), see plan_tiles),
+                 "shared_matmul" (a matmul whose SMs load input tiles once into shared memory, see
+                 run_blocks), "elementwise" (arr1[i] op
+                 arr2[i] for every element, with any opcode of run_computation) or "conv2d" (valid, stride 1
+                 convolution of a (C, H, W) or (H, W) image arr1 with (F, C, KH, KW) or (KH, KW) kernels arr2,
+                 see gpu/conv.py).
+        @params: sparse -> bool, matmul only. True dispatches only the products whose operands are both
+                 nonzero, False always runs dense. None (default) goes sparse for sparse inputs (COO, CSR or
+                 scipy.sparse, see gpu/sparse.py) and for dense inputs with at most SPARSE_DENSITY of their
+                 m * n * k products nonzero.
     """
-    def load_info(self, arr1: np.array, arr2: np.array, operation="matmul"):
+    def load_info(self, arr1: np.array, arr2: np.array, operation="matmul", sparse=None):
         self.arr1 = arr1
         self.arr2 = arr2
         self.operation = operation.lower()
-
+        self.output_shape = self.check_inputs(arr1, arr2, self.operation)
         if self.operation == "dot":
+            self.arr1_flat = arr1.reshape(-1)
+            self.arr2_flat = arr2.reshape(-1)
+
+        self.sparse_inputs = None
+        if self.operation == "matmul" and sparse is not False:
+            if sparse or is_sparse(arr1) or is_sparse(arr2):
+                self.sparse_inputs = (as_coo(arr1), as_coo(arr2))
+            else:
+                m, k = arr1.shape
+                nonzero_products = int(np.count_nonzero(arr1, axis=0) @ np.count_nonzero(arr2, axis=1))
+                if nonzero_products <= SPARSE_DENSITY * m * k * arr2.shape[1]:
+                    self.sparse_inputs = (COO.from_dense(arr1), COO.from_dense(arr2))
+
+    """
+        @brief: Validates a pair of inputs for an operation without loading them.
+
+        @params: arr1 -> np.array, first input.
+        @params: arr2 -> np.array, second input.
+        @params: operation -> str, "dot", "matmul", "batch_dot", "batch_matmul", "tiled_matmul", "shared_matmul",
+                 "elementwise" or "conv2d" (lower case).
+        @returns: tuple, the shape of the output.
+    """
+    def check_inputs(self, arr1: np.array, arr2: np.array, operation: str) -> tuple:
+        if operation != "matmul" and (is_sparse(arr1) or is_sparse(arr2)):
+            raise ValueError("Sparse inputs are only supported for 'matmul'.")
+        if operation == "dot":
             if arr1.ndim == 2 and arr2.ndim == 2:
-                flat_arr1 = arr1.flatten()
-                flat_arr2 = arr2.flatten()
-                assert flat_arr1.shape == flat_arr2.shape, "Flattened vectors must have the same length for dot product."
-                self.arr1_flat = flat_arr1
-                self.arr2_flat = flat_arr2
+                assert arr1.size == arr2.size, "Flattened vectors must have the same length for dot product."
             elif arr1.ndim == 1 and arr2.ndim == 1:
                 assert arr1.shape == arr2.shape, "Vectors must have the same length for dot product."
-                self.arr1_flat = arr1
-                self.arr2_flat = arr2
             else:
                 raise ValueError("For dot product, inputs must be 1D vectors or 2D matrices that can be flattened.")
-            self.output_shape = (1,)
-        elif self.operation == "matmul":
+            output_shape = (1,)
+        elif operation in ("matmul", "tiled_matmul", "shared_matmul"):
             assert arr1.ndim == 2 and arr2.ndim == 2, "Matrix multiplication requires 2D arrays."
             assert arr1.shape[1] == arr2.shape[0], "Matrix dimensions must match for multiplication (m x k) * (k x n)."
-            self.output_shape = (arr1.shape[0], arr2.shape[1])
+            output_shape = (arr1.shape[0], arr2.shape[1])
+        elif operation == "batch_dot":
+            assert arr1.ndim == 2 and arr1.shape == arr2.shape, "Batched dot product requires two (B, n) arrays of the same shape."
+            output_shape = (arr1.shape[0],)
+        elif operation == "batch_matmul":
+            assert arr1.ndim == 3 and arr2.ndim == 3, "Batched matrix multiplication requires 3D arrays."
+            assert arr1.shape[0] == arr2.shape[0], "Batch sizes must match."
+            assert arr1.shape[2] == arr2.shape[1], "Matrix dimensions must match for multiplication (B x m x k) * (B x k x n)."
+            output_shape = (arr1.shape[0], arr1.shape[1], arr2.shape[2])
+        elif operation == "elementwise":
+            assert arr1.shape == arr2.shape, "Elementwise operations require two arrays of the same shape."
+            if arr1.dtype.kind not in "iu" or arr2.dtype.kind not in "iu":
+                raise ValueError(f"Elementwise operands must be integers, got {arr1.dtype} and {arr2.dtype}.")
+            output_shape = arr1.shape
+        elif operation == "conv2d":
+            _, _, _, F, _, _, OH, OW = conv_shapes(arr1.shape, arr2.shape)
+            output_shape = (OH, OW) if arr2.ndim == 2 else (F, OH, OW)
         else:
-            raise ValueError("Operation must be 'dot' or 'matmul'.")
+            raise ValueError("Operation must be 'dot', 'matmul', 'batch_dot', 'batch_matmul', 'tiled_matmul', "
+                             "'shared_matmul', 'elementwise' or 'conv2d'.")
+
+        if int(np.prod(output_shape)) > len(self.global_memory):
+            raise ValueError(f"Output of shape {output_shape} does not fit in global memory of size {len(self.global_memory)}.")
+        return output_shape
 
     """
-        @brief: Distributes data across SMs based on operation type.
+        @brief: Validates the opcode of a launch. Elementwise launches take any opcode Control decodes, every
+                other operation sums products and only runs MUL.
+
+        @params: control_code -> str, 3-bit binary string.
+        @params: operation -> str, the operation of the launch (lower case).
+    """
+    def check_control(self, control_code: str, operation: str):
+        if operation == "elementwise":
+            if self.control_unit.decode(control_code) == "INVALID":
+                raise ValueError(f"Unknown control code '{control_code}'.")
+        elif control_code != "101":
+            raise ValueError(f"Only multiplication ('101') is supported for '{operation}', use 'elementwise' for other opcodes.")
+
+    """
+        @brief: Validates the operands of an elementwise launch against its opcode. ADD, SUB, AND, OR and XOR
+                run on num_bits wide adders and gates, so their operands must be in [0, 2^num_bits) on every
+                backend.
+
+        @params: arr1 -> np.array, first operands.
+        @params: arr2 -> np.array, second operands.
+        @params: control_code -> str, 3-bit binary string.
+    """
+    def check_operands(self, arr1: np.array, arr2: np.array, control_code: str):
+        if self.control_unit.decode(control_code) not in ("ADD", "SUB", "AND", "OR", "XOR"):
+            return
+        limit = 1 << self.num_bits
+        for arr in (arr1, arr2):
+            if arr.size and (arr.min() < 0 or arr.max() >= limit):
+                raise ValueError(f"{self.control_unit.decode(control_code)} operands must be in [0, {limit}).")
+
+    """
+        @brief: Plans the launch and stages the first wave on the SMs. The (i, j, k) work is split into as
+                many waves (grid blocks) as needed to fill num_sms * num_warps * num_threads_per_warp lanes,
+                so inputs of any size run on a fixed device instead of being truncated. The index plan only
+                depends on the shapes and the device configuration, so it comes from the launch plan cache
+                (gpu/launch_plan.py). It only holds the lane layout of the waves, the indices of a wave are
+                computed when it is staged, so the plan does not grow with the launch.
     """
     def distribute_data(self):
         assert self.arr1 is not None and self.arr2 is not None, "Input arrays must be loaded first."
-        self.task_map = []
+        if self.profiler is not None:
+            start = self.profiler.now()
 
-        if self.operation == "dot":
-            flattened_data = np.column_stack((self.arr1_flat, self.arr2_flat))
-            chunks = np.array_split(flattened_data, self.num_sms)
-            for i, sm in enumerate(self.sm_list):
-                sm.distribute_data(chunks[i])
-
-        elif self.operation == "matmul":
-            m, k = self.arr1.shape
-            k, n = self.arr2.shape
-            total_pairs = m * n * k  # (i, j, k) indexed multiplications
-            pairs_per_sm = (total_pairs + self.num_sms - 1) // self.num_sms  # Ensure even workload
-
-            pair_idx = 0
-            for sm_idx, sm in enumerate(self.sm_list):
-                data_pairs = []
-                sm_task_map = []
-                pairs_assigned = 0
-                
-                while pairs_assigned < pairs_per_sm and pair_idx < total_pairs:
-                    task_idx = pair_idx // k
-                    k_idx = pair_idx % k
-                    i = task_idx // n
-                    j = task_idx % n
-                    data_pairs.append((self.arr1[i, k_idx], self.arr2[k_idx, j]))
-                    sm_task_map.append((i, j, k_idx))
-                    pairs_assigned += 1
-                    pair_idx += 1
-                
-                data_array = np.array(data_pairs)
-                expected_size = sm.num_warps * sm.num_threads_per_warp
-                if len(data_array) < expected_size:
-                    padding = np.zeros((expected_size - len(data_array), 2), dtype=int)
-                    data_array = np.vstack((data_array, padding))
-                    sm_task_map.extend([(0, 0, 0)] * (expected_size - len(data_pairs)))
-                sm.distribute_data(data_array)
-                self.task_map.extend(sm_task_map)
-
-    """
-        @brief: Runs multiplication across SMs and aggregates results.
+        if self.operation in ("tiled_matmul", "shared_matmul"):
+            if self.operation == "tiled_matmul":
+                self.plan_tiles()
+            else:
+                self.plan_blocks()
+            if self.profiler is not None:
+                self.profiler.span("distribute_data", "launch", start)
+            return
+        if self.sparse_inputs is not None:
+            self.plan_sparse()
+        else:
+            self.plan = get_plan(self.operation, self.arr1.shape, self.arr2.shape,
+                                 self.num_sms, self.num_warps, self.num_threads_per_warp)
+            self.operand_sources = (self.arr1, self.arr2)
+            self.sparse_stats = None
+        self.wave_capacity = self.plan.wave_capacity
+        self.total_tasks = self.plan.total_tasks
+        self.num_waves = self.plan.num_waves
+        self.wave_stats = [None] * self.num_waves
+        self.loaded_wave = None
+        if self.operation == "conv2d":
+            self.plan_conv()
+        self.load_wave(0)
+        if self.profiler is not None:
+            self.profiler.span("distribute_data", "launch", start)
+
+    """
+        @brief: Records the memory of a conv2d launch. The launch gathers every patch element straight from
+                the image into the operand registers, and the indices of a wave are computed when it is staged
+                (see LaunchPlan.wave), so on top of its inputs it holds the cached plan (the lane layouts of
+                its waves) and the indices of the wave in flight, neither of which grows with the image. The
+                materialized im2col approach runs a plain matmul with the same products, so the same plan and
+                wave indices, plus the (OH * OW, C * KH * KW) patch matrix, which repeats every image element
+                up to KH * KW times. Index temporaries of a wave and the preallocated registers are not counted.
+    """
+    def plan_conv(self):
+        C, H, W, F, KH, KW, OH, OW = conv_shapes(self.arr1.shape, self.arr2.shape)
+        inputs = self.arr1.nbytes + self.arr2.nbytes
+        im2col = OH * OW * C * KH * KW * self.arr1.itemsize
+        wave_indices = self.plan.wave(0).nbytes
+        peak = inputs + self.plan.nbytes + wave_indices
+        self.conv_stats = {
+            "image": (C, H, W),
+            "kernels": (F, C, KH, KW),
+            "patches": OH * OW,
+            "patch_size": C * KH * KW,
+            "products": self.total_tasks,
+            "input_bytes": inputs,
+            "plan_bytes": self.plan.nbytes,
+            "wave_index_bytes": wave_indices,
+            "im2col_bytes": im2col,
+            "peak_bytes": peak,
+            "im2col_peak_bytes": peak + im2col,
+            "memory_reduction": (peak + im2col) / peak,
+        }
+
+    """
+        @brief: Plans a tiled matmul. Both inputs are zero-padded to multiples of TILE and viewed as grids of
+                TILE x TILE tiles. Every output tile is one task for one warp, which walks the k dimension
+                with one MMA instruction per tile step, so a wave holds num_sms * num_warps output tiles.
+
+                The MMA units multiply the tiles themselves, so the backend, adder and multiplier of the device
+                do not apply, and their operands must fit in num_bits even where a plain matmul takes wider ones.
+    """
+    def plan_tiles(self):
+        if self.sm_pool is not None:
+            raise ValueError("tiled_matmul runs on in-process SMs, use num_workers=0.")
+        limit = 1 << self.num_bits
+        for arr in (self.arr1, self.arr2):
+            if arr.size and (arr.min() < 0 or arr.max() >= limit):
+                raise ValueError(f"tiled_matmul operands must be in [0, {limit}): the warps' MMA units take num_bits wide "
+                                 f"operands and bypass the ALU backend, adder and multiplier. Use 'matmul' for wider operands.")
+        (m, k), n = self.arr1.shape, self.arr2.shape[1]
+        m_tiles, k_tiles, n_tiles = (-(-m // TILE), -(-k // TILE), -(-n // TILE))
+        padded1 = np.zeros((m_tiles * TILE, k_tiles * TILE), dtype=np.int64)
+        padded2 = np.zeros((k_tiles * TILE, n_tiles * TILE), dtype=np.int64)
+        padded1[:m, :k] = self.arr1
+        padded2[:k, :n] = self.arr2
+        # (m_tiles, k_tiles, TILE, TILE) and (k_tiles, n_tiles, TILE, TILE) views of the padded inputs
+        self.operand_sources = (padded1.reshape(m_tiles, TILE, k_tiles, TILE).transpose(0, 2, 1, 3),
+                                padded2.reshape(k_tiles, TILE, n_tiles, TILE).transpose(0, 2, 1, 3))
+
+        self.plan = None
+        self.sparse_stats = None
+        self.wave_capacity = self.num_sms * self.num_warps
+        self.total_tasks = m_tiles * n_tiles
+        self.num_waves = max(1, -(-self.total_tasks // self.wave_capacity))
+        self.wave_stats = [None] * self.num_waves
+        self.loaded_wave = None
+        self.tile_stats = {
+            "tile": TILE,
+            "tiles": (m_tiles, n_tiles, k_tiles),
+            "mma_instructions": m_tiles * n_tiles * k_tiles,
+            "scalar_dispatches": m * n * k,
+            "intermediate_values": m_tiles * n_tiles * TILE * TILE,
+            "scalar_intermediate_values": m * n * k,
+        }
+
+    """
+        @brief: Runs a planned tiled matmul. For every wave each active warp zeroes its accumulator, then per
+                k step the A and B tiles of all warps are staged into the MMA registers and every SM issues
+                the instruction on its warps. The finished output tiles are written to global memory once,
+                so no per-product value goes through local or global memory.
+
+        @params: accumulate -> bool, add onto the output already in global memory instead of overwriting it.
+    """
+    def run_tiles(self, accumulate: bool = False):
+        tiles1, tiles2 = self.operand_sources
+        m_tiles, n_tiles, k_tiles = self.tile_stats["tiles"]
+        slots = self.wave_capacity
+        operands = self.mma_file.reshape(slots, 2, TILE, TILE)
+        accumulators = self.acc_file.reshape(slots, TILE, TILE)
+        out_tiles = np.zeros((m_tiles, n_tiles, TILE, TILE), dtype=np.int64)
+
+        for wave_idx in range(self.num_waves):
+            if self.profiler is not None:
+                wave_start = self.profiler.now()
+            wave_start_tile = wave_idx * slots
+            wave_tiles = min(slots, self.total_tasks - wave_start_tile)
+            # A warp is a lane here, warp w of SM s takes output tile s * tiles_per_sm + w of the wave
+            mask, offset, active_warps = wave_layout(wave_tiles, self.num_sms, self.num_warps, 1)
+            tile_i, tile_j = np.divmod(wave_start_tile + offset, n_tiles)
+            for sm, active in zip(self.sm_list, active_warps.tolist()):
+                sm.active_warps = active
+
+            accumulators[:] = 0
+            operands[:] = 0
+            for k_step in range(k_tiles):
+                operands[mask, 0] = tiles1[tile_i, k_step]
+                operands[mask, 1] = tiles2[k_step, tile_j]
+                if self.profiler is not None:
+                    self.profiler.count_bytes(to_local=operands.nbytes)
+                for sm in self.sm_list:
+                    sm.run_mma()
+            out_tiles[tile_i, tile_j] = accumulators[mask]
+
+            self.wave_stats[wave_idx] = {
+                "wave": wave_idx,
+                "tasks": wave_tiles,
+                "lanes": slots,
+                "occupancy": wave_tiles / slots,
+            }
+            if self.profiler is not None:
+                self.profiler.count_bytes(to_global=accumulators.nbytes)
+                self.profiler.count_lanes(wave_tiles, slots - wave_tiles)
+                self.profiler.span(f"wave {wave_idx}", "wave", wave_start, args=self.wave_stats[wave_idx])
+
+        m, n = self.output_shape
+        result = out_tiles.transpose(0, 2, 1, 3).reshape(m_tiles * TILE, n_tiles * TILE)[:m, :n]
+        output = self.global_memory[:m * n].reshape(m, n)
+        if accumulate:
+            output += result.astype(np.int32)
+        else:
+            output[:] = result
+
+    """
+        @brief: Plans a shared-memory matmul. The output is cut into block_m x block_n blocks and k into steps
+                of block_k, and every (block, k step) is one task for one SM: it loads the block_m x block_k
+                tile of arr1 and the block_k x block_n tile of arr2 into shared memory once, and its warps
+                run all block_m * block_n * block_k products of the task from there, in as many passes over
+                the lanes as needed. Each input element thus crosses from global memory once per block row
+                or column instead of once per product. block_k stays at BLOCK_K so the tiles can be as wide
+                as shared memory allows, since the traffic falls with block_m and block_n.
+
+                The lane layout of a pass is the same for every task, so it is built once per launch. Empty
+                inputs plan no tasks and give a zero output, like "matmul".
+    """
+    def plan_blocks(self):
+        if self.sm_pool is not None:
+            raise ValueError("shared_matmul runs on in-process SMs, use num_workers=0.")
+        if self.shared_mem_size < 2:
+            raise ValueError("Shared memory must hold at least one element of each input.")
+        if self.shared_file is None:
+            self.shared_file = np.zeros((self.num_sms, self.shared_mem_size), dtype=np.int64)
+            for sm, shared_mem in zip(self.sm_list, self.shared_file):
+                sm.shared_mem = shared_mem
+        (m, k), n = self.arr1.shape, self.arr2.shape[1]
+        # Empty dimensions still get 1-wide blocks, so they just make zero blocks along that dimension
+        block_k = min(max(k, 1), BLOCK_K, self.shared_mem_size // 2)
+        panel = self.shared_mem_size // block_k  # rows of arr1 plus columns of arr2 that fit next to each other
+        block_m = min(max(m, 1), panel // 2)
+        block_n = min(max(n, 1), panel - block_m)
+        m_blocks, n_blocks, k_blocks = (-(-m // block_m), -(-n // block_n), -(-k // block_k))
+        padded1 = np.zeros((m_blocks * block_m, k_blocks * block_k), dtype=np.int64)
+        padded2 = np.zeros((k_blocks * block_k, n_blocks * block_n), dtype=np.int64)
+        padded1[:m, :k] = self.arr1
+        padded2[:k, :n] = self.arr2
+        self.operand_sources = (padded1, padded2)
+
+        # Product q of a task multiplies tile1[i, kk] with tile2[kk, j], k runs fastest
+        products = block_m * block_n * block_k
+        i, rest = np.divmod(np.arange(products), block_n * block_k)
+        j, kk = np.divmod(rest, block_k)
+        self.block_lanes = (i * block_k + kk, kk * block_n + j, i * (n_blocks * block_n) + j)
+
+        sm_capacity = self.num_warps * self.num_threads_per_warp
+        passes = -(-products // sm_capacity)
+        tasks = m_blocks * n_blocks * k_blocks
+        rounds = -(-tasks // self.num_sms)
+        self.plan = None
+        self.sparse_stats = None
+        self.wave_capacity = self.num_sms * sm_capacity
+        self.total_tasks = tasks * products
+        self.num_waves = rounds * passes
+        self.wave_stats = [None] * self.num_waves
+        self.loaded_wave = None
+        itemsize = padded1.itemsize
+        to_shared = tasks * (block_m * block_k + block_k * block_n) * itemsize
+        unshared = m * n * k * 2 * itemsize
+        self.block_stats = {
+            "block": (block_m, block_n, block_k),
+            "blocks": (m_blocks, n_blocks, k_blocks),
+            "passes_per_block": passes,
+            "global_to_shared_bytes": to_shared,
+            "shared_to_register_bytes": tasks * products * 2 * itemsize,
+            "unshared_global_bytes": unshared,
+            "traffic_reduction": unshared / to_shared if to_shared else 1.0,
+        }
+
+    """
+        @brief: Runs a planned shared-memory matmul. Every round hands one task to each SM, which loads its
+                tiles into shared memory, then per pass each SM fills its operand registers from shared memory
+                and runs its warps. The products are summed into a padded copy of the output and the finished
+                output is written to global memory once.
 
         @params: control_code -> str, 3-bit binary string ("101" for MUL).
+        @params: accumulate -> bool, add onto the output already in global memory instead of overwriting it.
+    """
+    def run_blocks(self, control_code: str, accumulate: bool = False):
+        padded1, padded2 = self.operand_sources
+        block_m, block_n, block_k = self.block_stats["block"]
+        m_blocks, n_blocks, k_blocks = self.block_stats["blocks"]
+        passes = self.block_stats["passes_per_block"]
+        idx1, idx2, out_local = self.block_lanes
+        products = len(out_local)
+        sm_capacity = self.num_warps * self.num_threads_per_warp
+        tasks = m_blocks * n_blocks * k_blocks
+        out = np.zeros(padded1.shape[0] * padded2.shape[1], dtype=np.int64)
+
+        for round_idx in range(-(-tasks // self.num_sms)):
+            first = round_idx * self.num_sms
+            busy_sms = self.sm_list[:min(self.num_sms, tasks - first)]
+            bases = []
+            for s, sm in enumerate(busy_sms):
+                bi, bj, bk = np.unravel_index(first + s, (m_blocks, n_blocks, k_blocks))
+                sm.load_shared(padded1[bi * block_m:(bi + 1) * block_m, bk * block_k:(bk + 1) * block_k],
+                               padded2[bk * block_k:(bk + 1) * block_k, bj * block_n:(bj + 1) * block_n])
+                bases.append(bi * block_m * padded2.shape[1] + bj * block_n)
+            bases = np.array(bases, dtype=np.int64)[:, None]
+
+            for pass_idx in range(passes):
+                if self.profiler is not None:
+                    wave_start = self.profiler.now()
+                lanes = slice(pass_idx * sm_capacity, min(products, (pass_idx + 1) * sm_capacity))
+                for sm in busy_sms:
+                    sm.stage_shared(idx1[lanes], idx2[lanes])
+                    sm.run_calculations(control_code)
+                    sm.send_info()
+                results = self.result_file[:len(busy_sms)].reshape(len(busy_sms), sm_capacity)
+                lane_count = lanes.stop - lanes.start
+                np.add.at(out, bases + out_local[lanes], results[:, :lane_count])
+
+                wave_idx = round_idx * passes + pass_idx
+                wave_tasks = len(busy_sms) * lane_count
+                self.wave_stats[wave_idx] = {
+                    "wave": wave_idx,
+                    "tasks": wave_tasks,
+                    "lanes": self.wave_capacity,
+                    "occupancy": wave_tasks / self.wave_capacity,
+                }
+                if self.profiler is not None:
+                    self.profiler.count_lanes(wave_tasks, self.wave_capacity - wave_tasks)
+                    self.profiler.span(f"wave {wave_idx}", "wave", wave_start, args=self.wave_stats[wave_idx])
+
+        m, n = self.output_shape
+        result = out.reshape(padded1.shape[0], padded2.shape[1])[:m, :n]
+        output = self.global_memory[:m * n].reshape(m, n)
+        if accumulate:
+            output += result.astype(np.int32)
+        else:
+            output[:] = result
+
+    """
+        @brief: Plans a sparse matmul. Only the products whose operands are both nonzero become tasks, they
+                are packed densely into waves and the reduction map sends each to its output cell. The plan
+                depends on the sparsity pattern, so it is built per launch and not cached.
+    """
+    def plan_sparse(self):
+        coo1, coo2 = self.sparse_inputs
+        arr1_idx, arr2_idx, out_idx = product_pairs(coo1, coo2)
+        self.plan = build_index_plan(arr1_idx, arr2_idx, out_idx, self.num_sms, self.num_warps, self.num_threads_per_warp)
+        self.operand_sources = (coo1.values, coo2.values)
+
+        m, k = coo1.shape
+        dense_products = m * k * coo2.shape[1]
+        wave_capacity = self.plan.wave_capacity
+        dense_waves = max(1, (dense_products + wave_capacity - 1) // wave_capacity)
+        self.sparse_stats = {
+            "nnz": (coo1.nnz, coo2.nnz),
+            "dense_products": dense_products,
+            "dispatched_products": self.plan.total_tasks,
+            "products_skipped": dense_products - self.plan.total_tasks,
+            "dense_waves": dense_waves,
+            "waves": self.plan.num_waves,
+            "lanes_saved": (dense_waves - self.plan.num_waves) * wave_capacity,
+        }
+
     """
-    def run_computation(self, control_code: str):
-        if control_code != "101":
-            raise ValueError("Only multiplication ('101') is supported.")
+        @brief: Stages one wave of work on the SMs. Each SM gets an even, contiguous share of the wave,
+                padded with zeros up to its thread count. Alongside the operands the wave plan gives, for
+                every lane of the wave, the flat output index the product belongs to (task_map) and whether
+                the lane holds real work or padding (task_mask).
 
+        @params: wave_idx -> int, index of the wave to stage.
+    """
+    def load_wave(self, wave_idx: int):
+        if self.profiler is not None:
+            start = self.profiler.now()
+        wave = self.plan.wave(wave_idx)
+        self.task_mask = wave.task_mask
+        self.task_map = wave.task_map
+
+        data_array = self.stage_wave(wave, self.operand_sources[0], self.operand_sources[1], self.bank)
+        self.active_warps = wave.active_warps
+
+        if self.profiler is not None:
+            self.profiler.count_bytes(to_local=data_array.nbytes)
+
+        wave_tasks = wave.tasks
+        self.wave_stats[wave_idx] = {
+            "wave": wave_idx,
+            "tasks": wave_tasks,
+            "lanes": self.wave_capacity,
+            "occupancy": wave_tasks / self.wave_capacity,
+        }
+        self.loaded_wave = wave_idx
+        if self.profiler is not None:
+            self.profiler.count_lanes(wave_tasks, self.wave_capacity - wave_tasks)
+            self.profiler.span(f"load_wave {wave_idx}", "wave", start, args=self.wave_stats[wave_idx])
+
+    """
+        @brief: Writes one wave straight into an operand bank of the SMs, padding lanes stay zero. Only the
+                given bank is touched, so a wave can be staged while the SMs compute on the other one.
+
+        @params: wave -> WavePlan, the index plan of the wave.
+        @params: arr1 -> np.array, first input of the launch.
+        @params: arr2 -> np.array, second input of the launch.
+        @params: bank -> int, the operand bank to write.
+        @returns: np.array, the (wave_capacity, 2) view of the bank that was written.
+    """
+    def stage_wave(self, wave, arr1: np.array, arr2: np.array, bank: int) -> np.array:
+        data_array = self.operand_banks[bank].reshape(-1, 2)
+        data_array[:] = 0
+        data_array[wave.task_mask, 0] = np.take(arr1, wave.arr1_idx)
+        data_array[wave.task_mask, 1] = np.take(arr2, wave.arr2_idx)
+        return data_array
+
+    """
+        @brief: Points every SM at an operand bank. Only views are swapped, no data is copied.
+
+        @params: bank -> int, the operand bank to compute on.
+    """
+    def select_bank(self, bank: int):
+        self.bank = bank
+        self.operand_file = self.operand_banks[bank]
         for sm in self.sm_list:
+            sm.select_bank(bank)
+
+    """
+        @brief: Runs every SM once on the wave staged in an operand bank. Only warps that received real lanes
+                run, the rest of the device stays unbuilt.
+
+        @params: control_code -> str, 3-bit binary string ("101" for MUL).
+        @params: active_warps -> np.array, per SM the number of warps holding real lanes.
+        @params: bank -> int, the operand bank holding the wave.
+        @params: label -> str, name of the profiler span of the process pool.
+        @returns: np.array, the concatenated SM results of the wave (a view of result_file).
+    """
+    def execute_wave(self, control_code: str, active_warps: np.array, bank: int, label: str = "SMPool") -> np.array:
+        self.select_bank(bank)
+        if self.sm_pool is not None:
+            if self.profiler is not None:
+                start = self.profiler.now()
+            self.sm_pool.run(control_code, active_warps, bank)
+            all_results = self.result_file.reshape(-1)
+            if self.profiler is not None:
+                # The SMs live in the worker processes, so the pool is timed as one unit per wave
+                self.profiler.count_ops(control_code, all_results.size)
+                self.profiler.count_bytes(to_global=all_results.nbytes)
+                self.profiler.span(label, "sm", start, track="SMPool")
+            return all_results
+
+        for sm, active in zip(self.sm_list, active_warps.tolist()):
+            sm.active_warps = active
             sm.run_calculations(control_code)
+            sm.send_info()
+        return self.result_file.reshape(-1)
 
-        if self.operation == "dot":
-            dot_product = sum(int(val) for sm in self.sm_list for val in sm.send_info())
-            self.global_memory[0] = dot_product
-
-        elif self.operation == "matmul":
-            m, n = self.output_shape
-            result = np.zeros((m, n), dtype=np.int32)
-            all_results = np.concatenate([sm.send_info() for sm in self.sm_list])
-
-            # Properly accumulate products for matrix multiplication
-            sum_map = {}
-            for idx, (i, j, k_idx) in enumerate(self.task_map):
-                if idx < len(all_results):  # Ignore padding
-                    if (i, j) not in sum_map:
-                        sum_map[(i, j)] = 0
-                    sum_map[(i, j)] += int(all_results[idx])  # Ensure int conversion
-
-            for (i, j), val in sum_map.items():
-                result[i, j] = val  # Assign final summed value per (i, j)
-
-            self.global_memory[:m * n] = result.flatten()
+    """
+        @brief: Runs the launch across SMs wave by wave and accumulates the results in global memory.
+
+        @params: control_code -> str, 3-bit binary string, "101" (MUL) for products, any opcode of Control for
+                 "elementwise".
+        @params: accumulate -> bool, add onto the output already in global memory instead of clearing it first.
+    """
+    def run_computation(self, control_code: str, accumulate: bool = False):
+        self.check_control(control_code, self.operation)
+        if self.operation == "elementwise":
+            self.check_operands(self.arr1, self.arr2, control_code)
+
+        if self.profiler is not None:
+            launch_start = self.profiler.now()
+        if self.operation in ("tiled_matmul", "shared_matmul"):
+            if self.operation == "tiled_matmul":
+                self.run_tiles(accumulate)
+            else:
+                self.run_blocks(control_code, accumulate)
+            if self.profiler is not None:
+                self.profiler.span("run_computation", "launch", launch_start)
+            return
+
+        if not accumulate:
+            out_size = int(np.prod(self.output_shape))
+            self.global_memory[:out_size] = 0
+
+        for wave_idx in range(self.num_waves):
+            if self.loaded_wave != wave_idx:
+                self.load_wave(wave_idx)
+
+            if self.profiler is not None:
+                wave_start = self.profiler.now()
+            all_results = self.execute_wave(control_code, self.active_warps, self.bank, f"SMPool wave {wave_idx}")
+            self.reduce_results(all_results)
+            if self.profiler is not None:
+                self.profiler.span(f"wave {wave_idx}", "wave", wave_start)
+
+        if self.profiler is not None:
+            self.profiler.span("run_computation", "launch", launch_start)
+
+    """
+        @brief: Scatter-adds the products of the staged wave into their output cells in global memory.
+                Padding lanes are dropped through task_mask, so the whole reduction is one vectorized call.
+
+        @params: all_results -> np.array, the concatenated SM results of the staged wave.
+        @params: wave -> WavePlan, the plan the results belong to, the staged wave of this GPU_SIM when None.
+    """
+    def reduce_results(self, all_results: np.array, wave=None):
+        task_map, task_mask = (self.task_map, self.task_mask) if wave is None else (wave.task_map, wave.task_mask)
+        np.add.at(self.global_memory, task_map[task_mask], all_results[task_mask])
+
+    """
+        @brief: Runs arr1[i] op arr2[i] for every element as one launch, split into waves like any other.
+
+        @params: arr1 -> np.array, first integer operands.
+        @params: arr2 -> np.array, second integer operands, the same shape as arr1.
+        @params: control_code -> str, 3-bit binary string of any ALU opcode (see logic_gates/control.py).
+                 Operands of ADD, SUB, AND, OR and XOR must be in [0, 2^num_bits) (see check_operands) and ADD
+                 and SUB wrap around.
+        @returns: np.array, a new array of arr1's shape.
+    """
+    def elementwise(self, arr1: np.array, arr2: np.array, control_code: str) -> np.array:
+        self.check_control(control_code, "elementwise")
+        self.check_operands(arr1, arr2, control_code)
+        self.load_info(arr1, arr2, "elementwise")
+        self.distribute_data()
+        self.run_computation(control_code)
+        return self.reconstruct_data().copy()
+
+    """
+        @brief: Convolves an image with a bank of kernels as one launch, see plan_conv.
+
+        @params: image -> np.array, (C, H, W) or (H, W) non-negative integers.
+        @params: kernels -> np.array, (F, C, KH, KW) or (KH, KW) non-negative integers.
+        @returns: np.array, a new (F, H - KH + 1, W - KW + 1) array, (H - KH + 1, W - KW + 1) for 2-D kernels.
+    """
+    def conv2d(self, image: np.array, kernels: np.array) -> np.array:
+        self.load_info(image, kernels, "conv2d")
+        self.distribute_data()
+        self.run_computation("101")
+        return self.reconstruct_data().copy()
+
+    """
+        @brief: Reduces an array to one value with tree reductions inside the SMs. The values are cut into
+                runs of 2 * num_warps * num_threads_per_warp, one per SM in turn, and every SM reduces its
+                run in log2 steps on its warps' ALUs (StreamMulti.tree_reduce). The partials of all runs are
+                reduced the same way, level by level, until one value is left.
+
+        @params: arr -> np.array, non-negative integers below 2^REDUCE_BITS (2^(REDUCE_BITS - 1) for min and max).
+        @params: op -> str, "sum" (wraps modulo 2^REDUCE_BITS), "xor", "min" or "max".
+        @returns: int, the reduced value (0 for an empty "sum" or "xor").
+    """
+    def reduce(self, arr: np.array, op: str = "sum") -> int:
+        if self.sm_pool is not None:
+            raise ValueError("reduce runs on in-process SMs, use num_workers=0.")
+        if op not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction '{op}', expected one of {tuple(REDUCTIONS)}.")
+        values = np.asarray(arr, dtype=np.int64).reshape(-1)
+        limit = 1 << (REDUCE_BITS - 1 if op in ("min", "max") else REDUCE_BITS)
+        if values.size and (values.min() < 0 or values.max() >= limit):
+            raise ValueError(f"Values to {op} must be in [0, {limit}).")
+        if values.size == 0:
+            if op in ("min", "max"):
+                raise ValueError(f"Cannot take the {op} of an empty array.")
+            return 0
+
+        if self.profiler is not None:
+            start = self.profiler.now()
+        # The tree steps overwrite the operand registers and local memory, so a staged wave must be staged again
+        self.loaded_wave = None
+        run = 2 * self.num_warps * self.num_threads_per_warp
+        self.reduce_stats = {"op": op, "elements": values.size, "levels": 0, "runs": 0}
+        while True:
+            partials = np.array([self.sm_list[r % self.num_sms].tree_reduce(values[offset:offset + run], op)
+                                 for r, offset in enumerate(range(0, len(values), run))], dtype=np.int64)
+            self.reduce_stats["levels"] += 1
+            self.reduce_stats["runs"] += len(partials)
+            if len(partials) == 1:
+                break
+            values = partials
+
+        if self.profiler is not None:
+            self.profiler.span(f"reduce {op}", "launch", start)
+        return int(partials[0])
+
+    """
+        @brief: Reports the last reduce() call.
+
+        @returns: dict, the reduction, the elements reduced, the levels of SM runs and the runs in total.
+                  None before any reduce().
+    """
+    def reduce_report(self) -> dict:
+        return self.reduce_stats
+
+    """
+        @brief: Reports the tiling of the last tiled_matmul launch.
+
+        @returns: dict, the tile size, the (m, n, k) tile counts, MMA instructions vs. the scalar MUL dispatches
+                  of a plain matmul, and the intermediate values each keeps. None before any tiled_matmul.
+    """
+    def tile_report(self) -> dict:
+        return self.tile_stats
+
+    """
+        @brief: Reports the memory of the last conv2d launch against the materialized im2col approach.
+
+        @returns: dict, the image and kernel shapes, the patch count and size, the products, the bytes of the
+                  inputs, the cached plan, the indices of one wave and the im2col matrix, the peak bytes of both
+                  approaches (see plan_conv) and their ratio. None before any conv2d.
+    """
+    def conv_report(self) -> dict:
+        return self.conv_stats
+
+    """
+        @brief: Reports the blocking of the last shared_matmul launch.
+
+        @returns: dict, the block shape and counts, lane passes per block, the bytes loaded from global into
+                  shared memory and from shared memory into the operand registers, the global bytes a plain
+                  matmul stages for the same products, and the ratio of the two. None before any shared_matmul.
+    """
+    def block_report(self) -> dict:
+        return self.block_stats
+
+    """
+        @brief: Reports what the sparse mode saved on the last launch.
+
+        @returns: dict, nonzeros of both inputs, dense vs. dispatched products, the products skipped and the
+                  waves and ALU lanes saved. None when the last launch ran dense.
+    """
+    def sparse_report(self) -> dict:
+        return self.sparse_stats
+
+    """
+        @brief: Summarizes how the last launch was split into waves.
+
+        @returns: dict, the wave count plus the task count and lane occupancy of every wave run so far.
+    """
+    def wave_report(self) -> dict:
+        return {
+            "num_waves": self.num_waves,
+            "wave_capacity": self.wave_capacity,
+            "total_tasks": self.total_tasks,
+            "waves": [stats for stats in self.wave_stats if stats is not None],
+        }
             
     """
-        @brief: Retrieves results from global memory.
+        @brief: Streams a dot product or matmul through the device chunk by chunk, so only one chunk of the
+                inputs is in memory at a time. Every chunk is a regular launch whose products are added onto
+                the partial sums already in global memory. See gpu/streaming.py for chunking arrays, memory
+                maps and .npy files.
 
+        @params: chunks -> iterable of (np.array, np.array), input pairs whose products add up to the result,
+                 e.g. iter_npy_chunks(path1, path2, chunk_size).
+        @params: operation -> str, "dot" or "matmul", every chunk must produce an output of the same shape.
+        @params: control_code -> str, 3-bit binary string ("101" for MUL).
         @returns: int (dot product) or np.array (matrix multiplication result).
     """
+    def stream(self, chunks, operation="dot", control_code="101"):
+        self.chunk_stats = []
+        output_shape = None
+        for chunk_idx, (arr1, arr2) in enumerate(chunks):
+            start = time.perf_counter()
+            if self.profiler is not None:
+                chunk_start = self.profiler.now()
+            self.load_info(arr1, arr2, operation)
+            if output_shape is not None and self.output_shape != output_shape:
+                raise ValueError(f"Chunk {chunk_idx} has output shape {self.output_shape}, expected {output_shape}.")
+            self.distribute_data()
+            self.run_computation(control_code, accumulate=output_shape is not None)
+            output_shape = self.output_shape
+
+            seconds = time.perf_counter() - start
+            self.chunk_stats.append({
+                "chunk": chunk_idx,
+                "tasks": self.total_tasks,
+                "bytes": arr1.nbytes + arr2.nbytes,
+                "seconds": seconds,
+                "tasks_per_s": self.total_tasks / seconds if seconds > 0 else float("inf"),
+            })
+            if self.profiler is not None:
+                self.profiler.span(f"chunk {chunk_idx}", "stream", chunk_start, args=self.chunk_stats[-1])
+
+        if output_shape is None:
+            raise ValueError("stream() needs at least one chunk.")
+        return self.reconstruct_data()
+
+    """
+        @brief: Summarizes the throughput of the last stream() call.
+
+        @returns: dict, the chunk count, totals and the tasks, bytes, time and tasks per second of every chunk.
+    """
+    def stream_report(self) -> dict:
+        total_tasks = sum(stats["tasks"] for stats in self.chunk_stats)
+        total_seconds = sum(stats["seconds"] for stats in self.chunk_stats)
+        return {
+            "num_chunks": len(self.chunk_stats),
+            "total_tasks": total_tasks,
+            "total_bytes": sum(stats["bytes"] for stats in self.chunk_stats),
+            "seconds": total_seconds,
+            "tasks_per_s": total_tasks / total_seconds if total_seconds > 0 else float("inf"),
+            "chunks": self.chunk_stats,
+        }
+
+    """
+        @brief: Sums the partial product counters of every gate-level multiplier unit on the device. The
+                workers of the process pool keep their own counters, so this covers the serial mode only.
+
+        @returns: dict, lanes multiplied, partial products formed, non-zero partial products and adder passes.
+    """
+    def multiplier_report(self) -> dict:
+        report = {"lanes": 0, "partial_products": 0, "nonzero_partial_products": 0, "adds": 0}
+        for sm in self.sm_list:
+            for warp in sm.warps:
+                if warp is None:
+                    continue
+                units = [alu.multiplier_unit for alu in warp.alus]
+                if warp.backend == "bitslice":
+                    units.append(warp.vector_alu.multiplier_unit)
+                for unit in units:
+                    if unit is not None:
+                        for key in report:
+                            report[key] += unit.stats[key]
+        return report
+
+    """
+        @brief: Retrieves results from global memory.
+
+        @returns: int (dot product) or np.array (matrix multiplication result, (B,) or (B, m, n) for batches).
+    """
     def reconstruct_data(self):
         if self.operation == "dot":
             result = int(self.global_memory[0])
             return result
-        elif self.operation == "matmul":
-            m, n = self.output_shape
-            result = self.global_memory[:m * n].reshape(m, n)
+        else:
+            result = self.global_memory[:int(np.prod(self.output_shape))].reshape(self.output_shape)
             return result
+
+    """
+        @brief: Shuts down the worker processes and shared memory of the parallel execution mode, if any.
+    """
+    def close(self):
+        if self.sm_pool is not None:
+            self.sm_pool.close()
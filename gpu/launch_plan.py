@@ -0,0 +1,322 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from gpu.conv import conv_shapes, patch_index
+
+# Process-wide plan cache shared by every GPU_SIM, keyed by (operation, input shapes, num_sms, num_warps, threads)
+_plan_cache = OrderedDict()
+_plan_lock = threading.Lock()
+_plan_stats = {"hits": 0, "misses": 0, "evictions": 0, "max_plans": 32, "max_bytes": 64 << 20, "nbytes": 0}
+
+'''
+    @brief: Evicts least recently used plans until the cache is within its plan count and byte budget.
+            The caller holds _plan_lock.
+'''
+def _evict():
+    while _plan_cache and (len(_plan_cache) > _plan_stats["max_plans"] or _plan_stats["nbytes"] > _plan_stats["max_bytes"]):
+        _, plan = _plan_cache.popitem(last=False)
+        _plan_stats["nbytes"] -= plan.nbytes
+        _plan_stats["evictions"] += 1
+
+'''
+    @brief: Sets how many launch plans, and how many bytes of them, the process-wide cache keeps before
+            evicting the least recently used one.
+
+    @params: max_plans -> int, the maximum number of cached plans (at least 1)
+    @params: max_bytes -> int, the maximum total size of the cached plans, unchanged when None
+    @returns: None
+'''
+def set_plan_cache_size(max_plans: int, max_bytes: int = None):
+    assert max_plans >= 1, "The plan cache must hold at least one plan."
+    assert max_bytes is None or max_bytes >= 0, "The plan cache byte budget cannot be negative."
+    with _plan_lock:
+        _plan_stats["max_plans"] = max_plans
+        if max_bytes is not None:
+            _plan_stats["max_bytes"] = max_bytes
+        _evict()
+
+'''
+    @brief: Reports the state of the process-wide plan cache.
+
+    @returns: info -> dict, hits, misses, evictions, max_plans, max_bytes, the cached keys and their total size in bytes
+'''
+def plan_cache_info() -> dict:
+    with _plan_lock:
+        return dict(_plan_stats, keys=list(_plan_cache.keys()))
+
+'''
+    @brief: Invalidates cached plans. With a key only that plan is dropped, otherwise every plan is dropped
+            and the counters are reset.
+
+    @params: key -> tuple, a key as listed by plan_cache_info(), or None for the whole cache
+    @returns: None
+'''
+def clear_plan_cache(key: tuple = None):
+    with _plan_lock:
+        if key is not None:
+            plan = _plan_cache.pop(key, None)
+            if plan is not None:
+                _plan_stats["nbytes"] -= plan.nbytes
+            return
+        _plan_cache.clear()
+        _plan_stats.update(hits=0, misses=0, evictions=0, nbytes=0)
+
+
+class WaveLayout:
+    '''
+        @brief: Where the tasks of a wave sit on the device. Lane l of SM s runs task s * pairs_per_sm + l of the
+                wave, lanes past the SM's share are padding. It only depends on the number of tasks in the wave,
+                so every full wave of a launch shares one layout. Arrays are read-only since layouts are cached.
+
+        @params: tasks -> int, the number of real products in the wave.
+        @params: task_mask -> np.array, bool per lane of the wave, True where the lane holds real work.
+        @params: task_offset -> np.array, int64 index within the wave of the task of every real lane.
+        @params: active_warps -> np.array, per SM the number of warps that hold real lanes.
+    '''
+    __slots__ = ("tasks", "task_mask", "task_offset", "active_warps")
+
+    def __init__(self, tasks, task_mask, task_offset, active_warps):
+        self.tasks = tasks
+        self.task_mask = task_mask
+        self.task_offset = task_offset
+        self.active_warps = active_warps
+        for array in (task_mask, task_offset, active_warps):
+            array.setflags(write=False)
+
+    @property
+    def nbytes(self) -> int:
+        return self.task_mask.nbytes + self.task_offset.nbytes + self.active_warps.nbytes
+
+
+class WavePlan:
+    '''
+        @brief: The index plan of one wave, built from the launch plan when the wave is staged and dropped
+                after it ran, so a launch only ever holds the indices of the waves in flight.
+
+        @params: tasks -> int, the number of real products in the wave.
+        @params: task_mask -> np.array, bool per lane of the wave, True where the lane holds real work.
+        @params: task_map -> np.array, int64 per lane, the flat output index the product belongs to.
+        @params: arr1_idx -> np.array, int64 flat indices into arr1 of the real lanes, in lane order.
+        @params: arr2_idx -> np.array, int64 flat indices into arr2 of the real lanes, in lane order.
+        @params: active_warps -> np.array, per SM the number of warps that hold real lanes.
+    '''
+    __slots__ = ("tasks", "task_mask", "task_map", "arr1_idx", "arr2_idx", "active_warps")
+
+    def __init__(self, tasks, task_mask, task_map, arr1_idx, arr2_idx, active_warps):
+        self.tasks = tasks
+        self.task_mask = task_mask
+        self.task_map = task_map
+        self.arr1_idx = arr1_idx
+        self.arr2_idx = arr2_idx
+        self.active_warps = active_warps
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.task_mask, self.task_map, self.arr1_idx, self.arr2_idx, self.active_warps))
+
+
+class LaunchPlan:
+    '''
+        @brief: Everything about a launch that depends only on its shapes and the device configuration: the
+                wave split and the layout of the full waves and of the last one. The gather indices and the
+                reduction map of a wave follow from its first task, so wave() computes them when the wave is
+                staged instead of storing them for every product of the launch, and a plan stays a few lanes'
+                worth of bytes whatever the size of the launch.
+
+                Plans built from explicit per-task indices (build_index_plan) keep those indices, and wave()
+                slices them.
+
+        @params: key -> tuple, (operation, arr1 shape, arr2 shape, num_sms, num_warps, num_threads_per_warp),
+                 None for an index plan.
+        @params: total_tasks -> int, the number of products of the launch.
+        @params: wave_capacity -> int, lanes per wave (num_sms * num_warps * num_threads_per_warp).
+        @params: layouts -> dict, WaveLayout by wave task count, one for the full waves and one for the last.
+        @params: indices -> tuple, (arr1_idx, arr2_idx, out_idx) of every task of an index plan, else None.
+    '''
+    __slots__ = ("key", "total_tasks", "wave_capacity", "layouts", "indices")
+
+    def __init__(self, key, total_tasks, wave_capacity, layouts, indices=None):
+        self.key = key
+        self.total_tasks = total_tasks
+        self.wave_capacity = wave_capacity
+        self.layouts = layouts
+        self.indices = indices
+
+    @property
+    def num_waves(self) -> int:
+        return max(1, (self.total_tasks + self.wave_capacity - 1) // self.wave_capacity)
+
+    @property
+    def nbytes(self) -> int:
+        nbytes = sum(layout.nbytes for layout in self.layouts.values())
+        if self.indices is not None:
+            nbytes += sum(array.nbytes for array in self.indices)
+        return nbytes
+
+    '''
+        @brief: Builds the index plan of one wave.
+
+        @params: wave_idx -> int, index of the wave.
+        @returns: WavePlan
+    '''
+    def wave(self, wave_idx: int) -> WavePlan:
+        wave_start = wave_idx * self.wave_capacity
+        layout = self.layouts[min(self.wave_capacity, self.total_tasks - wave_start)]
+        if self.indices is None:
+            operation, shape1, shape2 = self.key[:3]
+            return build_wave(operation, shape1, shape2, wave_start, layout)
+
+        arr1_idx, arr2_idx, out_idx = self.indices
+        task_idx = wave_start + layout.task_offset
+        task_map = np.zeros(layout.task_mask.size, dtype=np.int64)
+        task_map[layout.task_mask] = out_idx[task_idx]
+        return WavePlan(layout.tasks, layout.task_mask, task_map, arr1_idx[task_idx], arr2_idx[task_idx], layout.active_warps)
+
+'''
+    @brief: Lays a wave out on the device. Lane l of SM s runs task s * pairs_per_sm + l of the wave, so
+            every SM gets an even, contiguous share and lanes past it are padding.
+
+    @params: wave_tasks -> int, the number of tasks in the wave.
+    @params: num_sms, num_warps, num_threads_per_warp -> int, device configuration.
+    @returns: task_mask -> np.array, bool per lane, True where the lane holds real work.
+    @returns: task_offset -> np.array, int64 index within the wave of the task of every real lane.
+    @returns: active_warps -> np.array, per SM the number of warps that hold real lanes.
+'''
+def wave_layout(wave_tasks: int, num_sms: int, num_warps: int, num_threads_per_warp: int):
+    sm_capacity = num_warps * num_threads_per_warp
+    wave_capacity = num_sms * sm_capacity
+    pairs_per_sm = (wave_tasks + num_sms - 1) // num_sms  # Ensure even workload
+
+    sm_idx, lane = np.divmod(np.arange(wave_capacity), sm_capacity)
+    task_offset = sm_idx * pairs_per_sm + lane
+    task_mask = (lane < pairs_per_sm) & (task_offset < wave_tasks)
+
+    sm_tasks = np.clip(wave_tasks - np.arange(num_sms) * pairs_per_sm, 0, pairs_per_sm)
+    active_warps = (sm_tasks + num_threads_per_warp - 1) // num_threads_per_warp
+    return task_mask, task_offset[task_mask], active_warps
+
+'''
+    @brief: Builds the layouts of a launch, one per distinct wave size (the full waves and the last one).
+
+    @params: total_tasks -> int, the number of tasks of the launch.
+    @params: num_sms, num_warps, num_threads_per_warp -> int, device configuration.
+    @returns: dict, WaveLayout by wave task count.
+'''
+def build_layouts(total_tasks: int, num_sms: int, num_warps: int, num_threads_per_warp: int) -> dict:
+    wave_capacity = num_sms * num_warps * num_threads_per_warp
+    num_waves = max(1, (total_tasks + wave_capacity - 1) // wave_capacity)
+    sizes = {min(wave_capacity, total_tasks - wave_idx * wave_capacity) for wave_idx in {0, num_waves - 1}}
+    return {tasks: WaveLayout(tasks, *wave_layout(tasks, num_sms, num_warps, num_threads_per_warp)) for tasks in sizes}
+
+'''
+    @brief: Builds the index plan of one wave from its layout.
+
+    @params: operation -> str, "dot", "matmul", "batch_dot", "batch_matmul", "elementwise" or "conv2d".
+    @params: shape1 -> tuple, shape of arr1.
+    @params: shape2 -> tuple, shape of arr2.
+    @params: wave_start -> int, index of the first task of the wave.
+    @params: layout -> WaveLayout, the layout of the wave.
+    @returns: WavePlan
+'''
+def build_wave(operation: str, shape1: tuple, shape2: tuple, wave_start: int, layout: WaveLayout) -> WavePlan:
+    task_mask = layout.task_mask
+    pair_idx = wave_start + layout.task_offset
+    task_map = np.zeros(task_mask.size, dtype=np.int64)
+    if operation == "dot":
+        arr1_idx = pair_idx
+        arr2_idx = pair_idx
+    elif operation == "batch_dot":
+        arr1_idx = pair_idx
+        arr2_idx = pair_idx
+        task_map[task_mask] = pair_idx // shape1[1]  # one output per row of the batch
+    elif operation == "elementwise":
+        arr1_idx = pair_idx
+        arr2_idx = pair_idx
+        task_map[task_mask] = pair_idx  # every lane has its own output
+    elif operation == "conv2d":
+        # A matmul of the (OH * OW, C * KH * KW) im2col matrix with the kernels, (f, p, q) indexed with q fastest.
+        # Patch elements are read from the image itself, the im2col matrix is never built.
+        C, _, _, _, KH, KW, OH, OW = conv_shapes(shape1, shape2)
+        patch_size = C * KH * KW
+        task_idx, q = np.divmod(pair_idx, patch_size)
+        f, p = np.divmod(task_idx, OH * OW)
+        arr1_idx = patch_index(shape1, shape2, p, q)
+        arr2_idx = f * patch_size + q
+        task_map[task_mask] = task_idx  # flat output index f * OH * OW + p
+    else:
+        # matmul is a batch of one, (b, i, j, k) indexed multiplications
+        m, k = shape1[-2:]
+        n = shape2[-1]
+        task_idx, k_idx = np.divmod(pair_idx, k)
+        b, cell = np.divmod(task_idx, m * n)
+        i, j = np.divmod(cell, n)
+        arr1_idx = (b * m + i) * k + k_idx
+        arr2_idx = (b * k + k_idx) * n + j
+        task_map[task_mask] = task_idx  # flat output index (b * m + i) * n + j
+
+    return WavePlan(layout.tasks, task_mask, task_map, arr1_idx, arr2_idx, layout.active_warps)
+
+'''
+    @brief: Builds the plan of a whole launch, splitting it into as many waves as needed.
+
+    @params: key -> tuple, (operation, arr1 shape, arr2 shape, num_sms, num_warps, num_threads_per_warp).
+    @returns: LaunchPlan
+'''
+def build_plan(key: tuple) -> LaunchPlan:
+    operation, shape1, shape2, num_sms, num_warps, num_threads_per_warp = key
+    wave_capacity = num_sms * num_warps * num_threads_per_warp
+    if operation in ("dot", "batch_dot", "elementwise"):
+        total_tasks = int(np.prod(shape1))
+    elif operation == "conv2d":
+        C, _, _, F, KH, KW, OH, OW = conv_shapes(shape1, shape2)
+        total_tasks = F * OH * OW * C * KH * KW
+    else:
+        total_tasks = int(np.prod(shape1[:-1])) * shape2[-1] * shape1[-1]
+
+    return LaunchPlan(key, total_tasks, wave_capacity, build_layouts(total_tasks, num_sms, num_warps, num_threads_per_warp))
+
+'''
+    @brief: Builds an uncached plan from explicit per-task indices, for launches whose work depends on the
+            values of the inputs rather than only their shapes (e.g. the nonzero products of a sparse matmul).
+
+    @params: arr1_idx -> np.array, int64 index into the first operand source of every task.
+    @params: arr2_idx -> np.array, int64 index into the second operand source of every task.
+    @params: out_idx -> np.array, int64 flat output index of every task.
+    @params: num_sms, num_warps, num_threads_per_warp -> int, device configuration.
+    @returns: LaunchPlan, with key None.
+'''
+def build_index_plan(arr1_idx: np.array, arr2_idx: np.array, out_idx: np.array, num_sms: int, num_warps: int,
+                     num_threads_per_warp: int) -> LaunchPlan:
+    wave_capacity = num_sms * num_warps * num_threads_per_warp
+    layouts = build_layouts(len(out_idx), num_sms, num_warps, num_threads_per_warp)
+    return LaunchPlan(None, len(out_idx), wave_capacity, layouts, (arr1_idx, arr2_idx, out_idx))
+
+'''
+    @brief: Returns the plan for a launch, building it on a cache miss and evicting least recently used plans
+            while the cache holds too many plans or too many bytes.
+
+    @params: operation -> str, "dot", "matmul", "batch_dot", "batch_matmul", "elementwise" or "conv2d".
+    @params: shape1 -> tuple, shape of arr1.
+    @params: shape2 -> tuple, shape of arr2.
+    @params: num_sms, num_warps, num_threads_per_warp -> int, device configuration.
+    @returns: LaunchPlan
+'''
+def get_plan(operation: str, shape1: tuple, shape2: tuple, num_sms: int, num_warps: int,
+             num_threads_per_warp: int) -> LaunchPlan:
+    key = (operation, tuple(shape1), tuple(shape2), num_sms, num_warps, num_threads_per_warp)
+    with _plan_lock:
+        if key in _plan_cache:
+            _plan_cache.move_to_end(key)
+            _plan_stats["hits"] += 1
+            return _plan_cache[key]
+        _plan_stats["misses"] += 1
+
+    plan = build_plan(key)
+
+    with _plan_lock:
+        if key not in _plan_cache:
+            _plan_cache[key] = plan
+            _plan_stats["nbytes"] += plan.nbytes
+        _plan_cache.move_to_end(key)
+        _evict()
+    return plan
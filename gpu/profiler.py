@@ -0,0 +1,186 @@
+import json
+import os
+import time
+from collections import defaultdict
+from logic_gates.control import Control
+
+'''
+    @brief: Opt-in profiler for GPU_SIM launches. The simulator only calls into it when profiling is enabled,
+            so a disabled profiler costs a single "is None" check per wave and per SM.
+
+            It records:
+              - wall time of every launch stage, wave, SM and warp (as timeline spans)
+              - ALU operation counts by opcode, decoded with Control.decode
+              - useful vs. zero-padded lanes staged by distribute_data
+              - bytes copied from global memory into StreamMulti.local_mem and back
+              - bytes loaded from global into SM shared memory, and from shared memory into the operand registers
+
+            The spans can be exported as Chrome / Perfetto trace JSON (chrome://tracing or ui.perfetto.dev),
+            and summary() renders everything as a text table.
+'''
+class Profiler:
+
+    def __init__(self):
+        self.control_unit = Control()
+        self.origin = time.perf_counter()
+        self.reset()
+
+    """
+        @brief: Drops everything recorded so far.
+    """
+    def reset(self):
+        self.events = []
+        self.op_counts = defaultdict(int)
+        self.useful_lanes = 0
+        self.padded_lanes = 0
+        self.bytes_to_local = 0
+        self.bytes_to_global = 0
+        self.bytes_to_shared = 0
+        self.bytes_shared_to_local = 0
+
+    """
+        @brief: Returns the current time, to be passed back to span() as the start of a span.
+    """
+    def now(self) -> float:
+        return time.perf_counter()
+
+    """
+        @brief: Records a finished span.
+
+        @params: name -> str, label shown on the timeline.
+        @params: category -> str, "launch", "wave", "sm" or "warp".
+        @params: start -> float, value returned by now() when the span began.
+        @params: track -> str, timeline row the span is drawn on ("GPU_SIM", "SM 0", ...).
+        @params: args -> dict, extra values attached to the span.
+    """
+    def span(self, name: str, category: str, start: float, track: str = "GPU_SIM", args: dict = None):
+        end = time.perf_counter()
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "track": track,
+            "start": start - self.origin,
+            "duration": end - start,
+            "args": args or {},
+        })
+
+    """
+        @brief: Counts ALU operations executed by a warp or SM.
+
+        @params: control_code -> str, the 3-bit code that was executed.
+        @params: lanes -> int, the number of ALUs that executed it.
+    """
+    def count_ops(self, control_code: str, lanes: int):
+        self.op_counts[self.control_unit.decode(control_code)] += lanes
+
+    """
+        @brief: Counts warp-level MMA tile instructions, reported next to the ALU opcodes.
+
+        @params: tiles -> int, the number of tile instructions executed.
+    """
+    def count_mma(self, tiles: int):
+        self.op_counts["MMA"] += tiles
+
+    """
+        @brief: Records the lane usage of one staged wave.
+
+        @params: useful -> int, lanes holding real work.
+        @params: padded -> int, lanes holding zero padding.
+    """
+    def count_lanes(self, useful: int, padded: int):
+        self.useful_lanes += useful
+        self.padded_lanes += padded
+
+    """
+        @brief: Records bytes copied between global memory, SM shared memory and SM local memory.
+
+        @params: to_local -> int, bytes moved from global memory into an SM.
+        @params: to_global -> int, bytes moved from an SM back to global memory.
+        @params: to_shared -> int, bytes loaded from global memory into an SM's shared memory.
+        @params: shared_to_local -> int, bytes moved from an SM's shared memory into its operand registers.
+    """
+    def count_bytes(self, to_local: int = 0, to_global: int = 0, to_shared: int = 0, shared_to_local: int = 0):
+        self.bytes_to_local += to_local
+        self.bytes_to_global += to_global
+        self.bytes_to_shared += to_shared
+        self.bytes_shared_to_local += shared_to_local
+
+    """
+        @brief: Converts the recorded spans to Chrome trace events, one thread row per track.
+
+        @returns: dict, a Chrome trace document ({"traceEvents": [...]}) with the counters in "otherData".
+    """
+    def chrome_trace(self) -> dict:
+        tracks = {}
+        trace_events = []
+        for event in self.events:
+            tid = tracks.setdefault(event["track"], len(tracks))
+            trace_events.append({
+                "name": event["name"],
+                "cat": event["cat"],
+                "ph": "X",
+                "ts": event["start"] * 1e6,
+                "dur": event["duration"] * 1e6,
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": event["args"],
+            })
+        for track, tid in tracks.items():
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": track}})
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms", "otherData": self.counters()}
+
+    """
+        @brief: Writes the Chrome / Perfetto trace JSON to a file.
+
+        @params: path -> str, output file.
+    """
+    def export_chrome_trace(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    """
+        @brief: Returns the counters recorded so far.
+
+        @returns: dict, op counts by opcode, lane usage and bytes copied (global, shared and local memory).
+    """
+    def counters(self) -> dict:
+        total_lanes = self.useful_lanes + self.padded_lanes
+        return {
+            "op_counts": dict(self.op_counts),
+            "useful_lanes": self.useful_lanes,
+            "padded_lanes": self.padded_lanes,
+            "padding_fraction": self.padded_lanes / total_lanes if total_lanes else 0.0,
+            "bytes_to_local": self.bytes_to_local,
+            "bytes_to_global": self.bytes_to_global,
+            "bytes_to_shared": self.bytes_to_shared,
+            "bytes_shared_to_local": self.bytes_shared_to_local,
+        }
+
+    """
+        @brief: Renders the timings and counters as a text table.
+
+        @returns: str, the summary table.
+    """
+    def summary(self) -> str:
+        totals = defaultdict(lambda: [0, 0.0])
+        for event in self.events:
+            key = (event["cat"], event["track"] if event["cat"] != "warp" else f"{event['track']} / {event['name']}")
+            if event["cat"] in ("launch", "wave"):
+                key = (event["cat"], event["name"].split(" ")[0])
+            totals[key][0] += 1
+            totals[key][1] += event["duration"]
+
+        lines = [f"{'category':<10} {'unit':<24} {'calls':>7} {'total ms':>11} {'mean ms':>10}"]
+        for (category, unit), (calls, seconds) in totals.items():
+            lines.append(f"{category:<10} {unit:<24} {calls:>7} {seconds * 1e3:>11.3f} {seconds / calls * 1e3:>10.3f}")
+
+        counters = self.counters()
+        lines.append("")
+        lines.append("ALU ops: " + ", ".join(f"{op}={count}" for op, count in sorted(counters["op_counts"].items())))
+        lines.append(f"Lanes: {counters['useful_lanes']} useful, {counters['padded_lanes']} padded "
+                     f"({counters['padding_fraction']:.1%} padding)")
+        lines.append(f"Bytes: {counters['bytes_to_local']} global -> local_mem, {counters['bytes_to_global']} local_mem -> global")
+        if counters["bytes_to_shared"] or counters["bytes_shared_to_local"]:
+            lines.append(f"Shared: {counters['bytes_to_shared']} global -> shared_mem, "
+                         f"{counters['bytes_shared_to_local']} shared_mem -> operand registers")
+        return "\n".join(lines)
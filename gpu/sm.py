@@ -1,70 +1,314 @@
 import numpy as np
-from gpu.warp import Warp
+from gpu.warp import Warp, TILE
+
+NUM_BANKS = 2  # operand register banks per SM, one is computed on while the next launch is staged in the other
+SHARED_MEM_SIZE = 4096  # int64 elements of shared memory per SM (32 KiB)
+REDUCE_BITS = 31  # width of the ALUs of the reduction tree, so every partial fits the int32 local memory
+
+# Tree reductions: the ALU opcode of a step and the identity that pads an odd lane. min and max run SUB and
+# pick an operand by the sign bit of the difference, so their values must stay below 2^(REDUCE_BITS - 1).
+REDUCTIONS = {
+    "sum": ("000", 0),
+    "xor": ("100", 0),
+    "min": ("001", (1 << (REDUCE_BITS - 1)) - 1),
+    "max": ("001", 0),
+}
 
 class StreamMulti:
     '''
         @breif: This is the streaming multiprocessor (SM), responsible for distributing workloads to Warps,
                 executing computations in parallel across multiple ALUs, and storing results in local memory.
+                Operands and results live in preallocated register-file arrays and every warp works on a view
+                of them, so a launch only copies contiguous slices and never builds per-element objects.
+                The operand registers are double-buffered: the warps read the selected bank while the next
+                launch can be staged into the other one, and select_bank() swaps them without copying.
+                A block of work can load its input tiles once into the SM's shared memory (load_shared) and
+                then fill the operand registers from there (stage_shared) as often as it likes.
+                tree_reduce() reduces a run of values to one in log2 steps, each step combining the lower and
+                upper half of the lanes on the warps' ALUs.
 
         @params: num_warps -> int, the number of warps in this SM.
         @params: num_threads_per_warp -> int, the number of ALU threads per warp.
         @params: num_bits -> int, the bit precision for ALU computations.
-        @params: local_mem -> np.array, local storage for intermediate ALU results.
-        @params: warps -> list[Warp], the warps executing computations.
+        @params: backend -> str, the ALU backend used by every warp ("scalar", "bitslice" or "lut").
+        @params: adder -> str, the adder implementation of every ALU ("ripple" or "kogge_stone").
+        @params: multiplier -> str, the multiplier of every ALU ("native", "shift_add" or "booth").
+        @params: operands -> np.array, (NUM_BANKS, num_warps, num_threads_per_warp, 2) int64 operand register
+                 banks. A caller (GPU_SIM, SMPool) can pass a view of a device-wide buffer, otherwise they are
+                 allocated.
+        @params: local_mem -> np.array, (num_warps, num_threads_per_warp) int32 local storage for the ALU
+                 results, passed in or allocated like operands.
+        @params: mma_operands -> np.array, (num_warps, 2, TILE, TILE) int64 tile registers of the warps' MMA
+                 instruction, passed in or allocated like operands.
+        @params: accumulators -> np.array, (num_warps, TILE, TILE) int64 MMA accumulators, one tile per warp.
+        @params: shared_mem -> np.array, (size,) int64 shared memory of the SM. When none is passed in,
+                 SHARED_MEM_SIZE elements are allocated by the first load_shared().
+        @params: shared_split -> int, where the second input's tile starts in shared memory.
+        @params: bank -> int, the operand bank the warps currently read.
+        @params: warps -> list[Warp], the warps executing computations. A slot stays None until a launch first
+                 runs that warp (see warp()), so large devices are cheap to build.
+        @params: reduce_warps -> list[Warp], REDUCE_BITS wide warps on the same registers that run the steps of
+                 tree_reduce(), built on first use like warps.
+        @params: active_warps -> int, how many leading warps hold work in the staged data, set by GPU_SIM per
+                 wave. Warps past it are not run and their local memory is zeroed.
+        @params: sm_id -> int, index of this SM in the GPU_SIM, used to label profiler tracks.
+        @params: profiler -> Profiler, set by GPU_SIM when profiling is enabled, otherwise None.
     '''
-    def __init__(self, num_warps: int, num_threads_per_warp: int, num_bits: int):
+    __slots__ = ("num_warps", "num_threads_per_warp", "num_bits", "backend", "adder", "multiplier",
+                 "operand_banks", "bank", "operands", "local_mem", "mma_operands", "accumulators", "shared_mem", "shared_split",
+                 "warps", "reduce_warps", "active_warps", "sm_id", "profiler")
+
+    def __init__(self, num_warps: int, num_threads_per_warp: int, num_bits: int, backend: str = "scalar",
+                 adder: str = "ripple", multiplier: str = "native", operands: np.array = None, local_mem: np.array = None,
+                 mma_operands: np.array = None, accumulators: np.array = None, shared_mem: np.array = None):
         self.num_warps = num_warps
         self.num_threads_per_warp = num_threads_per_warp
         self.num_bits = num_bits
-        self.warps = [Warp(num_threads_per_warp, num_bits) for _ in range(num_warps)]
-        self.local_mem = np.zeros((num_warps, num_threads_per_warp), dtype=np.int32)
+        self.backend = backend
+        self.adder = adder
+        self.multiplier = multiplier
+        if operands is None:
+            operands = np.zeros((NUM_BANKS, num_warps, num_threads_per_warp, 2), dtype=np.int64)
+        if local_mem is None:
+            local_mem = np.zeros((num_warps, num_threads_per_warp), dtype=np.int32)
+        assert operands.shape == (NUM_BANKS, num_warps, num_threads_per_warp, 2), "Operand registers must match the SM shape."
+        assert local_mem.shape == (num_warps, num_threads_per_warp), "Local memory must match the SM shape."
+        self.operand_banks = operands
+        self.bank = 0
+        self.operands = operands[0]
+        self.local_mem = local_mem
+        if mma_operands is None:
+            mma_operands = np.zeros((num_warps, 2, TILE, TILE), dtype=np.int64)
+        if accumulators is None:
+            accumulators = np.zeros((num_warps, TILE, TILE), dtype=np.int64)
+        self.mma_operands = mma_operands
+        self.accumulators = accumulators
+        self.shared_mem = shared_mem
+        self.shared_split = 0
+        self.warps = [None] * num_warps
+        self.reduce_warps = [None] * num_warps
+        self.active_warps = num_warps
+        self.sm_id = 0
+        self.profiler = None
+
+    '''
+        @breif: Returns warp w, building it on first use with views of its rows of the register files.
+
+        @params: w -> int, index of the warp.
+        @returns: Warp, the warp.
+    '''
+    def warp(self, w: int) -> Warp:
+        warp = self.warps[w]
+        if warp is None:
+            warp = Warp(self.num_threads_per_warp, self.num_bits, self.backend, self.adder, self.multiplier,
+                        self.operands[w], self.local_mem[w], self.mma_operands[w], self.accumulators[w])
+            self.warps[w] = warp
+        return warp
+
+    '''
+        @breif: Returns reduction warp w, building it on first use. Partial sums outgrow num_bits, so these warps
+                are REDUCE_BITS wide, and use the bitslice backend when the SM runs lookup tables (which stop
+                at 8 bits).
+
+        @params: w -> int, index of the warp.
+        @returns: Warp, the warp.
+    '''
+    def reduce_warp(self, w: int) -> Warp:
+        warp = self.reduce_warps[w]
+        if warp is None:
+            backend = "bitslice" if self.backend == "lut" else self.backend
+            warp = Warp(self.num_threads_per_warp, REDUCE_BITS, backend, self.adder, "native",
+                        self.operands[w], self.local_mem[w])
+            self.reduce_warps[w] = warp
+        return warp
 
     '''
-        @breif: Distributes data across the warps inside this SM.
+        @breif: Points the warps at another operand bank. Only views are swapped, no data is copied.
+
+        @params: bank -> int, the operand bank to compute on.
+        @returns: None
+    '''
+    def select_bank(self, bank: int):
+        if bank == self.bank:
+            return
+        self.bank = bank
+        self.operands = self.operand_banks[bank]
+        for w, warp in enumerate(self.warps):
+            if warp is not None:
+                warp.work_data = self.operands[w]
+        for w, warp in enumerate(self.reduce_warps):
+            if warp is not None:
+                warp.work_data = self.operands[w]
+
+    '''
+        @breif: Distributes data across the warps inside this SM by copying it into the operand registers,
+                the warps see it through their views. Lanes past the chunk are zeroed. Staging into the
+                bank that is not selected leaves the running launch untouched, select_bank() then swaps.
 
         @params: data_chunk -> np.array, the subsection of the input matrix assigned to this SM.
+        @params: bank -> int, the operand bank to stage into, the selected one when None.
         @returns: None
     '''
-    def distribute_data(self, data_chunk: np.array):
-        # Remove strict size assertion; handle variable chunk sizes
+    def distribute_data(self, data_chunk: np.array, bank: int = None):
         total_threads = self.num_warps * self.num_threads_per_warp
         chunk_size = data_chunk.shape[0]
 
         if chunk_size > total_threads:
-            # Truncate excess data if chunk is too large
-            data_chunk = data_chunk[:total_threads]
-        elif chunk_size < total_threads:
-            # Pad with zeros if chunk is too small
-            padding = np.zeros((total_threads - chunk_size, 2), dtype=np.int32)
-            data_chunk = np.vstack((data_chunk, padding))
+            # The GPU_SIM splits oversized work into waves, so never silently drop data here
+            raise ValueError(f"Data chunk of {chunk_size} pairs does not fit in {total_threads} threads.")
+
+        if bank is None:
+            bank = self.bank
+        registers = self.operand_banks[bank].reshape(total_threads, 2)
+        registers[:chunk_size] = data_chunk
+        registers[chunk_size:] = 0  # Pad with zeros if chunk is too small
+        if bank == self.bank:
+            self.active_warps = (chunk_size + self.num_threads_per_warp - 1) // self.num_threads_per_warp
+
+        if self.profiler is not None:
+            self.profiler.count_bytes(to_local=self.operands.nbytes)
+
+    '''
+        @breif: Loads one tile of each input from global memory into shared memory, the first at offset 0 and
+                the second right after it. This is the only global memory traffic of a block, its warps then
+                read the tiles through stage_shared as many times as they need them.
+
+        @params: tile1 -> np.array, tile of the first input (any view, it is copied).
+        @params: tile2 -> np.array, tile of the second input.
+        @returns: None
+    '''
+    def load_shared(self, tile1: np.array, tile2: np.array):
+        if self.shared_mem is None:
+            self.shared_mem = np.zeros(SHARED_MEM_SIZE, dtype=np.int64)
+        split = tile1.size
+        end = split + tile2.size
+        if end > self.shared_mem.size:
+            raise ValueError(f"Tiles of {end} elements do not fit in {self.shared_mem.size} elements of shared memory.")
+        self.shared_mem[:split].reshape(tile1.shape)[...] = tile1
+        self.shared_mem[split:end].reshape(tile2.shape)[...] = tile2
+        self.shared_split = split
+        if self.profiler is not None:
+            self.profiler.count_bytes(to_shared=end * self.shared_mem.itemsize)
 
-        # Reshape data for warps
-        reshaped_data = data_chunk.reshape(self.num_warps, self.num_threads_per_warp, 2)
+    '''
+        @breif: Fills the operand registers from the tiles in shared memory, lane l multiplies element idx1[l]
+                of the first tile with element idx2[l] of the second. Lanes past the indices are zeroed.
 
-        # Assign each warp its subset of data
-        for i, warp in enumerate(self.warps):
-            warp_data = list(map(tuple, reshaped_data[i]))
-            warp.distribute_work(warp_data)
+        @params: idx1 -> np.array, int64 offsets into the first tile, one per lane.
+        @params: idx2 -> np.array, int64 offsets into the second tile, one per lane.
+        @returns: None
+    '''
+    def stage_shared(self, idx1: np.array, idx2: np.array):
+        total_threads = self.num_warps * self.num_threads_per_warp
+        lanes = len(idx1)
+        if lanes > total_threads:
+            raise ValueError(f"{lanes} lanes do not fit in {total_threads} threads.")
+        registers = self.operands.reshape(total_threads, 2)
+        np.take(self.shared_mem, idx1, out=registers[:lanes, 0])
+        np.take(self.shared_mem[self.shared_split:], idx2, out=registers[:lanes, 1])
+        registers[lanes:] = 0
+        self.active_warps = (lanes + self.num_threads_per_warp - 1) // self.num_threads_per_warp
+        if self.profiler is not None:
+            self.profiler.count_bytes(shared_to_local=lanes * registers.itemsize * 2)
 
     '''
-        @breif: Runs computations in parallel on all Warps.
+        @breif: Runs computations in parallel on all Warps that hold work. Idle warps are skipped and their
+                results zeroed, which is what every opcode gives on zero padding.
 
         @params: control_code -> str, a 3-bit binary string specifying the operation.
         @returns: None
     '''
     def run_calculations(self, control_code: str):
-        for i, warp in enumerate(self.warps):
-            warp.run(control_code)
+        self.local_mem[self.active_warps:] = 0
+
+        if self.profiler is None:
+            for w in range(self.active_warps):
+                self.warp(w).run(control_code)
+            return
+
+        track = f"SM {self.sm_id}"
+        sm_start = self.profiler.now()
+        for w in range(self.active_warps):
+            warp_start = self.profiler.now()
+            self.warp(w).run(control_code)
+            self.profiler.span(f"warp {w}", "warp", warp_start, track=track)
+        self.profiler.count_ops(control_code, self.active_warps * self.num_threads_per_warp)
+        self.profiler.span(track, "sm", sm_start, track=track)
+
+    '''
+        @breif: Reduces up to 2 * num_warps * num_threads_per_warp values to one. The first step pairs value l
+                with value l + half in lane l, then every step runs the active reduction warps and pairs the
+                lower half of the results with the upper half, until one lane is left. An odd lane is paired
+                with the identity. min and max run SUB, and a 2:1 select driven by the sign bit of the
+                difference keeps the smaller or the larger operand.
+
+        @params: values -> np.array, int64 values in [0, 2^REDUCE_BITS), below 2^(REDUCE_BITS - 1) for min and max.
+        @params: op -> str, "sum", "xor", "min" or "max" (a key of REDUCTIONS), sums wrap modulo 2^REDUCE_BITS.
+        @returns: int, the reduced value.
+    '''
+    def tree_reduce(self, values: np.array, op: str) -> int:
+        control_code, identity = REDUCTIONS[op]
+        total_threads = self.num_warps * self.num_threads_per_warp
+        count = len(values)
+        if not 1 <= count <= 2 * total_threads:
+            raise ValueError(f"tree_reduce takes 1 to {2 * total_threads} values, got {count}.")
+        registers = self.operands.reshape(total_threads, 2)
+        results = self.local_mem.reshape(-1)
+        if self.profiler is not None:
+            self.profiler.count_bytes(to_local=count * registers.itemsize)
+            sm_start = self.profiler.now()
+
+        while True:
+            lanes = (count + 1) // 2
+            registers[:lanes, 0] = values[:lanes]
+            registers[:count - lanes, 1] = values[lanes:count]
+            registers[count - lanes:lanes, 1] = identity
+            registers[lanes:] = 0
+            self.active_warps = (lanes + self.num_threads_per_warp - 1) // self.num_threads_per_warp
+            for w in range(self.active_warps):
+                self.reduce_warp(w).run(control_code)
+            if op in ("min", "max"):
+                a_smaller = (results[:lanes] >> (REDUCE_BITS - 1)) & 1
+                keep_a = a_smaller == (op == "min")
+                results[:lanes] = np.where(keep_a, registers[:lanes, 0], registers[:lanes, 1])
+            if self.profiler is not None:
+                self.profiler.count_ops(control_code, self.active_warps * self.num_threads_per_warp)
+            if lanes == 1:
+                break
+            values = results[:lanes].astype(np.int64)
+            count = lanes
+
+        if self.profiler is not None:
+            self.profiler.span(f"SM {self.sm_id} reduce", "sm", sm_start, track=f"SM {self.sm_id}")
+        return int(results[0])
+
+    '''
+        @breif: Issues the MMA instruction on every warp that holds a tile, accumulating in place. Idle warps
+                keep their accumulators untouched.
+
+        @returns: None
+    '''
+    def run_mma(self):
+        if self.profiler is None:
+            for w in range(self.active_warps):
+                self.warp(w).mma()
+            return
+
+        track = f"SM {self.sm_id}"
+        sm_start = self.profiler.now()
+        for w in range(self.active_warps):
+            self.warp(w).mma()
+        self.profiler.count_mma(self.active_warps)
+        self.profiler.span(f"{track} MMA", "sm", sm_start, track=track)
 
     '''
-        @breif: Collects computed results from all warps and stores them in local memory.
+        @breif: Collects computed results from all warps. The warps already wrote them into local memory
+                through their views, so this only flattens it.
 
-        @returns: np.array, the computed results from all ALUs in this SM.
+        @returns: np.array, the computed results from all ALUs in this SM (a view of local_mem).
     '''
     def gather_results(self) -> np.array:
-        for i, warp in enumerate(self.warps):
-            self.local_mem[i] = warp.gather_results()
-        return self.local_mem.flatten()
+        return self.local_mem.reshape(-1)
 
     '''
         @breif: Sends data from local memory in the SM back to global GPU memory.
@@ -72,4 +316,7 @@ class StreamMulti:
         @returns: np.array, the final processed data to be sent to the GPU_SIM.
     '''
     def send_info(self) -> np.array:
-        return self.gather_results()
\ No newline at end of file
+        results = self.gather_results()
+        if self.profiler is not None:
+            self.profiler.count_bytes(to_global=results.nbytes)
+        return results
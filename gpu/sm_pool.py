@@ -0,0 +1,132 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from gpu.sm import StreamMulti, NUM_BANKS
+
+'''
+    @brief: Worker loop of the SMPool. The worker builds its own StreamMulti instances once and then waits for
+            control codes, per-SM active warp counts and the operand bank to compute on. The SMs' register
+            files are views of the shared memory blocks, so the warps read their operands and write their
+            results in place and no array is ever pickled between processes.
+
+    @params: conn -> Connection, pipe to the parent process.
+    @params: operand_shm -> SharedMemory, operand banks of every SM, shape (NUM_BANKS, num_sms, sm_capacity, 2) int64.
+    @params: result_shm -> SharedMemory, results of every SM, shape (num_sms, sm_capacity) int32.
+    @params: sm_indices -> list[int], the SMs pinned to this worker.
+    @params: num_sms, num_warps, num_threads_per_warp, num_bits, backend, adder, multiplier -> device configuration.
+'''
+def _sm_worker(conn, operand_shm, result_shm, sm_indices, num_sms, num_warps, num_threads_per_warp, num_bits, backend, adder, multiplier):
+    sm_capacity = num_warps * num_threads_per_warp
+    operands = np.ndarray((NUM_BANKS, num_sms, sm_capacity, 2), dtype=np.int64, buffer=operand_shm.buf)
+    results = np.ndarray((num_sms, sm_capacity), dtype=np.int32, buffer=result_shm.buf)
+    sms = [StreamMulti(num_warps, num_threads_per_warp, num_bits, backend, adder, multiplier,
+                       operands[:, s].reshape(NUM_BANKS, num_warps, num_threads_per_warp, 2),
+                       results[s].reshape(num_warps, num_threads_per_warp))
+           for s in sm_indices]
+
+    while True:
+        command = conn.recv()
+        if command is None:
+            break
+        control_code, active_warps, bank = command
+        try:
+            for s, sm in zip(sm_indices, sms):
+                sm.select_bank(bank)
+                sm.active_warps = active_warps[s]
+                sm.run_calculations(control_code)
+            conn.send(None)
+        except Exception as exc:
+            conn.send(exc)
+
+    del sms, operands, results
+    operand_shm.close()
+    result_shm.close()
+    conn.close()
+
+
+class SMPool:
+    '''
+        @brief: A pool of worker processes that each own a fixed group of StreamMulti instances. Operands and
+                results live in multiprocessing shared memory that both sides view as NumPy arrays, so a launch
+                only sends the control code and active warp counts over a pipe. The workers stay alive until close() is called, so
+                repeated launches do not pay process startup again.
+
+        @params: num_workers -> int, number of worker processes (capped at num_sms).
+        @params: num_sms -> int, number of streaming multiprocessors.
+        @params: num_warps -> int, number of warps per SM.
+        @params: num_threads_per_warp -> int, number of threads per warp.
+        @params: num_bits -> int, bit precision for ALU operations.
+        @params: backend -> str, ALU backend used by the workers' SMs.
+        @params: adder -> str, adder implementation used by the workers' ALUs.
+        @params: multiplier -> str, multiplier used by the workers' ALUs.
+    '''
+    def __init__(self, num_workers: int, num_sms: int, num_warps: int, num_threads_per_warp: int, num_bits: int, backend: str = "scalar", adder: str = "ripple", multiplier: str = "native"):
+        self.num_workers = max(1, min(num_workers, num_sms))
+        self.num_sms = num_sms
+        self.num_threads_per_warp = num_threads_per_warp
+        sm_capacity = num_warps * num_threads_per_warp
+
+        self.operand_shm = shared_memory.SharedMemory(create=True, size=NUM_BANKS * num_sms * sm_capacity * 2 * 8)
+        self.result_shm = shared_memory.SharedMemory(create=True, size=num_sms * sm_capacity * 4)
+        self.operands = np.ndarray((NUM_BANKS, num_sms, sm_capacity, 2), dtype=np.int64, buffer=self.operand_shm.buf)
+        self.results = np.ndarray((num_sms, sm_capacity), dtype=np.int32, buffer=self.result_shm.buf)
+        self.operands[:] = 0
+        self.results[:] = 0
+
+        # SM s is pinned to worker s % num_workers for the lifetime of the pool
+        self.sm_groups = [list(range(w, num_sms, self.num_workers)) for w in range(self.num_workers)]
+        self.connections = []
+        self.processes = []
+        for group in self.sm_groups:
+            parent_conn, child_conn = mp.Pipe()
+            process = mp.Process(
+                target=_sm_worker,
+                args=(child_conn, self.operand_shm, self.result_shm, group,
+                      num_sms, num_warps, num_threads_per_warp, num_bits, backend, adder, multiplier),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+
+    '''
+        @brief: Runs every SM on the operands currently in shared memory and waits for all workers.
+
+        @params: control_code -> str, a 3-bit binary string specifying the operation.
+        @params: active_warps -> list[int], warps holding work in each SM, all of them when None.
+        @params: bank -> int, the operand bank to compute on.
+        @returns: np.array, the results of all SMs concatenated in SM order (a view of shared memory).
+    '''
+    def run(self, control_code: str, active_warps=None, bank: int = 0) -> np.array:
+        assert self.processes, "SMPool has been closed."
+        if active_warps is None:
+            active_warps = [self.results.shape[1] // self.num_threads_per_warp] * self.num_sms
+        command = (control_code, [int(active) for active in active_warps], bank)
+        for conn in self.connections:
+            conn.send(command)
+        errors = [conn.recv() for conn in self.connections]
+        for error in errors:
+            if error is not None:
+                raise error
+        return self.results.reshape(-1)
+
+    '''
+        @brief: Stops the workers and releases the shared memory blocks.
+    '''
+    def close(self):
+        if not self.processes:
+            return
+        for conn in self.connections:
+            conn.send(None)
+            conn.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+        del self.operands, self.results
+        self.operand_shm.close()
+        self.operand_shm.unlink()
+        self.result_shm.close()
+        self.result_shm.unlink()
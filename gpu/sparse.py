@@ -0,0 +1,157 @@
+import numpy as np
+
+# A dense matmul switches to sparse execution when at most this fraction of its m * n * k products is nonzero
+SPARSE_DENSITY = 0.25
+
+class COO:
+    '''
+        @brief: A sparse matrix in coordinate format, entry e is values[e] at (rows[e], cols[e]).
+
+        @params: rows -> np.array, int64 row of every stored entry.
+        @params: cols -> np.array, int64 column of every stored entry.
+        @params: values -> np.array, the stored values.
+        @params: shape -> tuple, (rows, columns) of the matrix.
+    '''
+    __slots__ = ("rows", "cols", "values", "shape")
+
+    def __init__(self, rows, cols, values, shape):
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.values = np.asarray(values)
+        self.shape = tuple(shape)
+        assert self.rows.shape == self.cols.shape == self.values.shape, "COO arrays must have the same length."
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    @property
+    def nnz(self) -> int:
+        return len(self.values)
+
+    '''
+        @brief: Builds a COO matrix from the nonzero entries of a dense 2D array.
+
+        @params: arr -> np.array, the dense matrix.
+        @returns: COO
+    '''
+    @classmethod
+    def from_dense(cls, arr: np.array):
+        arr = np.asarray(arr)
+        assert arr.ndim == 2, "Only 2D arrays can be converted to COO."
+        rows, cols = np.nonzero(arr)
+        return cls(rows, cols, arr[rows, cols], arr.shape)
+
+    '''
+        @brief: Returns self, so COO, CSR and scipy.sparse matrices can all be read through tocoo().
+    '''
+    def tocoo(self):
+        return self
+
+    '''
+        @brief: Expands the matrix into a dense array.
+
+        @returns: np.array
+    '''
+    def toarray(self) -> np.array:
+        dense = np.zeros(self.shape, dtype=self.values.dtype)
+        np.add.at(dense, (self.rows, self.cols), self.values)
+        return dense
+
+
+class CSR:
+    '''
+        @brief: A sparse matrix in compressed sparse row format. The entries of row i are
+                values[indptr[i]:indptr[i + 1]] in columns indices[indptr[i]:indptr[i + 1]].
+
+        @params: values -> np.array, the stored values.
+        @params: indices -> np.array, int64 column of every stored entry.
+        @params: indptr -> np.array, int64 start of every row in values, plus the total count at the end.
+        @params: shape -> tuple, (rows, columns) of the matrix.
+    '''
+    __slots__ = ("values", "indices", "indptr", "shape")
+
+    def __init__(self, values, indices, indptr, shape):
+        self.values = np.asarray(values)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.shape = tuple(shape)
+        assert len(self.indptr) == self.shape[0] + 1, "indptr must have one entry per row plus one."
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    @property
+    def nnz(self) -> int:
+        return len(self.values)
+
+    '''
+        @brief: Converts to coordinate format.
+
+        @returns: COO
+    '''
+    def tocoo(self) -> COO:
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        return COO(rows, self.indices, self.values, self.shape)
+
+    '''
+        @brief: Expands the matrix into a dense array.
+
+        @returns: np.array
+    '''
+    def toarray(self) -> np.array:
+        return self.tocoo().toarray()
+
+'''
+    @brief: Tells whether an input is stored sparse (COO, CSR or any scipy.sparse matrix, which all have
+            tocoo()). scipy itself is not required.
+
+    @params: arr -> object, a matmul input.
+    @returns: bool
+'''
+def is_sparse(arr) -> bool:
+    return hasattr(arr, "tocoo")
+
+'''
+    @brief: Reads any sparse or dense 2D input as a COO matrix.
+
+    @params: arr -> object, a COO, CSR, scipy.sparse matrix or dense 2D array.
+    @returns: COO
+'''
+def as_coo(arr) -> COO:
+    if isinstance(arr, COO):
+        return arr
+    if is_sparse(arr):
+        coo = arr.tocoo()
+        return COO(coo.row if hasattr(coo, "row") else coo.rows,
+                   coo.col if hasattr(coo, "col") else coo.cols,
+                   coo.data if hasattr(coo, "data") else coo.values, coo.shape)
+    return COO.from_dense(arr)
+
+'''
+    @brief: Lists every nonzero product of (m x k) @ (k x n). Entry a of the first matrix pairs with every
+            entry of the second whose row equals a's column, so both sides are grouped by k and each entry
+            of the first is repeated once per partner. Cost is linear in the number of products.
+
+    @params: coo1 -> COO, the first matrix.
+    @params: coo2 -> COO, the second matrix.
+    @returns: arr1_idx -> np.array, int64 entry of coo1 of every product.
+    @returns: arr2_idx -> np.array, int64 entry of coo2 of every product.
+    @returns: out_idx -> np.array, int64 flat output index i * n + j of every product.
+'''
+def product_pairs(coo1: COO, coo2: COO):
+    k = coo1.shape[1]
+    n = coo2.shape[1]
+    order2 = np.argsort(coo2.rows, kind="stable")
+    row_counts = np.bincount(coo2.rows, minlength=k)
+    row_starts = np.concatenate(([0], np.cumsum(row_counts)[:-1]))
+
+    partners = row_counts[coo1.cols]  # products each entry of coo1 takes part in
+    arr1_idx = np.repeat(np.arange(coo1.nnz), partners)
+    # Position of every product within its coo1 entry's group of partners
+    group_starts = np.repeat(np.cumsum(partners) - partners, partners)
+    within = np.arange(len(arr1_idx)) - group_starts
+    arr2_idx = order2[np.repeat(row_starts[coo1.cols], partners) + within]
+    out_idx = coo1.rows[arr1_idx] * n + coo2.cols[arr2_idx]
+    return arr1_idx, arr2_idx, out_idx
@@ -0,0 +1,163 @@
+import numpy as np
+from gpu.gpu_sim import GPU_SIM
+
+STRASSEN_BITS = 31  # the planner computes modulo 2^STRASSEN_BITS, so every value stays a non-negative int32
+STRASSEN_MASK = (1 << STRASSEN_BITS) - 1
+ADD, SUB = "000", "001"
+
+class StrassenPlanner:
+    '''
+        @brief: Recursive Strassen matmul on top of a GPU_SIM. While every dimension of a product is above the
+                cutoff, the inputs are zero-padded to even sizes and cut into 2 x 2 blocks, and the product is
+                built from seven block products instead of eight (unless the padding would eat the saving).
+                The block sums and differences run as elementwise ADD and SUB launches, the products below the
+                cutoff as regular matmul launches.
+
+                Block sums outgrow num_bits and differences go negative, so all arithmetic is done modulo
+                2^STRASSEN_BITS: ADD and SUB run on a companion GPU_SIM with STRASSEN_BITS wide ALUs, and the
+                matmul launches take the wrapped operands as they are (their int32 sums wrap modulo 2^32,
+                which keeps them exact modulo 2^STRASSEN_BITS). The result is exact whenever the true product
+                is below 2^STRASSEN_BITS, which covers every product that fits a non-negative int32.
+
+        @params: gpu -> GPU_SIM, the device the matmuls run on. Its MUL must take operands wider than
+                 num_bits, so the "scalar" or "bitslice" backend with the "native" multiplier.
+        @params: cutoff -> int, products with any dimension at or below it run as one plain matmul launch.
+        @params: arith -> GPU_SIM, the companion device of the ADD / SUB launches, built on the first matmul.
+        @params: stats -> dict, the counters of the last matmul, see report().
+    '''
+    def __init__(self, gpu: GPU_SIM, cutoff: int = 64):
+        if gpu.backend == "lut" or gpu.multiplier != "native":
+            raise ValueError("Strassen operands grow past num_bits, use the 'scalar' or 'bitslice' backend with the 'native' multiplier.")
+        assert cutoff >= 1, "The cutoff must be at least 1."
+        self.gpu = gpu
+        self.cutoff = cutoff
+        self.arith = None
+        self.stats = None
+
+    '''
+        @brief: Multiplies two matrices.
+
+        @params: arr1 -> np.array, (m, k) non-negative integers.
+        @params: arr2 -> np.array, (k, n) non-negative integers.
+        @returns: np.array, (m, n) int64 product, modulo 2^STRASSEN_BITS.
+    '''
+    def matmul(self, arr1: np.array, arr2: np.array) -> np.array:
+        assert arr1.ndim == 2 and arr2.ndim == 2, "Matrix multiplication requires 2D arrays."
+        assert arr1.shape[1] == arr2.shape[0], "Matrix dimensions must match for multiplication (m x k) * (k x n)."
+        if (arr1 < 0).any() or (arr2 < 0).any():
+            raise ValueError("Strassen inputs must be non-negative.")
+        (m, k), n = arr1.shape, arr2.shape[1]
+        # An ADD / SUB launch stacks at most four quarters of the padded output or of a padded input
+        needed = max((m + 1) * (n + 1), (m + 1) * (k + 1), (k + 1) * (n + 1))
+        if self.arith is None or len(self.arith.global_memory) < needed:
+            self.arith = GPU_SIM(self.gpu.num_sms, needed, self.gpu.num_warps, self.gpu.num_threads_per_warp,
+                                 STRASSEN_BITS, self.gpu.backend, self.gpu.adder)
+
+        self.stats = {
+            "cutoff": self.cutoff,
+            "levels": 0,
+            "matmul_launches": 0,
+            "mul_dispatches": 0,
+            "standard_mul_dispatches": m * n * k,
+            "add_sub_launches": 0,
+            "add_sub_dispatches": 0,
+        }
+        result = self.multiply(np.asarray(arr1, dtype=np.int64) & STRASSEN_MASK,
+                               np.asarray(arr2, dtype=np.int64) & STRASSEN_MASK, 0)
+        self.stats["mul_saved"] = self.stats["standard_mul_dispatches"] - self.stats["mul_dispatches"]
+        return result
+
+    '''
+        @brief: Multiplies one (sub)problem, recursing while every dimension is above the cutoff and the seven
+                (padded) half products take fewer multiplies than the problem itself.
+
+        @params: arr1 -> np.array, (m, k) int64 operands in [0, 2^STRASSEN_BITS).
+        @params: arr2 -> np.array, (k, n) int64 operands in [0, 2^STRASSEN_BITS).
+        @params: level -> int, recursion depth.
+        @returns: np.array, (m, n) int64 product modulo 2^STRASSEN_BITS.
+    '''
+    def multiply(self, arr1: np.array, arr2: np.array, level: int) -> np.array:
+        (m, k), n = arr1.shape, arr2.shape[1]
+        hm, hk, hn = -(-m // 2), -(-k // 2), -(-n // 2)
+        # Padding odd sizes can cost more multiplies than the seven half products save
+        if min(m, k, n) <= self.cutoff or 7 * hm * hk * hn >= m * k * n:
+            return self.base_product(arr1, arr2)
+        self.stats["levels"] = max(self.stats["levels"], level + 1)
+
+        A = np.zeros((2 * hm, 2 * hk), dtype=np.int64)
+        B = np.zeros((2 * hk, 2 * hn), dtype=np.int64)
+        A[:m, :k] = arr1
+        B[:k, :n] = arr2
+        A11, A12, A21, A22 = A[:hm, :hk], A[:hm, hk:], A[hm:, :hk], A[hm:, hk:]
+        B11, B12, B21, B22 = B[:hk, :hn], B[:hk, hn:], B[hk:, :hn], B[hk:, hn:]
+
+        S1, S2, S3 = self.combine(ADD, (A11, A21, A11), (A22, A22, A12))
+        S4, S5 = self.combine(SUB, (A21, A12), (A11, A22))
+        T1, T2, T3 = self.combine(ADD, (B11, B11, B21), (B22, B12, B22))
+        T4, T5 = self.combine(SUB, (B12, B21), (B22, B11))
+
+        M1 = self.multiply(S1, T1, level + 1)
+        M2 = self.multiply(S2, B11, level + 1)
+        M3 = self.multiply(A11, T4, level + 1)
+        M4 = self.multiply(A22, T5, level + 1)
+        M5 = self.multiply(S3, B22, level + 1)
+        M6 = self.multiply(S4, T2, level + 1)
+        M7 = self.multiply(S5, T3, level + 1)
+
+        U1, C12, C21, U2 = self.combine(ADD, (M1, M3, M2, M1), (M4, M5, M4, M3))
+        U3, U4 = self.combine(ADD, (U1, U2), (M7, M6))
+        C11, C22 = self.combine(SUB, (U3, U4), (M5, M2))
+
+        C = np.empty((2 * hm, 2 * hn), dtype=np.int64)
+        C[:hm, :hn], C[:hm, hn:], C[hm:, :hn], C[hm:, hn:] = C11, C12, C21, C22
+        return C[:m, :n]
+
+    '''
+        @brief: Runs one plain matmul launch on the device. It always dispatches dense, so the MUL counts of
+                report() measure what the recursion saves and not what the sparse matmul mode skips.
+
+        @params: arr1 -> np.array, (m, k) int64 operands in [0, 2^STRASSEN_BITS).
+        @params: arr2 -> np.array, (k, n) int64 operands in [0, 2^STRASSEN_BITS).
+        @returns: np.array, (m, n) int64 product modulo 2^STRASSEN_BITS.
+    '''
+    def base_product(self, arr1: np.array, arr2: np.array) -> np.array:
+        gpu = self.gpu
+        gpu.load_info(arr1, arr2, "matmul", sparse=False)
+        gpu.distribute_data()
+        gpu.run_computation("101")
+        self.stats["matmul_launches"] += 1
+        self.stats["mul_dispatches"] += gpu.total_tasks
+        # The int32 sums wrapped modulo 2^32, keep the low STRASSEN_BITS bits
+        return gpu.reconstruct_data().astype(np.int64) & STRASSEN_MASK
+
+    '''
+        @brief: Adds or subtracts several pairs of equally shaped blocks in one elementwise launch.
+
+        @params: control_code -> str, ADD or SUB.
+        @params: lefts -> tuple[np.array], the first operand of every pair.
+        @params: rights -> tuple[np.array], the second operand of every pair.
+        @returns: list[np.array], lefts[i] +/- rights[i] modulo 2^STRASSEN_BITS.
+    '''
+    def combine(self, control_code: str, lefts: tuple, rights: tuple) -> list:
+        result = self.arith.elementwise(np.stack(lefts), np.stack(rights), control_code).astype(np.int64)
+        self.stats["add_sub_launches"] += 1
+        self.stats["add_sub_dispatches"] += result.size
+        return list(result)
+
+    '''
+        @brief: Reports the last matmul.
+
+        @returns: dict, the cutoff and recursion levels, the matmul launches and the MUL dispatches they ran vs.
+                  the m * n * k of a plain matmul (and the difference, mul_saved), and the elementwise ADD / SUB
+                  launches and lanes it took. None before any matmul.
+    '''
+    def report(self) -> dict:
+        return self.stats
+
+    '''
+        @brief: Releases the companion device. The GPU_SIM the planner was built on stays open.
+    '''
+    def close(self):
+        if self.arith is not None:
+            self.arith.close()
+            self.arith = None
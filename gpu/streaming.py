@@ -0,0 +1,44 @@
+import numpy as np
+
+'''
+    @brief: Splits a dot product or matmul into chunks whose products add up to the full result. A dot product
+            is cut into contiguous runs of chunk_size elements, a matmul (m x k) @ (k x n) into slices of
+            chunk_size along k, arr1[:, k0:k1] @ arr2[k0:k1, :]. The chunks are slices, so for memory-mapped
+            inputs only the chunk being consumed is read from disk.
+
+    @params: arr1 -> np.array, first input, may be a np.memmap.
+    @params: arr2 -> np.array, second input, may be a np.memmap.
+    @params: chunk_size -> int, elements per chunk for "dot", columns of arr1 (rows of arr2) for "matmul".
+    @params: operation -> str, "dot" or "matmul".
+    @returns: generator of (np.array, np.array), the chunk pairs.
+'''
+def iter_chunks(arr1: np.array, arr2: np.array, chunk_size: int, operation: str = "dot"):
+    assert chunk_size >= 1, "chunk_size must be at least 1."
+    operation = operation.lower()
+    if operation == "dot":
+        flat1 = arr1.reshape(-1)
+        flat2 = arr2.reshape(-1)
+        assert flat1.shape == flat2.shape, "Vectors must have the same length for dot product."
+        for start in range(0, len(flat1), chunk_size):
+            yield flat1[start:start + chunk_size], flat2[start:start + chunk_size]
+    elif operation == "matmul":
+        assert arr1.ndim == 2 and arr2.ndim == 2, "Matrix multiplication requires 2D arrays."
+        assert arr1.shape[1] == arr2.shape[0], "Matrix dimensions must match for multiplication (m x k) * (k x n)."
+        for start in range(0, arr1.shape[1], chunk_size):
+            yield arr1[:, start:start + chunk_size], arr2[start:start + chunk_size, :]
+    else:
+        raise ValueError("Streaming supports 'dot' and 'matmul' only.")
+
+'''
+    @brief: Memory-maps two .npy files and splits them into chunks with iter_chunks.
+
+    @params: path1 -> str, .npy file of the first input.
+    @params: path2 -> str, .npy file of the second input.
+    @params: chunk_size -> int, see iter_chunks.
+    @params: operation -> str, "dot" or "matmul".
+    @returns: generator of (np.array, np.array), the chunk pairs, views of the memory maps.
+'''
+def iter_npy_chunks(path1: str, path2: str, chunk_size: int, operation: str = "dot"):
+    arr1 = np.load(path1, mmap_mode="r")
+    arr2 = np.load(path2, mmap_mode="r")
+    yield from iter_chunks(arr1, arr2, chunk_size, operation)
@@ -0,0 +1,286 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait
+import numpy as np
+from gpu.launch_plan import get_plan
+from gpu.sm import NUM_BANKS
+from gpu.sparse import is_sparse
+
+BLOCKING_ONLY = ("tiled_matmul", "shared_matmul")  # operations with their own run path, only GPU_SIM.run_computation runs them
+
+class Launch:
+    '''
+        @brief: One enqueued launch of an AsyncGPU, with the future its result is delivered through.
+
+        @params: arr1 -> np.array, first input.
+        @params: arr2 -> np.array, second input.
+        @params: operation -> str, "dot", "matmul", "batch_dot", "batch_matmul", "elementwise" or "conv2d".
+        @params: output_shape -> tuple, the shape of the result.
+        @params: control_code -> str, 3-bit binary string ("101" for MUL).
+        @params: future -> Future, resolved with the result, or the exception that stopped the launch.
+        @params: plan -> LaunchPlan, fetched from the plan cache when the launch is staged.
+        @params: failed -> bool, set once the launch raised, its remaining waves are then dropped.
+    '''
+    __slots__ = ("arr1", "arr2", "operation", "output_shape", "control_code", "future", "plan", "failed")
+
+    def __init__(self, arr1, arr2, operation, output_shape, control_code):
+        self.arr1 = arr1
+        self.arr2 = arr2
+        self.operation = operation
+        self.output_shape = output_shape
+        self.control_code = control_code
+        self.future = Future()
+        self.plan = None
+        self.failed = False
+
+
+class Stream:
+    '''
+        @brief: An ordered queue of launches on an AsyncGPU, like a CUDA stream. Launches on one stream run
+                in the order they were enqueued, launches on different streams are interleaved round robin.
+
+        @params: device -> AsyncGPU, the device the stream belongs to.
+        @params: stream_id -> int, index of the stream on its device.
+        @params: pending -> deque[Launch], launches waiting to be staged.
+        @params: last_future -> Future, the future of the most recent launch, None before the first one.
+    '''
+    __slots__ = ("device", "stream_id", "pending", "last_future")
+
+    def __init__(self, device, stream_id: int):
+        self.device = device
+        self.stream_id = stream_id
+        self.pending = deque()
+        self.last_future = None
+
+    '''
+        @brief: Enqueues a launch on this stream, see AsyncGPU.launch.
+    '''
+    def launch(self, arr1: np.array, arr2: np.array, operation="matmul", control_code="101") -> Future:
+        return self.device.launch(arr1, arr2, operation, control_code, stream=self)
+
+    '''
+        @brief: Enqueues a launch on this stream and returns an asyncio awaitable, see AsyncGPU.launch_async.
+    '''
+    def launch_async(self, arr1: np.array, arr2: np.array, operation="matmul", control_code="101"):
+        return asyncio.wrap_future(self.launch(arr1, arr2, operation, control_code))
+
+    '''
+        @brief: Blocks until every launch enqueued on this stream so far has finished.
+
+        @params: timeout -> float, seconds to wait at most, None waits forever.
+        @returns: None
+    '''
+    def synchronize(self, timeout: float = None):
+        if self.last_future is not None:
+            wait([self.last_future], timeout=timeout)
+
+
+class AsyncGPU:
+    '''
+        @brief: Asynchronous front end of a GPU_SIM. Launches are enqueued on streams and return futures (or
+                asyncio awaitables) instead of blocking the caller. A staging thread gathers the operands of
+                the next wave into one operand bank of the SMs while a compute thread runs the SMs on the
+                other bank and reduces the results, so staging of the next launch overlaps the current one.
+
+                The wrapped GPU_SIM belongs to the AsyncGPU until close(), do not call its synchronous launch
+                methods in the meantime.
+
+        @params: gpu -> GPU_SIM, the device to run on (serial or process pool mode).
+        @params: streams -> list[Stream], the streams of the device, streams[0] is the default stream.
+        @params: stats -> dict, launches and waves run, and the seconds spent staging and computing.
+    '''
+    def __init__(self, gpu):
+        self.gpu = gpu
+        self.streams = []
+        self.next_stream = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.free_banks = queue.Queue()
+        for bank in range(NUM_BANKS):
+            self.free_banks.put(bank)
+        self.staged = queue.Queue()
+        self.stats = {"launches": 0, "waves": 0, "stage_seconds": 0.0, "compute_seconds": 0.0}
+        self.default_stream = self.stream()
+
+        self.stager = threading.Thread(target=self.stage_loop, name="AsyncGPU stager", daemon=True)
+        self.computer = threading.Thread(target=self.compute_loop, name="AsyncGPU compute", daemon=True)
+        self.started = time.perf_counter()
+        self.stager.start()
+        self.computer.start()
+
+    '''
+        @brief: Creates a new stream on this device.
+
+        @returns: Stream
+    '''
+    def stream(self) -> Stream:
+        with self.condition:
+            stream = Stream(self, len(self.streams))
+            self.streams.append(stream)
+        return stream
+
+    '''
+        @brief: Enqueues a launch. The inputs are validated right away, errors raised while running are
+                delivered through the future. The inputs must not be modified until the future is done.
+
+        @params: arr1 -> np.array, first input.
+        @params: arr2 -> np.array, second input.
+        @params: operation -> str, "dot", "matmul", "batch_dot", "batch_matmul", "elementwise" or "conv2d".
+        @params: control_code -> str, 3-bit binary string ("101" for MUL, any opcode for "elementwise").
+        @params: stream -> Stream, the stream to enqueue on, the default stream when None.
+        @returns: Future, resolves to an int (dot product) or a new np.array (every other operation).
+    '''
+    def launch(self, arr1: np.array, arr2: np.array, operation="matmul", control_code="101", stream: Stream = None) -> Future:
+        operation = operation.lower()
+        if operation in BLOCKING_ONLY:
+            raise ValueError(f"'{operation}' is only supported by the blocking GPU_SIM launch.")
+        self.gpu.check_control(control_code, operation)
+        if is_sparse(arr1) or is_sparse(arr2):
+            raise ValueError("Sparse inputs are only supported by the blocking GPU_SIM launch.")
+        output_shape = self.gpu.check_inputs(arr1, arr2, operation)
+        if operation == "elementwise":
+            self.gpu.check_operands(arr1, arr2, control_code)
+        stream = stream if stream is not None else self.default_stream
+        assert stream.device is self, "The stream belongs to another device."
+
+        launch = Launch(arr1, arr2, operation, output_shape, control_code)
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("AsyncGPU has been closed.")
+            stream.pending.append(launch)
+            stream.last_future = launch.future
+            self.condition.notify_all()
+        return launch.future
+
+    '''
+        @brief: Enqueues a launch and returns an awaitable for the running asyncio event loop.
+
+        @returns: asyncio.Future, resolves like the Future of launch().
+    '''
+    def launch_async(self, arr1: np.array, arr2: np.array, operation="matmul", control_code="101", stream: Stream = None):
+        return asyncio.wrap_future(self.launch(arr1, arr2, operation, control_code, stream))
+
+    '''
+        @brief: Takes the next launch from the streams round robin, blocking while all of them are empty.
+
+        @returns: Launch, or None once the device is closed and every stream is drained.
+    '''
+    def next_launch(self):
+        with self.condition:
+            while True:
+                for offset in range(len(self.streams)):
+                    idx = (self.next_stream + offset) % len(self.streams)
+                    if self.streams[idx].pending:
+                        self.next_stream = (idx + 1) % len(self.streams)
+                        return self.streams[idx].pending.popleft()
+                if self.closed:
+                    return None
+                self.condition.wait()
+
+    '''
+        @brief: Staging thread. Plans every launch and gathers its waves into free operand banks, in order.
+    '''
+    def stage_loop(self):
+        while True:
+            launch = self.next_launch()
+            if launch is None:
+                self.staged.put(None)
+                return
+            if not launch.future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                launch.plan = get_plan(launch.operation, launch.arr1.shape, launch.arr2.shape,
+                                       self.gpu.num_sms, self.gpu.num_warps, self.gpu.num_threads_per_warp)
+            except Exception as exc:
+                launch.failed = True
+                launch.future.set_exception(exc)
+                continue
+
+            for wave_idx in range(launch.plan.num_waves):
+                bank = self.free_banks.get()
+                if launch.failed:
+                    self.free_banks.put(bank)
+                    break
+                start = time.perf_counter()
+                try:
+                    wave = launch.plan.wave(wave_idx)
+                    self.gpu.stage_wave(wave, launch.arr1, launch.arr2, bank)
+                except Exception as exc:
+                    launch.failed = True
+                    launch.future.set_exception(exc)
+                    self.free_banks.put(bank)
+                    break
+                self.stats["stage_seconds"] += time.perf_counter() - start
+                self.staged.put((launch, wave_idx, wave, bank))
+
+    '''
+        @brief: Compute thread. Runs the SMs on every staged wave, reduces it into global memory and resolves
+                the future after the last wave of a launch. The bank is handed back to the stager afterwards.
+    '''
+    def compute_loop(self):
+        gpu = self.gpu
+        while True:
+            item = self.staged.get()
+            if item is None:
+                return
+            launch, wave_idx, wave, bank = item
+            start = time.perf_counter()
+            try:
+                if launch.failed:
+                    continue
+                out_size = int(np.prod(launch.output_shape))
+                if wave_idx == 0:
+                    gpu.global_memory[:out_size] = 0
+                all_results = gpu.execute_wave(launch.control_code, wave.active_warps, bank)
+                gpu.reduce_results(all_results, wave)
+                self.stats["waves"] += 1
+
+                if wave_idx == launch.plan.num_waves - 1:
+                    if launch.operation == "dot":
+                        result = int(gpu.global_memory[0])
+                    else:
+                        result = gpu.global_memory[:out_size].reshape(launch.output_shape).copy()
+                    self.stats["launches"] += 1
+                    launch.future.set_result(result)
+            except Exception as exc:
+                launch.failed = True
+                launch.future.set_exception(exc)
+            finally:
+                self.stats["compute_seconds"] += time.perf_counter() - start
+                self.free_banks.put(bank)
+
+    '''
+        @brief: Blocks until every launch enqueued on any stream so far has finished.
+
+        @params: timeout -> float, seconds to wait at most, None waits forever.
+        @returns: None
+    '''
+    def synchronize(self, timeout: float = None):
+        with self.condition:
+            futures = [stream.last_future for stream in self.streams if stream.last_future is not None]
+        wait(futures, timeout=timeout)
+
+    '''
+        @brief: Summarizes the work of both threads since the device was created.
+
+        @returns: dict, launches and waves run, busy seconds of the staging and compute threads and the
+                  elapsed seconds. Staging that overlapped compute shows up as busy time beyond the elapsed.
+    '''
+    def report(self) -> dict:
+        return dict(self.stats, elapsed_seconds=time.perf_counter() - self.started)
+
+    '''
+        @brief: Finishes every enqueued launch and stops both threads. The GPU_SIM itself stays open.
+    '''
+    def close(self):
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify_all()
+        self.stager.join()
+        self.computer.join()
@@ -1,31 +1,71 @@
-from typing import List
+import numpy as np
 from logic_gates.alu import ALU
+from logic_gates.bitslice_alu import BitSliceALU
+from logic_gates.lut_alu import LUTALU
+from logic_gates.mma_unit import MMAUnit, TILE
+
+BACKENDS = ("scalar", "bitslice", "lut")
 
 class Warp:
     '''
         @breif: This class represents a warp, which is a collection of threads that execute computations
                 in parallel using ALUs. Each thread in the warp processes a piece of data independently.
+                The warp does not own its data, work_data and local_memory are views into the register file
+                of its SM, so distributing work and gathering results never copies per-thread objects.
 
         @params: num_threads -> int, the number of threads (ALUs) within the warp.
         @params: num_bits -> int, the number of bits each ALU operates on.
-        @params: alus -> list[ALU], a list of ALU instances corresponding to each thread.
-        @params: local_memory -> list[int], storage for intermediate results before returning to the SM.
+        @params: backend -> str, "scalar" runs one ALU per thread, "bitslice" runs the whole warp through
+                 a single BitSliceALU call, "lut" runs it as one LUTALU table gather (num_bits <= 8).
+        @params: adder -> str, adder implementation of the ALUs ("ripple" or "kogge_stone"). The lookup
+                 tables are identical for every adder, so the "lut" backend ignores it.
+        @params: multiplier -> str, "native" integer MUL, or a gate-level multiplier unit ("shift_add" or
+                 "booth"). Like the adder it does not change results, so the "lut" backend ignores it.
+        @params: work_data -> np.array, (num_threads, 2) int64 operand registers, a view into the SM's register
+                 file (allocated here when the warp is used on its own).
+        @params: local_memory -> np.array, (num_threads,) int32 result registers, a view into the SM's local_mem.
+        @params: alus -> list[ALU], a list of ALU instances corresponding to each thread, built on the first
+                 run() of a "scalar" warp rather than up front.
+        @params: mma_operands -> np.array, (2, TILE, TILE) int64 A and B tile registers of the MMA instruction.
+        @params: accumulator -> np.array, (TILE, TILE) int64 accumulator tile of the MMA instruction.
+        @params: mma_unit -> MMAUnit, the tile multiply-accumulate unit, built on the first mma().
     '''
-    def __init__(self, num_threads: int, num_bits: int):
+    __slots__ = ("num_threads", "num_bits", "backend", "adder", "multiplier", "alus", "vector_alu", "work_data", "local_memory",
+                 "mma_operands", "accumulator", "mma_unit")
+
+    def __init__(self, num_threads: int, num_bits: int, backend: str = "scalar", adder: str = "ripple", multiplier: str = "native",
+                 work_data: np.array = None, local_memory: np.array = None, mma_operands: np.array = None, accumulator: np.array = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown ALU backend '{backend}', expected one of {BACKENDS}.")
         self.num_threads = num_threads
         self.num_bits = num_bits
-        self.alus = [ALU(num_bits) for _ in range(num_threads)]
-        self.local_memory = [None] * num_threads
+        self.backend = backend
+        self.adder = adder
+        self.multiplier = multiplier
+        self.alus = []
+        self.vector_alu = None
+        if backend == "bitslice":
+            self.vector_alu = BitSliceALU(num_bits, adder, multiplier)
+        elif backend == "lut":
+            self.vector_alu = LUTALU(num_bits)
+        self.work_data = work_data if work_data is not None else np.zeros((num_threads, 2), dtype=np.int64)
+        self.local_memory = local_memory if local_memory is not None else np.zeros(num_threads, dtype=np.int32)
+        assert self.work_data.shape == (num_threads, 2), "Work data must match the number of threads."
+        assert self.local_memory.shape == (num_threads,), "Local memory must match the number of threads."
+        self.mma_operands = mma_operands if mma_operands is not None else np.zeros((2, TILE, TILE), dtype=np.int64)
+        self.accumulator = accumulator if accumulator is not None else np.zeros((TILE, TILE), dtype=np.int64)
+        self.mma_unit = None
 
     '''
-        @breif: Distributes work across the warp's ALUs. Each ALU processes a separate data pair.
+        @breif: Copies work into the warp's operand registers. Each ALU processes a separate data pair. The
+                SM writes its register file directly, this is for driving a warp on its own.
 
-        @params: work_data -> List[tuple[int, int]], a list of (A, B) tuples representing binary inputs.
+        @params: work_data -> np.array, (num_threads, 2) array (or list of (A, B) tuples) of inputs.
         @returns: None
     '''
-    def distribute_work(self, work_data: List[tuple[int, int]]):
+    def distribute_work(self, work_data: np.array):
         assert len(work_data) == self.num_threads, "Work data must match the number of threads."
-        self.work_data = work_data
+        self.work_data[:] = work_data
 
     '''
         @breif: Executes computations in parallel on all ALUs within the warp.
@@ -34,17 +74,34 @@ class Warp:
         @returns: None
     '''
     def run(self, control_code: str):
-        for i in range(self.num_threads):
-            A, B = self.work_data[i]
+        if self.vector_alu is not None:
+            self.local_memory[:] = self.vector_alu.execute(self.work_data[:, 0], self.work_data[:, 1], control_code)
+            return
+
+        if not self.alus:
+            self.alus = [ALU(self.num_bits, self.adder, self.multiplier) for _ in range(self.num_threads)]
+
+        results = [alu.execute(A, B, control_code) for alu, (A, B) in zip(self.alus, self.work_data.tolist())]
+        # Stored through int64 so results wider than the int32 local memory wrap like the vector backends
+        self.local_memory[:] = np.array(results, dtype=np.int64)
 
-            # Execute ALU operation and store result
-            result = self.alus[i].execute(A, B, control_code)
-            self.local_memory[i] = result
+    '''
+        @breif: Executes the warp-level MMA instruction, accumulator = A @ B + accumulator on the tiles in
+                mma_operands. The threads of the warp jointly hold the tiles, so one instruction replaces
+                TILE^3 scalar MUL dispatches and the sums never leave the warp.
+
+        @returns: None
+    '''
+    def mma(self):
+        if self.mma_unit is None:
+            self.mma_unit = MMAUnit(self.num_bits)
+        A, B = self.mma_operands
+        self.accumulator[:] = self.mma_unit.execute(A[None], B[None], self.accumulator[None])[0]
 
     '''
         @breif: Collects the results stored in the local memory and returns them to the SM.
 
-        @returns: List[int], the computed results from all threads.
+        @returns: np.array, the computed results from all threads (a view, not a copy).
     '''
-    def gather_results(self) -> List[int]:
+    def gather_results(self) -> np.array:
         return self.local_memory
@@ -21,8 +21,8 @@ if __name__ == "__main__":
         @code: operation = 'dot': this tells the GPU sim to run dot product of input data
         @code: operation = 'matmul': this tells the GPU sim to run matrix multiplication
         
-        @NOTE: for larger matricies or higher order tensors, make sure you allocate the correct size for the
-                GPU_SIM, it will run but will give incorrect truncated answers if not done to the correct size
+        @NOTE: inputs larger than num_sms * num_warps * num_threads_per_warp are run in several waves, so any
+                size works on a small GPU_SIM, just make sure mem_size can hold the output
     '''
     gpu_matmul.load_info(arr1, arr2, operation="matmul")
     gpu_matmul.distribute_data()
@@ -32,7 +32,8 @@ if __name__ == "__main__":
     matmul_result = gpu_matmul.reconstruct_data()
     numpy_matmul = np.matmul(arr1, arr2)
     print(f"GPU_SIM matrix multiplication:\n{matmul_result}")
-    print(f"NumPy matrix multiplication:\n{numpy_matmul}\n")
+    print(f"NumPy matrix multiplication:\n{numpy_matmul}")
+    print(f"Waves used: {gpu_matmul.wave_report()['num_waves']}\n")
     
     print('GPU dot product test:\n')
     gpu_dot = GPU_SIM(num_sms=2, mem_size=1024, num_warps=4, num_threads_per_warp=8, num_bits=8)
@@ -2,28 +2,68 @@ import numpy as np
 from logic_gates.control import Control
 from logic_gates.multiplexer import Multiplexer
 from logic_gates.ripple_adder import RippleAdder
+from logic_gates.prefix_adder import KoggeStoneAdder
+from logic_gates.multiplier import MULTIPLIERS
+
+# Adder implementations the ALUs can be built with, all of them give bit-identical results
+ADDERS = {
+    "ripple": RippleAdder,
+    "kogge_stone": KoggeStoneAdder,
+}
+
+# Flyweight store of the stateless units, shared by every ALU with the same (num_bits, adder)
+_shared_units = {}
+
+'''
+    @breif: Returns the control unit, multiplexer and adder shared by every ALU built with the same bit width and
+            adder. None of them keep per-call state, so one instance per configuration serves any number of ALUs.
+
+    @params: num_bits -> int, the number of bits the ALU operates on
+    @params: adder -> str, the adder used for ADD, SUB and two's complement, a key of ADDERS
+    @returns: units -> tuple[Control, Multiplexer, adder], the shared units
+'''
+def shared_units(num_bits: int, adder: str = "ripple"):
+    key = (num_bits, adder)
+    units = _shared_units.get(key)
+    if units is None:
+        if adder not in ADDERS:
+            raise ValueError(f"Unknown adder '{adder}', expected one of {tuple(ADDERS)}.")
+        units = (Control(), Multiplexer(7), ADDERS[adder](num_bits))  # 7 operations
+        _shared_units[key] = units
+    return units
 
 class ALU:
     '''
         @breif: This class represents an Arithmetic Logic Unit (ALU). It receives binary inputs, performs
                 computations, and returns the results in binary format before converting them back to real numbers.
+                The control unit, multiplexer and adder are shared flyweights (see shared_units), only the
+                multiplier unit, which keeps partial product counters, belongs to a single ALU.
 
         @params: num_bits -> int, the number of bits the ALU operates on
+        @params: adder -> str, the adder used for ADD, SUB and two's complement, a key of ADDERS
+        @params: multiplier -> str, "native" multiplies the decoded integers, any key of MULTIPLIERS runs MUL
+                 through that gate-level multiplier unit instead
     '''
-    def __init__(self, num_bits: int):
+    __slots__ = ("num_bits", "control_unit", "multiplexer", "ripple_adder", "multiplier_unit")
+
+    def __init__(self, num_bits: int, adder: str = "ripple", multiplier: str = "native"):
+        if multiplier != "native" and multiplier not in MULTIPLIERS:
+            raise ValueError(f"Unknown multiplier '{multiplier}', expected 'native' or one of {tuple(MULTIPLIERS)}.")
         self.num_bits = num_bits
-        self.control_unit = Control()
-        self.multiplexer = Multiplexer(7)  # 7 operations
-        self.ripple_adder = RippleAdder(num_bits)
+        self.control_unit, self.multiplexer, self.ripple_adder = shared_units(num_bits, adder)
+        self.multiplier_unit = MULTIPLIERS[multiplier](num_bits, ADDERS[adder]) if multiplier != "native" else None
 
     '''
-        @breif: Converts a real number to its binary representation.
+        @breif: Converts a real number to its binary representation, LSB first like the adders.
 
-        @params: num -> int, the decimal number to convert
-        @returns: binary_list -> list[int], the binary representation (LSB to MSB)
+        @params: num -> int, the decimal number to convert, non-negative
+        @returns: binary_list -> list[int], the binary representation (LSB to MSB), num_bits long or longer
+                  when num needs more bits (MUL and DIV results)
     '''
     def to_binary(self, num: int):
-        return list(map(int, format(num, f'0{self.num_bits}b')))
+        if num < 0:
+            raise ValueError("ALU operands must be non-negative.")
+        return [(num >> i) & 1 for i in range(max(self.num_bits, num.bit_length()))]
 
     '''
         @breif: Converts a binary number (list) back to a real number.
@@ -32,7 +72,7 @@ class ALU:
         @returns: num -> int, the decimal equivalent
     '''
     def from_binary(self, binary_list: list):
-        return int("".join(map(str, binary_list)), 2)
+        return sum(bit << i for i, bit in enumerate(binary_list))
 
     '''
         @breif: Executes an ALU operation on two decimal numbers.
@@ -63,7 +103,7 @@ class ALU:
         elif operation == "XOR":
             result_bin = [a ^ b for a, b in zip(A_bin, B_bin)]
         elif operation == "MUL":
-            result_bin = self.to_binary(self.from_binary(A_bin) * self.from_binary(B_bin))
+            result_bin = self.binary_multiply(A_bin, B_bin)
         elif operation == "DIV":
             result_bin = self.binary_divide(A_bin, B_bin)
         else:
@@ -85,13 +125,18 @@ class ALU:
         return result
 
     '''
-        @breif: Performs binary multiplication using iterative addition.
+        @breif: Performs binary multiplication, through the gate-level multiplier unit when one is configured.
 
         @params: A_bin -> list[int], first binary number (LSB to MSB)
         @params: B_bin -> list[int], second binary number (LSB to MSB)
-        @returns: product_bin -> list[int], binary multiplication result (size num_bits)
+        @returns: product_bin -> list[int], binary multiplication result (LSB to MSB, at least num_bits long)
     '''
     def binary_multiply(self, A_bin: list, B_bin: list):
+        if self.multiplier_unit is not None:
+            if len(A_bin) != self.num_bits or len(B_bin) != self.num_bits:
+                raise ValueError(f"MUL operands must fit in {self.num_bits} bits for the gate-level multiplier.")
+            return self.multiplier_unit.multiply(A_bin, B_bin)
+
         A_dec = self.from_binary(A_bin)
         B_dec = self.from_binary(B_bin)
         product_dec = A_dec * B_dec
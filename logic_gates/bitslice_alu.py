@@ -0,0 +1,130 @@
+import numpy as np
+from logic_gates.alu import ADDERS, shared_units
+from logic_gates.multiplier import MULTIPLIERS
+
+class BitSliceALU:
+    '''
+        @breif: This class is a bit-sliced (vectorized) version of the ALU. Instead of handling one pair of
+                numbers at a time, it stores the operands of many lanes as bit planes, a NumPy array of shape
+                (num_bits, lanes) where row p holds bit p of every lane. Each gate is then applied to a whole
+                plane at once, so a full warp (or SM) is computed in a handful of array operations.
+
+                Plane p holds bit p (LSB first), the order the scalar ALU builds with to_binary and the adders
+                carry in, so every result is bit-exact with ALU.execute.
+
+        @params: num_bits -> int, the number of bits the ALU operates on
+        @params: adder -> str, the adder used for ADD, SUB and two's complement, a key of ADDERS
+        @params: multiplier -> str, "native" multiplies the decoded integers like the scalar ALU, any key of
+                 MULTIPLIERS runs MUL through that gate-level multiplier over all lanes at once
+    '''
+    __slots__ = ("num_bits", "control_unit", "adder", "multiplier_unit", "shifts")
+
+    def __init__(self, num_bits: int, adder: str = "ripple", multiplier: str = "native"):
+        if multiplier != "native" and multiplier not in MULTIPLIERS:
+            raise ValueError(f"Unknown multiplier '{multiplier}', expected 'native' or one of {tuple(MULTIPLIERS)}.")
+        self.num_bits = num_bits
+        self.control_unit, _, self.adder = shared_units(num_bits, adder)
+        self.multiplier_unit = MULTIPLIERS[multiplier](num_bits, ADDERS[adder]) if multiplier != "native" else None
+        # Plane p carries bit p of every lane
+        self.shifts = np.arange(num_bits, dtype=np.int64)
+
+    '''
+        @breif: Converts a vector of real numbers into bit planes.
+
+        @params: values -> np.array, the decimal numbers of every lane
+        @returns: planes -> np.array, uint8 array of shape (num_bits, lanes)
+    '''
+    def to_planes(self, values: np.array) -> np.array:
+        return ((values[None, :] >> self.shifts[:, None]) & 1).astype(np.uint8)
+
+    '''
+        @breif: Converts bit planes back into a vector of real numbers.
+
+        @params: planes -> np.array, uint8 array of shape (num_bits, lanes)
+        @returns: values -> np.array, int64 decimal value of every lane
+    '''
+    def from_planes(self, planes: np.array) -> np.array:
+        values = np.zeros(planes.shape[1], dtype=np.int64)
+        for p in range(self.num_bits):
+            values |= planes[p].astype(np.int64) << self.shifts[p]
+        return values
+
+    '''
+        @breif: Computes the two's complement of every lane, mirroring ALU.twos_complement.
+
+        @params: B_planes -> np.array, operand planes (num_bits, lanes)
+        @returns: twos_complement_B -> np.array, two's complement planes (num_bits, lanes)
+    '''
+    def twos_complement(self, B_planes: np.array) -> np.array:
+        one = np.zeros_like(B_planes)
+        one[0] = 1
+        result, _ = self.adder.add_planes(1 - B_planes, one)
+        return result
+
+    '''
+        @breif: Multiplies every lane with the gate-level multiplier unit.
+
+        @params: A -> np.array, first decimal number of every lane
+        @params: B -> np.array, second decimal number of every lane
+        @returns: product -> np.array, int64 product of every lane
+    '''
+    def gate_multiply(self, A: np.array, B: np.array) -> np.array:
+        limit = 1 << self.num_bits
+        if (A >= limit).any() or (B >= limit).any():
+            raise ValueError(f"MUL operands must fit in {self.num_bits} bits for the gate-level multiplier.")
+
+        product_planes = self.multiplier_unit.multiply_planes(self.to_planes(A), self.to_planes(B))
+
+        product = np.zeros(A.shape, dtype=np.int64)
+        for i in range(product_planes.shape[0]):
+            product |= product_planes[i].astype(np.int64) << i
+        return product
+
+    '''
+        @breif: Executes one ALU operation across every lane.
+
+        @params: A -> np.array, first decimal number of every lane
+        @params: B -> np.array, second decimal number of every lane
+        @params: control_code -> str, a 3-bit binary string representing the operation
+
+        @returns: result -> np.array, int64 computed result of every lane
+    '''
+    def execute(self, A: np.array, B: np.array, control_code: str) -> np.array:
+        A = np.asarray(A, dtype=np.int64)
+        B = np.asarray(B, dtype=np.int64)
+        assert A.shape == B.shape and A.ndim == 1, "Operands must be 1D arrays of the same length."
+        if (A < 0).any() or (B < 0).any():
+            raise ValueError("ALU operands must be non-negative.")
+
+        operation = self.control_unit.decode(control_code)
+
+        # MUL and DIV work on the full decoded values in the scalar ALU, so they are not limited to num_bits
+        if operation == "MUL":
+            if self.multiplier_unit is not None:
+                return self.gate_multiply(A, B)
+            return A * B
+        if operation == "DIV":
+            safe_B = np.where(B == 0, 1, B)
+            return np.where(B == 0, 0, A // safe_B)
+        if operation not in ("ADD", "SUB", "AND", "OR", "XOR"):
+            return np.zeros(A.shape, dtype=np.int64)
+
+        limit = 1 << self.num_bits
+        if (A >= limit).any() or (B >= limit).any():
+            raise ValueError(f"{operation} operands must fit in {self.num_bits} bits.")
+
+        A_planes = self.to_planes(A)
+        B_planes = self.to_planes(B)
+
+        if operation == "ADD":
+            result_planes, _ = self.adder.add_planes(A_planes, B_planes)
+        elif operation == "SUB":
+            result_planes, _ = self.adder.add_planes(A_planes, self.twos_complement(B_planes))
+        elif operation == "AND":
+            result_planes = A_planes & B_planes
+        elif operation == "OR":
+            result_planes = A_planes | B_planes
+        else:
+            result_planes = A_planes ^ B_planes
+
+        return self.from_planes(result_planes)
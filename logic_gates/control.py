@@ -5,6 +5,8 @@ class Control:
 
         @params: control_map -> dict, a mapping of control codes to ALU operations
     '''
+    __slots__ = ("control_map",)
+
     def __init__(self):
         '''
             @breif: Initializes the control unit with predefined operation mappings.
@@ -7,6 +7,8 @@ class HalfAdder:
         @params: A0 -> int, first input value (0 or 1)
         @params: A1 -> int, second input value (0 or 1)
     '''
+    __slots__ = ("A0", "A1")
+
     def __init__(self, A0: int, A1: int):
         self.A0 = A0
         self.A1 = A1
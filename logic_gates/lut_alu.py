@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from logic_gates.alu import ALU, shared_units
+
+MAX_LUT_BITS = 8  # a 2^8 x 2^8 table per opcode, larger widths would not fit in memory
+
+# Process-wide table cache shared by every LUTALU, keyed by (num_bits, control_code)
+_lut_cache = OrderedDict()
+_lut_lock = threading.Lock()
+_lut_stats = {"hits": 0, "misses": 0, "evictions": 0, "max_tables": 16}
+
+'''
+    @breif: Sets how many tables the process-wide cache keeps before evicting the least recently used one.
+
+    @params: max_tables -> int, the maximum number of cached tables (at least 1)
+    @returns: None
+'''
+def set_lut_cache_size(max_tables: int):
+    assert max_tables >= 1, "The LUT cache must hold at least one table."
+    with _lut_lock:
+        _lut_stats["max_tables"] = max_tables
+        while len(_lut_cache) > max_tables:
+            _lut_cache.popitem(last=False)
+            _lut_stats["evictions"] += 1
+
+'''
+    @breif: Reports the state of the process-wide table cache.
+
+    @returns: info -> dict, hits, misses, evictions, max_tables, the cached keys and their total size in bytes
+'''
+def lut_cache_info() -> dict:
+    with _lut_lock:
+        return dict(_lut_stats,
+                    keys=list(_lut_cache.keys()),
+                    nbytes=sum(table.nbytes for table in _lut_cache.values()))
+
+'''
+    @breif: Drops every cached table and resets the counters.
+
+    @returns: None
+'''
+def clear_lut_cache():
+    with _lut_lock:
+        _lut_cache.clear()
+        _lut_stats.update(hits=0, misses=0, evictions=0)
+
+'''
+    @breif: Builds the full result table of one opcode by running every operand pair through the reference ALU.
+
+    @params: num_bits -> int, the number of bits the ALU operates on
+    @params: control_code -> str, a 3-bit binary string representing the operation
+    @returns: table -> np.array, int64 array of shape (2^num_bits, 2^num_bits), table[A, B] = ALU.execute(A, B)
+'''
+def build_table(num_bits: int, control_code: str) -> np.array:
+    alu = ALU(num_bits)
+    size = 1 << num_bits
+    table = np.empty((size, size), dtype=np.int64)
+    for A in range(size):
+        for B in range(size):
+            table[A, B] = alu.execute(A, B, control_code)
+    return table
+
+'''
+    @breif: Returns the table of one opcode, building it on a cache miss and evicting the least recently used
+            table when the cache is full.
+
+    @params: num_bits -> int, the number of bits the ALU operates on
+    @params: control_code -> str, a 3-bit binary string representing the operation
+    @returns: table -> np.array, the (2^num_bits, 2^num_bits) result table
+'''
+def get_table(num_bits: int, control_code: str) -> np.array:
+    key = (num_bits, control_code)
+    with _lut_lock:
+        if key in _lut_cache:
+            _lut_cache.move_to_end(key)
+            _lut_stats["hits"] += 1
+            return _lut_cache[key]
+        _lut_stats["misses"] += 1
+
+    table = build_table(num_bits, control_code)
+
+    with _lut_lock:
+        _lut_cache[key] = table
+        _lut_cache.move_to_end(key)
+        while len(_lut_cache) > _lut_stats["max_tables"]:
+            _lut_cache.popitem(last=False)
+            _lut_stats["evictions"] += 1
+    return table
+
+
+class LUTALU:
+    '''
+        @breif: This class is a lookup-table version of the ALU for small bit widths. For num_bits <= 8 every
+                possible result of an opcode fits in a 2^num_bits x 2^num_bits table, so executing a whole warp
+                is a single fancy-indexed gather. Tables are built lazily from the reference ALU and kept in a
+                process-wide LRU cache, so results are identical to ALU.execute.
+
+        @params: num_bits -> int, the number of bits the ALU operates on (at most MAX_LUT_BITS)
+    '''
+    __slots__ = ("num_bits", "control_unit")
+
+    def __init__(self, num_bits: int):
+        if num_bits > MAX_LUT_BITS:
+            raise ValueError(f"The LUT backend supports at most {MAX_LUT_BITS} bits, got {num_bits}.")
+        self.num_bits = num_bits
+        self.control_unit = shared_units(num_bits)[0]
+
+    '''
+        @breif: Executes one ALU operation across every lane with a table gather.
+
+        @params: A -> np.array, first decimal number of every lane
+        @params: B -> np.array, second decimal number of every lane
+        @params: control_code -> str, a 3-bit binary string representing the operation
+
+        @returns: result -> np.array, int64 computed result of every lane
+    '''
+    def execute(self, A: np.array, B: np.array, control_code: str) -> np.array:
+        A = np.asarray(A, dtype=np.int64)
+        B = np.asarray(B, dtype=np.int64)
+        assert A.shape == B.shape and A.ndim == 1, "Operands must be 1D arrays of the same length."
+        limit = 1 << self.num_bits
+        if (A < 0).any() or (B < 0).any() or (A >= limit).any() or (B >= limit).any():
+            raise ValueError(f"LUT operands must be in [0, {limit}).")
+
+        # Every unknown code decodes to the same all-zero result, share one table for them
+        if self.control_unit.decode(control_code) == "INVALID":
+            control_code = "111"
+        return get_table(self.num_bits, control_code)[A, B]
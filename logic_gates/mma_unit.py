@@ -0,0 +1,43 @@
+import numpy as np
+
+TILE = 4  # the unit multiplies TILE x TILE by TILE x TILE tiles
+
+class MMAUnit:
+    '''
+        @breif: This class works as a warp-level matrix multiply-accumulate unit, like a tensor core. One
+                instruction computes D = A @ B + C for a TILE x TILE x TILE tile, so a warp does TILE^3
+                multiplies and keeps the sums in its accumulator instead of sending every product back
+                through local and global memory. Operands are num_bits wide, the accumulator acc_bits wide
+                (the products are 2 * num_bits wide and the sums grow past that), and like hardware the
+                accumulator wraps modulo 2^acc_bits.
+
+        @params: num_bits -> int, the width of the A and B operands
+        @params: acc_bits -> int, the width of the accumulator, at most 63, by default max(32, 2 * num_bits)
+        @params: instructions -> int, running count of tile instructions executed
+    '''
+    __slots__ = ("num_bits", "acc_bits", "acc_mask", "instructions")
+
+    def __init__(self, num_bits: int, acc_bits: int = None):
+        if acc_bits is None:
+            acc_bits = min(63, max(32, 2 * num_bits))
+        assert 2 * num_bits <= acc_bits <= 63, "The accumulator must hold a product and fit in an int64."
+        self.num_bits = num_bits
+        self.acc_bits = acc_bits
+        self.acc_mask = (1 << acc_bits) - 1
+        self.instructions = 0
+
+    '''
+        @breif: Executes the instruction on a batch of tiles.
+
+        @params: A -> np.array, (tiles, TILE, TILE) operand tiles, values in [0, 2^num_bits)
+        @params: B -> np.array, (tiles, TILE, TILE) operand tiles, values in [0, 2^num_bits)
+        @params: C -> np.array, (tiles, TILE, TILE) int64 accumulator tiles
+        @returns: D -> np.array, (tiles, TILE, TILE) int64, A @ B + C modulo 2^acc_bits
+    '''
+    def execute(self, A: np.array, B: np.array, C: np.array) -> np.array:
+        assert A.shape[-2:] == (TILE, TILE) and B.shape == A.shape and C.shape == A.shape, "Operands must be TILE x TILE tiles."
+        limit = 1 << self.num_bits
+        if (A < 0).any() or (B < 0).any() or (A >= limit).any() or (B >= limit).any():
+            raise ValueError(f"MMA operands must be in [0, {limit}).")
+        self.instructions += A.size // (TILE * TILE)
+        return (np.matmul(A.astype(np.int64), B.astype(np.int64)) + C) & self.acc_mask
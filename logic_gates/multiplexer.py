@@ -5,6 +5,8 @@ class Multiplexer:
 
         @params: num_inputs -> int, the number of input signals the multiplexer handles
     '''
+    __slots__ = ("num_inputs", "control_bits")
+
     def __init__(self, num_inputs: int):
         self.num_inputs = num_inputs
         self.control_bits = num_inputs.bit_length() - 1
@@ -0,0 +1,134 @@
+import numpy as np
+
+class ShiftAddMultiplier:
+    '''
+        @breif: This class works as a gate-level shift-and-add multiplier. For every bit i of B it forms the
+                partial product (A AND B[i]) shifted left by i and adds it into a 2 * num_bits wide accumulator
+                with the adder layer. Operands are bit planes (num_bits, lanes), LSB first, so a whole warp is
+                multiplied in one call.
+
+        @params: num_bits -> int, the width of each operand, the product is 2 * num_bits wide
+        @params: adder_cls -> class, adder used for the accumulation (RippleAdder or KoggeStoneAdder)
+        @params: stats -> dict, running totals of lanes, partial products, non-zero partial products and adds
+    '''
+    __slots__ = ("num_bits", "product_bits", "adder", "stats")
+
+    def __init__(self, num_bits: int, adder_cls):
+        self.num_bits = num_bits
+        self.product_bits = 2 * num_bits
+        self.adder = adder_cls(self.product_bits)
+        self.reset_stats()
+
+    '''
+        @breif: Clears the running partial product counters.
+    '''
+    def reset_stats(self):
+        self.stats = {"lanes": 0, "partial_products": 0, "nonzero_partial_products": 0, "adds": 0}
+
+    '''
+        @breif: Multiplies every lane of A by the same lane of B.
+
+        @params: A_planes -> np.array, first operands, shape (num_bits, lanes), LSB first
+        @params: B_planes -> np.array, second operands, shape (num_bits, lanes), LSB first
+        @returns: product_planes -> np.array, the products, shape (2 * num_bits, lanes), LSB first
+    '''
+    def multiply_planes(self, A_planes: np.array, B_planes: np.array) -> np.array:
+        assert A_planes.shape[0] == self.num_bits and B_planes.shape == A_planes.shape, "Input sizes must match num_bits"
+        lanes = A_planes.shape[1]
+        accumulator = np.zeros((self.product_bits, lanes), dtype=np.uint8)
+
+        for i in range(self.num_bits):
+            partial = np.zeros_like(accumulator)
+            partial[i:i + self.num_bits] = A_planes & B_planes[i]
+            accumulator, _ = self.adder.add_planes(accumulator, partial)
+            self.stats["nonzero_partial_products"] += int(np.count_nonzero(B_planes[i]))
+
+        self.stats["lanes"] += lanes
+        self.stats["partial_products"] += self.num_bits * lanes
+        self.stats["adds"] += self.num_bits
+        return accumulator
+
+    '''
+        @breif: Multiplies two binary numbers given as bit lists.
+
+        @params: A -> list[int], first binary number (LSB to MSB)
+        @params: B -> list[int], second binary number (LSB to MSB)
+        @returns: product -> list[int], the 2 * num_bits wide product (LSB to MSB)
+    '''
+    def multiply(self, A: list, B: list) -> list:
+        A_planes = np.array(A, dtype=np.uint8).reshape(self.num_bits, 1)
+        B_planes = np.array(B, dtype=np.uint8).reshape(self.num_bits, 1)
+        return self.multiply_planes(A_planes, B_planes)[:, 0].tolist()
+
+
+class BoothMultiplier(ShiftAddMultiplier):
+    '''
+        @breif: This class works as a gate-level radix-4 Booth multiplier for unsigned operands. B is recoded
+                into ceil((num_bits + 1) / 2) digits in {-2, -1, 0, 1, 2}, each taken from the overlapping bit
+                triple (B[2j+1], B[2j], B[2j-1]), which roughly halves the partial products of shift-and-add.
+                A digit selects 0, A or 2A, negative digits add the two's complement (inverted bits plus one),
+                and all arithmetic is modulo 2^(2 * num_bits), which is exact because the product fits.
+
+        @params: num_bits -> int, the width of each operand, the product is 2 * num_bits wide
+        @params: adder_cls -> class, adder used for the accumulation (RippleAdder or KoggeStoneAdder)
+        @params: stats -> dict, running totals of lanes, partial products, non-zero partial products and adds
+    '''
+    __slots__ = ("num_digits",)
+
+    def __init__(self, num_bits: int, adder_cls):
+        super().__init__(num_bits, adder_cls)
+        self.num_digits = (num_bits + 2) // 2
+
+    '''
+        @breif: Multiplies every lane of A by the same lane of B.
+
+        @params: A_planes -> np.array, first operands, shape (num_bits, lanes), LSB first
+        @params: B_planes -> np.array, second operands, shape (num_bits, lanes), LSB first
+        @returns: product_planes -> np.array, the products, shape (2 * num_bits, lanes), LSB first
+    '''
+    def multiply_planes(self, A_planes: np.array, B_planes: np.array) -> np.array:
+        assert A_planes.shape[0] == self.num_bits and B_planes.shape == A_planes.shape, "Input sizes must match num_bits"
+        lanes = A_planes.shape[1]
+        accumulator = np.zeros((self.product_bits, lanes), dtype=np.uint8)
+
+        # Zero-extend B so the top digit sees a 0 sign bit (unsigned operands), B[-1] is 0
+        B_ext = np.zeros((2 * self.num_digits + 1, lanes), dtype=np.uint8)
+        B_ext[1:self.num_bits + 1] = B_planes
+        adds = 0
+
+        for j in range(self.num_digits):
+            low, mid, high = B_ext[2 * j], B_ext[2 * j + 1], B_ext[2 * j + 2]
+            one = mid ^ low                            # digit is +-1
+            two = (high & ~mid & ~low) | (~high & mid & low)  # digit is +-2
+            two &= 1
+            negative = high & ~(mid & low) & 1         # digit is -1 or -2
+
+            partial = np.zeros_like(accumulator)
+            shift = 2 * j
+            width = min(self.num_bits, self.product_bits - shift)
+            partial[shift:shift + width] |= A_planes[:width] & one
+            width2 = min(self.num_bits, self.product_bits - shift - 1)
+            partial[shift + 1:shift + 1 + width2] |= A_planes[:width2] & two
+
+            # -x = ~x + 1, the inversion covers all 2 * num_bits bits, the +1 is a second add into bit 0
+            partial ^= negative
+            accumulator, _ = self.adder.add_planes(accumulator, partial)
+            adds += 1
+            if negative.any():
+                correction = np.zeros_like(accumulator)
+                correction[0] = negative
+                accumulator, _ = self.adder.add_planes(accumulator, correction)
+                adds += 1
+            self.stats["nonzero_partial_products"] += int(np.count_nonzero(one | two))
+
+        self.stats["lanes"] += lanes
+        self.stats["partial_products"] += self.num_digits * lanes
+        self.stats["adds"] += adds
+        return accumulator
+
+
+# Gate-level multipliers the ALUs can be built with, "native" keeps the plain integer product
+MULTIPLIERS = {
+    "shift_add": ShiftAddMultiplier,
+    "booth": BoothMultiplier,
+}
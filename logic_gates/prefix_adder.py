@@ -0,0 +1,66 @@
+import math
+import numpy as np
+
+class KoggeStoneAdder:
+    '''
+        @breif: This class works as a Kogge-Stone parallel-prefix adder. Instead of passing the carry from one
+                full adder to the next, every bit first computes a generate (A AND B) and a propagate (A XOR B)
+                signal, and a prefix network combines them in log2(num_bits) levels, doubling the span each level.
+                After the last level, bit i knows whether a carry reaches it, so all sum bits are produced at once.
+
+                Each level is one array operation over all bits (and all lanes), and the results are bit-for-bit
+                identical to RippleAdder, including the carry-out.
+
+        @params: num_bits -> int, the number of bits for the binary numbers to be added
+        @params: gate_depth -> int, logical depth in 2-input gates of the longest path to any output
+    '''
+    __slots__ = ("num_bits", "levels", "gate_depth")
+
+    def __init__(self, num_bits: int):
+        self.num_bits = num_bits
+        self.levels = math.ceil(math.log2(num_bits)) if num_bits > 1 else 0
+        # generate/propagate (1) + an AND-OR per prefix level (2 each) + the final sum XOR (1)
+        self.gate_depth = 2 * self.levels + 2
+
+    '''
+        @breif: This function adds many numbers at once, stored as bit planes.
+
+        @params: A_planes -> np.array, first operands, shape (num_bits, lanes), row 0 is the first adder position
+        @params: B_planes -> np.array, second operands, shape (num_bits, lanes)
+        @returns: sum_planes -> np.array, the resulting sums, shape (num_bits, lanes)
+        @returns: carry -> np.array, the carry-out of every lane
+    '''
+    def add_planes(self, A_planes: np.array, B_planes: np.array):
+        assert A_planes.shape[0] == self.num_bits and B_planes.shape == A_planes.shape, "Input sizes must match num_bits"
+
+        generate = A_planes & B_planes
+        propagate = A_planes ^ B_planes
+        group_propagate = propagate.copy()
+
+        # Prefix levels: after the level with span d, generate[i] covers bits i-2d+1 .. i
+        span = 1
+        while span < self.num_bits:
+            generate[span:] = generate[span:] | (group_propagate[span:] & generate[:-span])
+            group_propagate[span:] = group_propagate[span:] & group_propagate[:-span]
+            span <<= 1
+
+        # The carry into bit i is the group generate of bits 0 .. i-1, the carry-in of bit 0 is 0
+        carries = np.zeros_like(propagate)
+        carries[1:] = generate[:-1]
+        return propagate ^ carries, generate[-1].copy()
+
+    '''
+        @breif: This function performs binary addition with the same interface as RippleAdder.add.
+
+        @params: A -> list[int], first binary number represented as a list of bits (LSB to MSB)
+        @params: B -> list[int], second binary number represented as a list of bits (LSB to MSB)
+        @returns: sum_result -> list[int], the resulting sum as a binary list (LSB to MSB)
+        @returns: final_carry -> int, the final carry-out bit after addition
+    '''
+    def add(self, A: list, B: list):
+        assert len(A) == self.num_bits and len(B) == self.num_bits, "Input sizes must match num_bits"
+
+        A_planes = np.array(A, dtype=np.uint8).reshape(self.num_bits, 1)
+        B_planes = np.array(B, dtype=np.uint8).reshape(self.num_bits, 1)
+        sum_planes, carry = self.add_planes(A_planes, B_planes)
+        return sum_planes[:, 0].tolist(), int(carry[0])
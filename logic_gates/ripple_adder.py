@@ -7,9 +7,14 @@ class RippleAdder:
                 The carry-out from one full adder is passed as the carry-in to the next full adder.
 
         @params: num_bits -> int, the number of bits for the binary numbers to be added
+        @params: gate_depth -> int, logical depth in 2-input gates of the longest path to any output
     '''
+    __slots__ = ("num_bits", "gate_depth")
+
     def __init__(self, num_bits: int):
         self.num_bits = num_bits
+        # Each full adder adds an AND-OR to the carry chain, on top of the first XOR/AND level
+        self.gate_depth = 2 * num_bits + 1
 
     '''
         @breif: This function performs binary addition using the ripple carry adder.
@@ -39,3 +44,24 @@ class RippleAdder:
             carry = carry1 | carry2 
 
         return sum_result, carry
+
+    '''
+        @breif: This function adds many numbers at once, stored as bit planes. Each step is one full adder
+                applied to a whole plane, with the carry plane passed on to the next step exactly like add().
+
+        @params: A_planes -> np.array, first operands, shape (num_bits, lanes), row 0 is the first adder position
+        @params: B_planes -> np.array, second operands, shape (num_bits, lanes)
+        @returns: sum_planes -> np.array, the resulting sums, shape (num_bits, lanes)
+        @returns: carry -> np.array, the carry-out of every lane
+    '''
+    def add_planes(self, A_planes, B_planes):
+        assert A_planes.shape[0] == self.num_bits and B_planes.shape == A_planes.shape, "Input sizes must match num_bits"
+
+        sum_planes = A_planes.copy()
+        carry = A_planes[0] & 0  # Initial carry-in is 0 for every lane
+        for i in range(self.num_bits):
+            sum1 = A_planes[i] ^ B_planes[i]
+            carry1 = A_planes[i] & B_planes[i]
+            sum_planes[i] = sum1 ^ carry
+            carry = carry1 | (sum1 & carry)
+        return sum_planes, carry